@@ -90,7 +90,9 @@ from .callbacks import (
     on_stop,
     on_window_message,
     password_auth_callback,
+    project_settings_cache_key,
     send_window_message,
+    session_store,
     set_chat_profiles,
     set_starter_categories,
     set_starters,
@@ -243,8 +245,10 @@ __all__ = [
     "on_stop",
     "on_window_message",
     "password_auth_callback",
+    "project_settings_cache_key",
     "run_sync",
     "send_window_message",
+    "session_store",
     "set_chat_profile",
     "set_thread_title",
     "update_chat_settings",
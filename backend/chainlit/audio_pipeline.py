@@ -0,0 +1,355 @@
+import asyncio
+import time
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from chainlit.logger import logger
+from chainlit.types import InputAudioChunk, OutputAudioChunk
+
+if TYPE_CHECKING:
+    from chainlit.config import AudioOverflowPolicy
+    from chainlit.session import BaseSession
+
+
+class AudioIngressQueue:
+    """
+    Bounded queue of the audio chunks received from a user.
+
+    A single consumer passes the chunks to `handler` one at a time, in the order
+    they were received. Once `max_size` chunks are waiting (0 for no limit), the
+    `overflow` policy applies: "merge" appends the chunk data to the last queued
+    chunk (falling back to "drop_oldest" when they can't be merged),
+    "drop_oldest" drops the oldest queued chunk and "drop_newest" drops the
+    received chunk.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[InputAudioChunk], Awaitable[Any]],
+        max_size: int = 64,
+        overflow: "AudioOverflowPolicy" = "merge",
+    ):
+        self.handler = handler
+        self.max_size = max_size
+        self.overflow = overflow
+
+        # Chunks with the time they were received
+        self._chunks: Deque[Tuple[InputAudioChunk, float]] = deque()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._consumer: Optional[asyncio.Task] = None
+
+        self.chunks_received = 0
+        self.chunks_processed = 0
+        self.chunks_merged = 0
+        self.chunks_dropped = 0
+        self.max_depth = 0
+        # Time (in seconds) chunks waited in the queue, and spent in the handler
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_processing = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._chunks)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        processed = self.chunks_processed
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "chunks_received": self.chunks_received,
+            "chunks_processed": processed,
+            "chunks_merged": self.chunks_merged,
+            "chunks_dropped": self.chunks_dropped,
+            "avg_wait_ms": self.total_wait / processed * 1000 if processed else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_processing_ms": (
+                self.total_processing / processed * 1000 if processed else 0.0
+            ),
+        }
+
+    def _merge(self, chunk: InputAudioChunk) -> bool:
+        last, received_at = self._chunks[-1]
+
+        if (
+            chunk.isStart
+            or chunk.mimeType != last.mimeType
+            or not isinstance(chunk.data, bytes)
+            or not isinstance(last.data, bytes)
+        ):
+            return False
+
+        # The merged chunk keeps the reception time of its oldest audio
+        self._chunks[-1] = (
+            InputAudioChunk(
+                isStart=last.isStart,
+                mimeType=last.mimeType,
+                elapsedTime=chunk.elapsedTime,
+                data=last.data + chunk.data,
+            ),
+            received_at,
+        )
+        return True
+
+    def put(self, chunk: InputAudioChunk) -> bool:
+        """Queue a chunk without waiting, return False if it was dropped."""
+        self.chunks_received += 1
+
+        if self.max_size > 0 and len(self._chunks) >= self.max_size:
+            if self.overflow == "drop_newest":
+                self.chunks_dropped += 1
+                return False
+            elif self.overflow == "merge" and self._merge(chunk):
+                self.chunks_merged += 1
+                return True
+            else:
+                self._chunks.popleft()
+                self.chunks_dropped += 1
+
+        self._chunks.append((chunk, time.monotonic()))
+        self.max_depth = max(self.max_depth, len(self._chunks))
+        self._idle.clear()
+        self._ready.set()
+
+        if not self._consumer or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+
+        return True
+
+    async def _consume(self):
+        try:
+            while True:
+                if not self._chunks:
+                    self._ready.clear()
+                    self._idle.set()
+                    await self._ready.wait()
+                    continue
+
+                chunk, received_at = self._chunks.popleft()
+                started_at = time.monotonic()
+
+                try:
+                    await self.handler(chunk)
+                except Exception as e:
+                    logger.exception(e)
+
+                wait = started_at - received_at
+                self.chunks_processed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_processing += time.monotonic() - started_at
+        finally:
+            # Don't leave drain() waiting on a stopped consumer
+            self._idle.set()
+
+    async def drain(self) -> None:
+        """Wait until every queued chunk has been processed."""
+        await self._idle.wait()
+
+    async def close(self) -> None:
+        """Drop the queued chunks and stop the consumer."""
+        self._chunks.clear()
+        self._idle.set()
+
+        if self._consumer and not self._consumer.done():
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+
+
+class AudioOutputBuffer:
+    """
+    Jitter buffer of the audio chunks sent to the UI for a session.
+
+    Consecutive chunks of the same track and mime type are concatenated into a
+    single `audio_chunk` frame. Pending audio is sent `buffer_interval` seconds
+    after its first chunk, as soon as it exceeds `max_buffer_bytes`, or
+    explicitly through `flush()`. Frames are always sent in order.
+    """
+
+    def __init__(
+        self,
+        session: "BaseSession",
+        buffer_interval: float = 0.04,
+        max_buffer_bytes: int = 32768,
+    ):
+        self.session = session
+        self.buffer_interval = buffer_interval
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self._pending: Optional[OutputAudioChunk] = None
+        self._pending_parts: List[bytes] = []
+        self._pending_bytes = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.chunks_received = 0
+        self.frames_sent = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            "chunks_received": self.chunks_received,
+            "frames_sent": self.frames_sent,
+            "pending_bytes": self._pending_bytes,
+        }
+
+    def _can_merge(self, chunk: OutputAudioChunk) -> bool:
+        return (
+            self._pending is not None
+            and self._pending["track"] == chunk["track"]
+            and self._pending["mimeType"] == chunk["mimeType"]
+            and isinstance(chunk["data"], bytes)
+        )
+
+    def _take_pending(self) -> Optional[OutputAudioChunk]:
+        frame = self._pending
+        if frame is not None and self._pending_parts:
+            frame = OutputAudioChunk(
+                track=frame["track"],
+                mimeType=frame["mimeType"],
+                data=b"".join(self._pending_parts),
+            )
+
+        self._pending = None
+        self._pending_parts = []
+        self._pending_bytes = 0
+        return frame
+
+    async def add_chunk(self, chunk: OutputAudioChunk) -> None:
+        """Buffer a chunk, sending the pending audio first if it can't be merged."""
+        self.chunks_received += 1
+
+        if self._pending is not None and not self._can_merge(chunk):
+            await self.flush()
+
+        if not isinstance(chunk["data"], bytes):
+            # Only raw bytes are concatenated
+            await self._send(chunk)
+            return
+
+        if self._pending is None:
+            self._pending = chunk
+        self._pending_parts.append(chunk["data"])
+        self._pending_bytes += len(chunk["data"])
+
+        if self._pending_bytes >= self.max_buffer_bytes:
+            await self.flush()
+        elif not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.buffer_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush audio chunks: {e!s}")
+
+    async def _send(self, frame: OutputAudioChunk):
+        async with self._lock:
+            await self.session.emit("audio_chunk", frame)
+            self.frames_sent += 1
+
+    async def flush(self) -> None:
+        """Send the pending audio to the client."""
+        async with self._lock:
+            if (frame := self._take_pending()) is None:
+                return
+
+            await self.session.emit("audio_chunk", frame)
+            self.frames_sent += 1
+
+    def discard(self) -> None:
+        """Drop the pending audio, e.g. when the audio response is interrupted."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._take_pending()
+
+    async def close(self) -> None:
+        """Send the pending audio and stop the pending flush timer."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+
+audio_ingress_queues: Dict[str, AudioIngressQueue] = {}
+audio_output_buffers: Dict[str, AudioOutputBuffer] = {}
+
+
+def get_audio_ingress_queue(
+    session: "BaseSession", handler: Callable[[InputAudioChunk], Awaitable[Any]]
+) -> AudioIngressQueue:
+    """Return the audio ingress queue of a session, created with `handler`."""
+    from chainlit.config import config
+
+    if session.id not in audio_ingress_queues:
+        settings = config.project.audio_pipeline
+        audio_ingress_queues[session.id] = AudioIngressQueue(
+            handler,
+            max_size=settings.max_queued_chunks,
+            overflow=settings.overflow,
+        )
+
+    return audio_ingress_queues[session.id]
+
+
+async def drain_audio_ingress_queue(session_id: str) -> None:
+    """Wait until the audio chunks received for a session have been processed."""
+    if queue := audio_ingress_queues.get(session_id):
+        await queue.drain()
+
+
+def get_audio_output_buffer(session: "BaseSession") -> Optional[AudioOutputBuffer]:
+    """Return the audio output buffer of a session, if buffering is enabled."""
+    from chainlit.config import config
+
+    settings = config.project.audio_pipeline
+    if settings.output_buffer_ms <= 0:
+        return None
+
+    if session.id not in audio_output_buffers:
+        audio_output_buffers[session.id] = AudioOutputBuffer(
+            session,
+            buffer_interval=settings.output_buffer_ms / 1000,
+            max_buffer_bytes=settings.output_max_buffer_bytes,
+        )
+
+    return audio_output_buffers[session.id]
+
+
+def get_audio_pipeline_stats(
+    session_id: str,
+) -> Dict[str, Optional[Dict[str, Union[int, float]]]]:
+    """Queue depth, latency and frame metrics of the audio pipeline of a session."""
+    queue = audio_ingress_queues.get(session_id)
+    buffer = audio_output_buffers.get(session_id)
+    return {
+        "ingress": queue.stats() if queue else None,
+        "output": buffer.stats() if buffer else None,
+    }
+
+
+async def remove_audio_pipeline(session_id: str) -> None:
+    """Stop the audio ingress queue and flush the audio output buffer of a session."""
+    if queue := audio_ingress_queues.pop(session_id, None):
+        await queue.close()
+
+    if buffer := audio_output_buffers.pop(session_id, None):
+        try:
+            await buffer.close()
+        except Exception as e:
+            logger.debug(f"Error while closing audio output buffer: {e!s}")
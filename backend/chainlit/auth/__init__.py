@@ -13,7 +13,8 @@ from .cookie import (
     get_token_from_cookies,
     set_auth_cookie,
 )
-from .jwt import create_jwt, decode_jwt, get_jwt_secret
+from .jwt import create_jwt, decode_jwt, decode_jwt_with_expiry, get_jwt_secret
+from .user_cache import get_persisted_user_cache, invalidate_persisted_user
 
 reuseable_oauth = OAuth2PasswordBearerWithCookie(tokenUrl="/login", auto_error=False)
 
@@ -57,22 +58,29 @@ def get_configuration():
 
 async def authenticate_user(token: str = Depends(reuseable_oauth)):
     try:
-        user = decode_jwt(token)
+        user, expiry = decode_jwt_with_expiry(token)
     except Exception as e:
         raise HTTPException(
             status_code=401, detail="Invalid authentication token"
         ) from e
 
     if data_layer := get_data_layer():
-        # Get or create persistent user if we've a data layer available.
-        try:
-            persisted_user = await data_layer.get_user(user.identifier)
-            if persisted_user is None:
-                persisted_user = await data_layer.create_user(user)
-                assert persisted_user
-        except Exception as e:
-            logger.exception("Unable to get persisted_user from data layer: %s", e)
-            return user
+        user_cache = get_persisted_user_cache()
+        persisted_user = user_cache.get(user.identifier, expiry)
+
+        if persisted_user is None:
+            # Get or create persistent user if we've a data layer available.
+            try:
+                persisted_user = await data_layer.get_user(user.identifier)
+                if persisted_user is None:
+                    persisted_user = await data_layer.create_user(user)
+                    assert persisted_user
+                    invalidate_persisted_user(user.identifier)
+            except Exception as e:
+                logger.exception("Unable to get persisted_user from data layer: %s", e)
+                return user
+
+            user_cache.set(user.identifier, expiry, persisted_user)
 
         if user and user.display_name:
             # Copy ephemeral display_name from authenticated user to persistent user.
@@ -93,8 +101,10 @@ async def get_current_user(token: str = Depends(reuseable_oauth)):
 __all__ = [
     "clear_auth_cookie",
     "create_jwt",
+    "decode_jwt",
     "get_configuration",
     "get_current_user",
     "get_token_from_cookies",
+    "invalidate_persisted_user",
     "set_auth_cookie",
 ]
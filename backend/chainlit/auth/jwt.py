@@ -1,6 +1,6 @@
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import jwt as pyjwt
 
@@ -28,7 +28,8 @@ def create_jwt(data: User) -> str:
     return encoded_jwt
 
 
-def decode_jwt(token: str) -> User:
+def decode_jwt_with_expiry(token: str) -> Tuple[User, int]:
+    """Decode a token, returning its user and its expiry (unix timestamp)."""
     secret = get_jwt_secret()
     assert secret
 
@@ -38,5 +39,10 @@ def decode_jwt(token: str) -> User:
         algorithms=["HS256"],
         options={"verify_signature": True},
     )
-    del dict["exp"]
-    return User(**dict)
+    expiry = dict.pop("exp")
+    return User(**dict), expiry
+
+
+def decode_jwt(token: str) -> User:
+    user, _ = decode_jwt_with_expiry(token)
+    return user
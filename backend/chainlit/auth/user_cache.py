@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Optional, Set, Tuple, Union
+
+from chainlit.user import PersistedUser
+
+CacheKey = Tuple[str, int]
+
+
+class PersistedUserCache:
+    """
+    TTL + LRU cache of the persisted users resolved from auth tokens.
+
+    Entries are keyed by user identifier and token expiry, so a new login
+    never reuses the entry of a previous token. They expire after `ttl`
+    seconds (and never outlive the token), and the least recently used
+    entries are evicted past `max_size`.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[CacheKey, Tuple[PersistedUser, float]] = (
+            OrderedDict()
+        )
+        self._keys_by_identifier: Dict[str, Set[CacheKey]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, identifier: str, expiry: int) -> Optional[PersistedUser]:
+        key = (identifier, expiry)
+        entry = self._entries.get(key)
+
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers may mutate the returned user (display_name)
+        return replace(entry[0])
+
+    def set(self, identifier: str, expiry: int, user: PersistedUser):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        key = (identifier, expiry)
+        token_ttl = expiry - time.time()
+        expires_at = time.monotonic() + min(self.ttl, token_ttl)
+
+        self._entries[key] = (replace(user), expires_at)
+        self._entries.move_to_end(key)
+        self._keys_by_identifier.setdefault(identifier, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, identifier: str):
+        """Forget every cached entry of a user, e.g. after its metadata changed."""
+        for key in list(self._keys_by_identifier.get(identifier, ())):
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_identifier.clear()
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        if keys := self._keys_by_identifier.get(key[0]):
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_identifier[key[0]]
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_persisted_user_cache: Optional[PersistedUserCache] = None
+
+
+def get_persisted_user_cache() -> PersistedUserCache:
+    global _persisted_user_cache
+
+    if _persisted_user_cache is None:
+        from chainlit.config import config
+
+        settings = config.project.user_cache
+        _persisted_user_cache = PersistedUserCache(
+            max_size=settings.max_size, ttl=settings.ttl
+        )
+
+    return _persisted_user_cache
+
+
+def invalidate_persisted_user(identifier: str):
+    """Drop the cached persisted user, to call when its data layer record changes."""
+    if _persisted_user_cache is not None:
+        _persisted_user_cache.invalidate(identifier)
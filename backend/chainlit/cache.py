@@ -1,8 +1,23 @@
+import asyncio
+import functools
 import importlib
 import importlib.util
+import inspect
 import os
 import threading
-from typing import Any
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from chainlit.config import config
 from chainlit.logger import logger
@@ -40,23 +55,219 @@ def init_lc_cache():
                 )
 
 
-_cache: dict[tuple, Any] = {}
-_cache_lock = threading.Lock()
+# Entries of the shared store used by @cache when no option is given
+DEFAULT_MAX_SIZE = 10_000
 
+_MISSING = object()
 
-def cache(func):
-    def wrapper(*args, **kwargs):
-        # Create a cache key based on the function name, arguments, and keyword arguments
-        cache_key = (
-            (func.__name__,) + args + tuple((k, v) for k, v in sorted(kwargs.items()))
+
+class CacheStore:
+    """
+    Thread-safe LRU cache with an optional TTL.
+
+    Concurrent computations of the same key are deduplicated (single-flight):
+    threads wait for the one computing the value, and coroutines await the
+    same task. Other keys are never blocked while a value is computed.
+    A `max_size` of None keeps every entry (the legacy unbounded behavior).
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = DEFAULT_MAX_SIZE, ttl: Optional[float] = None
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Hashable, Tuple[Any, Optional[float]]] = (
+            OrderedDict()
         )
+        self._lock = threading.Lock()
+        # Locks of the keys being computed by threads, with their waiter counts
+        self._key_locks: Dict[Hashable, List] = {}
+        # Tasks of the keys being computed by coroutines
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        try:
+            with key_lock[0]:
+                with self._lock:
+                    # Computed by another thread while waiting
+                    value = self._lookup(key)
+                    if value is not _MISSING:
+                        self.hits += 1
+                        return value
+                    self.misses += 1
+
+                value = compute()
+                self.set(key, value)
+                return value
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    async def aget_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            task = self._tasks.get(key)
+            if task is None or task.get_loop() is not loop:
+                self.misses += 1
+                task = loop.create_task(self._compute(key, compute))
+                self._tasks[key] = task
+            else:
+                self.hits += 1
+
+        # A cancelled caller must not cancel the computation shared with others
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]):
+        try:
+            value = await compute()
+            self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                if self._tasks.get(key) is asyncio.current_task():
+                    del self._tasks[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float, None]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = CacheStore()
+
+
+def cache(
+    func: Optional[Callable] = None,
+    *,
+    max_size: Optional[int] = DEFAULT_MAX_SIZE,
+    ttl: Optional[float] = None,
+):
+    """
+    Cache the results of a function, sync or async, by arguments.
+
+    Without options, results are kept in a store shared by every cached function.
+    Passing `max_size` or `ttl` gives the function its own store, and
+    `max_size=None` keeps every result like the original unbounded cache.
+
+    Example:
+        @cl.cache
+        def load_model(name): ...
+
+        @cl.cache(max_size=100, ttl=60)
+        async def fetch_document(url): ...
+    """
+
+    def decorator(func: Callable):
+        if max_size == DEFAULT_MAX_SIZE and ttl is None:
+            store = _cache
+        else:
+            store = CacheStore(max_size=max_size, ttl=ttl)
+
+        def get_cache_key(args, kwargs) -> tuple:
+            # Create a cache key based on the function name, arguments, and keyword arguments
+            cache_key = (
+                (func.__name__,)
+                + args
+                + tuple((k, v) for k, v in sorted(kwargs.items()))
+            )
+            # Fail early on unhashable arguments
+            hash(cache_key)
+            return cache_key
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return store.get_or_compute(
+                get_cache_key(args, kwargs), lambda: func(*args, **kwargs)
+            )
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            return await store.aget_or_compute(
+                get_cache_key(args, kwargs), lambda: func(*args, **kwargs)
+            )
 
-        with _cache_lock:
-            # Check if the result is already in the cache
-            if cache_key not in _cache:
-                # If not, call the function and store the result in the cache
-                _cache[cache_key] = func(*args, **kwargs)
+        if inspect.iscoroutinefunction(func):
+            wrapper = async_wrapper  # type: ignore[assignment]
 
-        return _cache[cache_key]
+        wrapper.cache = store  # type: ignore[attr-defined]
+        return wrapper
 
-    return wrapper
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -12,6 +12,7 @@ from chainlit.data.base import BaseDataLayer
 from chainlit.mcp import McpConnection
 from chainlit.message import Message
 from chainlit.oauth_providers import get_configured_oauth_providers
+from chainlit.session_registry import BaseSessionStore
 from chainlit.step import Step, step
 from chainlit.types import ChatProfile, Starter, StarterCategory, ThreadDict
 from chainlit.user import User
@@ -320,6 +321,28 @@ def set_starter_categories(func):
     return func
 
 
+def project_settings_cache_key(
+    func: Callable[[Optional["User"]], Optional[str]],
+) -> Callable[[Optional["User"]], Optional[str]]:
+    """
+    Declare the partition of the cached project settings a user belongs to.
+
+    Only used when `project.settings_cache` is enabled. Users sharing a key share the
+    chat profiles and starters returned to them, so the key has to capture everything
+    `set_chat_profiles`, `set_starters` and `set_starter_categories` depend on (e.g. a role).
+    Return None to skip the cache for a user.
+
+    Args:
+        func (Callable[[Optional["User"]], Optional[str]]): The function returning the partition key of a user.
+
+    Returns:
+        Callable[[Optional["User"]], Optional[str]]: The decorated function.
+    """
+
+    config.code.project_settings_cache_key = wrap_user_function(func)
+    return func
+
+
 def on_chat_end(func: Callable) -> Callable:
     """
     Hook to react to the user websocket disconnect event.
@@ -492,6 +515,17 @@ def data_layer(
     return func
 
 
+def session_store(
+    func: Callable[[], BaseSessionStore],
+) -> Callable[[], BaseSessionStore]:
+    """
+    Hook to configure a custom session store, shared between Chainlit workers.
+    """
+
+    config.code.session_store = func
+    return func
+
+
 def on_feedback(func: Callable) -> Callable:
     """
     Hook to react to user feedback events from the UI.
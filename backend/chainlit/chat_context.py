@@ -1,56 +1,189 @@
-from typing import TYPE_CHECKING, Dict, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
 
 from chainlit.context import context
 
 if TYPE_CHECKING:
+    from collections.abc import ValuesView
+
     from chainlit.message import Message
 
-chat_contexts: Dict[str, List["Message"]] = {}
+# Rough number of characters per token, to budget tokens without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(message: "Message") -> int:
+    content = getattr(message, "content", None)
+    if not isinstance(content, str):
+        return 0
+    return -(-len(content) // CHARS_PER_TOKEN)
+
+
+class MessageWindow:
+    """
+    Messages of a session, in insertion order and indexed by id.
+
+    The oldest messages are evicted once the window holds more than
+    `max_messages` messages or more than `max_tokens` estimated tokens
+    (0 for no limit). The most recent message is always kept.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable["Message"] = (),
+        max_messages: int = 0,
+        max_tokens: int = 0,
+    ):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+
+        self._messages: Dict[Hashable, Message] = {}
+        self._tokens: Dict[Hashable, int] = {}
+        self.total_tokens = 0
+        self.evictions = 0
+
+        for message in messages:
+            self.add(message)
+
+    def add(self, message: "Message"):
+        """Add a message, or refresh its token count if it is already in the window."""
+        tokens = estimate_tokens(message)
+        self.total_tokens += tokens - self._tokens.get(message.id, 0)
+        self._messages[message.id] = message
+        self._tokens[message.id] = tokens
+        self._evict()
+
+    def remove(self, message: "Message") -> bool:
+        if message.id not in self._messages:
+            return False
+
+        del self._messages[message.id]
+        self.total_tokens -= self._tokens.pop(message.id)
+        return True
+
+    def get(self, message_id: Hashable) -> Optional["Message"]:
+        return self._messages.get(message_id)
+
+    def clear(self):
+        self._messages.clear()
+        self._tokens.clear()
+        self.total_tokens = 0
+
+    def view(self) -> "ValuesView[Message]":
+        """Read-only view of the messages, it must not outlive changes to the window."""
+        return self._messages.values()
+
+    def _evict(self):
+        while len(self._messages) > 1 and (
+            (self.max_messages and len(self._messages) > self.max_messages)
+            or (self.max_tokens and self.total_tokens > self.max_tokens)
+        ):
+            oldest = next(iter(self._messages))
+            del self._messages[oldest]
+            self.total_tokens -= self._tokens.pop(oldest)
+            self.evictions += 1
+
+    def __contains__(self, message: Any) -> bool:
+        return getattr(message, "id", None) in self._messages
+
+    def __iter__(self) -> Iterator["Message"]:
+        return iter(self._messages.values())
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MessageWindow, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageWindow({list(self)!r})"
+
+
+def new_message_window(messages: Iterable["Message"] = ()) -> MessageWindow:
+    """A message window bounded as configured in `project.chat_context`."""
+    from chainlit.config import config
+
+    settings = config.project.chat_context
+    return MessageWindow(
+        messages, max_messages=settings.max_messages, max_tokens=settings.max_tokens
+    )
+
+
+class ChatContexts(Dict[str, MessageWindow]):
+    """Message windows by session id, plain lists of messages are wrapped on assignment."""
+
+    def __setitem__(self, session_id: str, messages: Iterable["Message"]):
+        if not isinstance(messages, MessageWindow):
+            messages = new_message_window(messages)
+        super().__setitem__(session_id, messages)
+
+
+chat_contexts: ChatContexts = ChatContexts()
 
 
 class ChatContext:
-    def get(self) -> List["Message"]:
+    def _window(self, create: bool = True) -> Optional[MessageWindow]:
         if not context.session:
-            return []
+            return None
 
-        if context.session.id not in chat_contexts:
+        window = chat_contexts.get(context.session.id)
+        if window is None and create:
             # Create a new chat context
-            chat_contexts[context.session.id] = []
+            window = chat_contexts[context.session.id] = new_message_window()
+
+        return window
+
+    def get(self) -> List["Message"]:
+        """Copy of the messages of the session, safe to hold while it changes."""
+        if (window := self._window()) is None:
+            return []
+
+        return list(window)
+
+    def view(self) -> "ValuesView[Message]":
+        """Read-only view of the messages of the session, without copying them."""
+        if (window := self._window()) is None:
+            return {}.values()
+
+        return window.view()
+
+    def get_message(self, message_id: str) -> Optional["Message"]:
+        if (window := self._window(create=False)) is None:
+            return None
 
-        return chat_contexts[context.session.id].copy()
+        return window.get(message_id)
 
     def add(self, message: "Message"):
-        if not context.session:
+        if (window := self._window()) is None:
             return
 
-        if context.session.id not in chat_contexts:
-            chat_contexts[context.session.id] = []
-
-        if message not in chat_contexts[context.session.id]:
-            chat_contexts[context.session.id].append(message)
+        window.add(message)
 
         return message
 
     def remove(self, message: "Message") -> bool:
-        if not context.session:
+        if (window := self._window(create=False)) is None:
             return False
 
-        if context.session.id not in chat_contexts:
-            return False
-
-        if message in chat_contexts[context.session.id]:
-            chat_contexts[context.session.id].remove(message)
-            return True
-
-        return False
+        return window.remove(message)
 
     def clear(self) -> None:
-        if context.session and context.session.id in chat_contexts:
-            chat_contexts[context.session.id] = []
+        if window := self._window(create=False):
+            window.clear()
 
     def to_openai(self):
         messages = []
-        for message in self.get():
+        for message in self.view():
             if message.type == "assistant_message":
                 messages.append({"role": "assistant", "content": message.content})
             elif message.type == "user_message":
@@ -107,11 +107,102 @@ persist_user_env = false
 # Set to true to show API keys as ***, false to show them as plain text
 mask_user_env = false
 
+# Register the element files given by path in place instead of copying them to the
+# session files directory. They must then stay unchanged for the lifetime of the session.
+# reference_local_files = false
+
+# Resume threads with only their latest top-level steps (and the steps nested in them),
+# older ones are loaded on demand. on_chat_resume then gets that window. 0 sends the whole thread.
+# resume_steps_window = 0
+
 # Authorized origins
 # Can be overridden with CHAINLIT_ALLOW_ORIGINS environment variable
 # Example: CHAINLIT_ALLOW_ORIGINS="https://example.com,https://another.com"
 allow_origins = ["*"]
 
+# Coalesce streamed tokens into fewer websocket frames
+# [project.stream_coalescing]
+#     enabled = false
+#     # Maximum time (in milliseconds) a token can be buffered before being sent
+#     flush_interval_ms = 25
+#     # Flush as soon as the buffered tokens exceed this size (in bytes)
+#     max_buffer_bytes = 4096
+
+# Audio chunks received from a user are queued per session and passed to on_audio_chunk
+# one at a time, in order. Audio chunks sent to the UI can be buffered to send fewer frames.
+# [project.audio_pipeline]
+#     # Maximum number of received chunks waiting for on_audio_chunk, 0 for no limit
+#     max_queued_chunks = 64
+#     # When the queue is full: "merge" the chunk into the last queued one,
+#     # "drop_oldest" or "drop_newest"
+#     overflow = "merge"
+#     # Time (in milliseconds) the audio chunks sent to the UI are buffered, 0 to send them right away
+#     output_buffer_ms = 0
+#     # Send the buffered audio as soon as it exceeds this size (in bytes)
+#     output_max_buffer_bytes = 32768
+
+# Cache the persisted users resolved from auth tokens
+# [project.user_cache]
+#     # Time (in seconds) a user is cached, 0 to disable
+#     ttl = 60
+#     max_size = 1000
+
+# Cache the favorite messages of each user, toggles update the cached favorites
+# The cache is per worker: with several workers (CHAINLIT_REDIS_URL or a @cl.session_store),
+# a toggle is only seen by the other workers once their entry expires. It is then disabled
+# unless ttl is set explicitly.
+# [project.favorites_cache]
+#     # Time (in seconds) the favorites of a user are cached, 0 to disable
+#     # Defaults to 60, or 0 when sessions are shared between workers
+#     ttl = 60
+#     max_size = 1000
+
+# Cache the thread authors checked before serving a thread, authors never change
+# [project.thread_author_cache]
+#     # Number of thread authors cached for the authorization checks, 0 to disable
+#     max_size = 10000
+
+# Bound the messages kept in memory for cl.chat_context, the oldest ones are dropped first
+# [project.chat_context]
+#     # Maximum number of messages kept in the chat context, 0 for no limit
+#     max_messages = 0
+#     # Maximum number of (estimated) tokens kept in the chat context, 0 for no limit
+#     max_tokens = 0
+
+# Serialization of the steps and messages sent to the UI and persisted
+# [project.step_serialization]
+#     # Serialize dict/list step inputs and outputs without indentation, the UI pretty-prints them
+#     compact_json = false
+#     # Use orjson, when installed, for compact contents and the websocket frames
+#     orjson = false
+
+# How @cl.step captures the arguments of the decorated functions as step input:
+# "deepcopy" (copy of the arguments, serialized when the step is sent), "none",
+# "repr" (shallow, truncated repr of each argument) or "json" (serialized right away,
+# truncated to max_bytes). "repr" and "json" avoid copying large arguments, but
+# store less than the full arguments.
+# [project.step_input]
+#     capture = "deepcopy"
+#     max_bytes = 0
+
+# Cache the /project/settings responses per language, chat profile and user partition
+# (see @cl.project_settings_cache_key), until the config is reloaded
+# [project.settings_cache]
+#     enabled = false
+#     # Time (in seconds) a response is cached
+#     ttl = 300
+#     max_size = 1000
+
+# Batch step and element writes to the data layer instead of persisting each one right away
+# [project.write_behind]
+#     enabled = false
+#     # Maximum time (in milliseconds) a write can wait before being flushed
+#     flush_interval_ms = 100
+#     # Maximum number of writes persisted in a single batch
+#     max_batch_size = 100
+#     # Callers wait for room when this many writes are pending
+#     max_queue_size = 1000
+
 [features]
 # Process and display HTML in messages. This can be a security risk (see https://stackoverflow.com/questions/19603097/why-is-it-dangerous-to-render-user-generated-html-or-javascript)
 unsafe_allow_html = false
@@ -458,6 +549,9 @@ class CodeSettings(BaseModel):
     on_shared_thread_view: Optional[
         Callable[["ThreadDict", Optional["User"]], Awaitable[bool]]
     ] = None
+    project_settings_cache_key: Optional[
+        Callable[[Optional["User"]], Awaitable[Optional[str]]]
+    ] = None
     # Auth callbacks
     password_auth_callback: Optional[
         Callable[[str, str], Awaitable[Optional["User"]]]
@@ -473,6 +567,88 @@ class CodeSettings(BaseModel):
     on_window_message: Optional[Callable[[str], Any]] = None
     author_rename: Optional[Callable[[str], Awaitable[str]]] = None
     data_layer: Optional[Callable[[], BaseDataLayer]] = None
+    session_store: Optional[Callable[[], Any]] = None
+
+
+class StreamCoalescingSettings(BaseModel):
+    enabled: bool = False
+    # Maximum time (in milliseconds) a token can be buffered before being sent
+    flush_interval_ms: int = 25
+    # Flush as soon as the buffered tokens exceed this size (in bytes)
+    max_buffer_bytes: int = 4096
+
+
+AudioOverflowPolicy = Literal["merge", "drop_oldest", "drop_newest"]
+
+
+class AudioPipelineSettings(BaseModel):
+    # Maximum number of received chunks waiting for on_audio_chunk, 0 for no limit
+    max_queued_chunks: int = 64
+    # When the queue is full: merge the chunk into the last queued one, or drop one
+    overflow: AudioOverflowPolicy = "merge"
+    # Time (in milliseconds) the audio chunks sent to the UI are buffered, 0 to send them right away
+    output_buffer_ms: int = 0
+    # Send the buffered audio as soon as it exceeds this size (in bytes)
+    output_max_buffer_bytes: int = 32768
+
+
+class UserCacheSettings(BaseModel):
+    # Time (in seconds) a user is cached, 0 to disable
+    ttl: int = 60
+    max_size: int = 1000
+
+
+class ChatContextSettings(BaseModel):
+    # Maximum number of messages kept in the chat context, 0 for no limit
+    max_messages: int = 0
+    # Maximum number of (estimated) tokens kept in the chat context, 0 for no limit
+    max_tokens: int = 0
+
+
+class StepSerializationSettings(BaseModel):
+    # Serialize dict/list step inputs and outputs without indentation, the UI pretty-prints them
+    compact_json: bool = False
+    # Use orjson, when installed, for compact contents and the websocket frames
+    orjson: bool = False
+
+
+StepInputCapture = Literal["none", "repr", "json", "deepcopy"]
+
+
+class StepInputSettings(BaseModel):
+    # How @cl.step captures the arguments of the decorated functions
+    capture: StepInputCapture = "deepcopy"
+    # Size (in bytes) the "json" input of a step is truncated to, 0 for no limit
+    max_bytes: int = 0
+
+
+class FavoritesCacheSettings(BaseModel):
+    # Time (in seconds) the favorites of a user are cached, 0 to disable. The cache is
+    # per worker, by default it is disabled when sessions are shared between workers
+    ttl: Optional[int] = None
+    max_size: int = 1000
+
+
+class ThreadAuthorCacheSettings(BaseModel):
+    # Number of thread authors cached for the authorization checks, 0 to disable
+    max_size: int = 10000
+
+
+class SettingsCacheSettings(BaseModel):
+    enabled: bool = False
+    # Time (in seconds) a response is cached
+    ttl: int = 300
+    max_size: int = 1000
+
+
+class WriteBehindSettings(BaseModel):
+    enabled: bool = False
+    # Maximum time (in milliseconds) a write can wait before being flushed
+    flush_interval_ms: int = 100
+    # Maximum number of writes persisted in a single batch
+    max_batch_size: int = 100
+    # Callers wait for room when this many writes are pending
+    max_queue_size: int = 1000
 
 
 class ProjectSettings(BaseModel):
@@ -494,6 +670,31 @@ class ProjectSettings(BaseModel):
     persist_user_env: Optional[bool] = False
     # Whether to mask user environment variables (API keys) in the UI with password type
     mask_user_env: Optional[bool] = False
+    # Register the element files given by path in place instead of copying them
+    reference_local_files: bool = False
+    # Number of top-level steps sent when resuming a thread, 0 for all of them
+    resume_steps_window: int = 0
+    # Batching of streamed tokens into fewer websocket frames
+    stream_coalescing: StreamCoalescingSettings = Field(
+        default_factory=StreamCoalescingSettings
+    )
+    audio_pipeline: AudioPipelineSettings = Field(
+        default_factory=AudioPipelineSettings
+    )
+    user_cache: UserCacheSettings = Field(default_factory=UserCacheSettings)
+    chat_context: ChatContextSettings = Field(default_factory=ChatContextSettings)
+    step_serialization: StepSerializationSettings = Field(
+        default_factory=StepSerializationSettings
+    )
+    step_input: StepInputSettings = Field(default_factory=StepInputSettings)
+    favorites_cache: FavoritesCacheSettings = Field(
+        default_factory=FavoritesCacheSettings
+    )
+    thread_author_cache: ThreadAuthorCacheSettings = Field(
+        default_factory=ThreadAuthorCacheSettings
+    )
+    settings_cache: SettingsCacheSettings = Field(default_factory=SettingsCacheSettings)
+    write_behind: WriteBehindSettings = Field(default_factory=WriteBehindSettings)
 
 
 class ChainlitConfigOverrides(BaseModel):
@@ -30,7 +30,10 @@ def get_data_layer():
                 # When @data_layer is configured, call it to get data layer.
                 _data_layer = config.code.data_layer()
             elif database_url := os.environ.get("DATABASE_URL"):
-                from .chainlit_data_layer import ChainlitDataLayer
+                from .chainlit_data_layer import (
+                    ChainlitDataLayer,
+                    pool_options_from_env,
+                )
 
                 if os.environ.get("LITERAL_API_KEY"):
                     warnings.warn(
@@ -94,7 +97,9 @@ def get_data_layer():
                     )
 
                 _data_layer = ChainlitDataLayer(
-                    database_url=database_url, storage_client=storage_client
+                    database_url=database_url,
+                    storage_client=storage_client,
+                    **pool_options_from_env(),
                 )
             elif api_key := os.environ.get("LITERAL_API_KEY"):
                 # When LITERAL_API_KEY is defined, use Literal AI data layer
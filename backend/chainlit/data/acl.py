@@ -1,15 +1,91 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
 from fastapi import HTTPException
 
 from chainlit.data import get_data_layer
 
 
-async def is_thread_author(username: str, thread_id: str):
-    data_layer = get_data_layer()
-    if not data_layer:
-        raise HTTPException(status_code=400, detail="Data layer not initialized")
+class ThreadAuthorCache:
+    """
+    LRU cache of the thread authors (user identifiers) by thread id.
+
+    A thread never changes author, so entries don't expire: they are evicted
+    past `max_size` or dropped when their thread is deleted.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, thread_id: str) -> Optional[str]:
+        author = self._entries.get(thread_id)
+
+        if author is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(thread_id)
+        self.hits += 1
+        return author
+
+    def set(self, thread_id: str, author: Optional[str]):
+        if self.max_size <= 0 or not author:
+            return
+
+        self._entries[thread_id] = author
+        self._entries.move_to_end(thread_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, thread_id: str):
+        self._entries.pop(thread_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
 
-    thread_author = await data_layer.get_thread_author(thread_id)
 
+_thread_author_cache: Optional[ThreadAuthorCache] = None
+
+
+def get_thread_author_cache() -> ThreadAuthorCache:
+    global _thread_author_cache
+
+    if _thread_author_cache is None:
+        from chainlit.config import config
+
+        _thread_author_cache = ThreadAuthorCache(
+            max_size=config.project.thread_author_cache.max_size
+        )
+
+    return _thread_author_cache
+
+
+def clear_thread_author_cache():
+    global _thread_author_cache
+
+    _thread_author_cache = None
+
+
+def check_thread_author(username: str, thread_author: Optional[str]):
+    """Check the author of a thread, e.g. the `userIdentifier` fetched along with it."""
     if not thread_author:
         raise HTTPException(status_code=404, detail="Thread not found")
 
@@ -17,3 +93,16 @@ async def is_thread_author(username: str, thread_id: str):
         raise HTTPException(status_code=401, detail="Unauthorized")
     else:
         return True
+
+
+async def is_thread_author(username: str, thread_id: str):
+    data_layer = get_data_layer()
+    if not data_layer:
+        raise HTTPException(status_code=400, detail="Data layer not initialized")
+
+    cache = get_thread_author_cache()
+    if (thread_author := cache.get(thread_id)) is None:
+        thread_author = await data_layer.get_thread_author(thread_id)
+        cache.set(thread_id, thread_author)
+
+    return check_thread_author(username, thread_author)
@@ -7,9 +7,10 @@ from chainlit.types import (
     Pagination,
     ThreadDict,
     ThreadFilter,
+    ThreadPageDict,
 )
 
-from .utils import queue_until_user_message
+from .utils import paginate_thread, queue_until_user_message
 
 if TYPE_CHECKING:
     from chainlit.element import Element, ElementDict
@@ -73,6 +74,22 @@ class BaseDataLayer(ABC):
     async def delete_step(self, step_id: str):
         pass
 
+    async def create_steps(self, step_dicts: List["StepDict"]):
+        """
+        Persist several new steps at once, used by the write-behind queue.
+        Override to write them in a single round trip.
+        """
+        for step_dict in step_dicts:
+            await self.create_step(step_dict)
+
+    async def update_steps(self, step_dicts: List["StepDict"]):
+        """
+        Persist updates of several steps at once, used by the write-behind queue.
+        Override to write them in a single round trip.
+        """
+        for step_dict in step_dicts:
+            await self.update_step(step_dict)
+
     @abstractmethod
     async def get_thread_author(self, thread_id: str) -> str:
         return ""
@@ -91,6 +108,18 @@ class BaseDataLayer(ABC):
     async def get_thread(self, thread_id: str) -> "Optional[ThreadDict]":
         pass
 
+    async def get_thread_page(
+        self, thread_id: str, limit: int, before: Optional[str] = None
+    ) -> Optional[ThreadPageDict]:
+        """
+        Window of a thread, to load long threads lazily: its latest `limit`
+        top-level steps before the `before` step, with their nested steps and
+        elements. Pass `stepsPageInfo.olderStepsCursor` as `before` to load the
+        previous window. Override to only load the window from the database.
+        """
+        thread = await self.get_thread(thread_id)
+        return paginate_thread(thread, limit, before) if thread else None
+
     @abstractmethod
     async def update_thread(
         self,
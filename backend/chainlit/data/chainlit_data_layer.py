@@ -1,9 +1,12 @@
+import asyncio
 import json
+import os
+import re
+import time
 import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-import aiofiles
 import asyncpg  # type: ignore
 
 from chainlit.data.base import BaseDataLayer
@@ -20,6 +23,7 @@ from chainlit.types import (
     Pagination,
     ThreadDict,
     ThreadFilter,
+    ThreadPageDict,
 )
 from chainlit.user import PersistedUser, User
 
@@ -36,6 +40,88 @@ if TYPE_CHECKING:
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# Indexes serving the keyset pagination of list_threads, see `create_indexes`
+THREAD_INDEXES = [
+    """
+    CREATE INDEX IF NOT EXISTS "Thread_userId_updatedAt_id_idx"
+    ON "Thread" ("userId", "updatedAt" DESC, id DESC)
+    WHERE "deletedAt" IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS "Thread_updatedAt_id_idx"
+    ON "Thread" ("updatedAt" DESC, id DESC)
+    WHERE "deletedAt" IS NULL
+    """,
+]
+
+STEP_INDEXES = [
+    # Favorites are a handful of steps, found without scanning the others
+    """
+    CREATE INDEX IF NOT EXISTS "Step_favorite_threadId_idx"
+    ON "Step" ("threadId", "createdAt" DESC)
+    WHERE (metadata::jsonb ->> 'favorite') = 'true'
+    """,
+    # Latest steps of a thread first, for the windows of `get_thread_page`
+    """
+    CREATE INDEX IF NOT EXISTS "Step_threadId_startTime_id_idx"
+    ON "Step" ("threadId", "startTime" DESC, id DESC)
+    """,
+]
+
+# Postgres trims the trailing zeros of the fractional seconds in JSON
+_FRACTION = re.compile(r"\.(\d{1,5})(?=\D|$)")
+
+
+def _encode_json(value: Any) -> str:
+    # Parameters are serialized by the queries already
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _load_json(value: Any) -> Any:
+    """Decode a JSON column, fetched as text or already decoded by the codec."""
+    if value is None:
+        return {}
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
+
+
+def _isoformat(value: Union[datetime, str, None]) -> Optional[str]:
+    """ISO format of a timestamp column, also when it was aggregated as JSON."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(
+            _FRACTION.sub(lambda m: "." + m.group(1).ljust(6, "0"), value)
+        )
+    return value.isoformat()
+
+
+# Errors after which a connection is unusable, the query is retried on a new one
+CONNECTION_ERRORS = (
+    asyncpg.exceptions.ConnectionDoesNotExistError,
+    asyncpg.exceptions.InterfaceError,
+)
+
+
+def pool_options_from_env() -> Dict[str, Any]:
+    """Connection pool options of the DATABASE_* environment variables that are set."""
+    options: Dict[str, Any] = {}
+    for option, env, parse in (
+        ("min_pool_size", "DATABASE_POOL_MIN_SIZE", int),
+        ("max_pool_size", "DATABASE_POOL_MAX_SIZE", int),
+        ("statement_cache_size", "DATABASE_STATEMENT_CACHE_SIZE", int),
+        (
+            "max_inactive_connection_lifetime",
+            "DATABASE_POOL_MAX_INACTIVE_LIFETIME",
+            float,
+        ),
+        ("query_timeout", "DATABASE_QUERY_TIMEOUT", float),
+    ):
+        if value := os.environ.get(env):
+            options[option] = parse(value)
+    return options
+
 
 class ChainlitDataLayer(BaseDataLayer):
     def __init__(
@@ -43,15 +129,89 @@ class ChainlitDataLayer(BaseDataLayer):
         database_url: str,
         storage_client: Optional[BaseStorageClient] = None,
         show_logger: bool = False,
+        min_pool_size: int = 10,
+        max_pool_size: int = 10,
+        statement_cache_size: int = 100,
+        max_inactive_connection_lifetime: float = 300.0,
+        query_timeout: Optional[float] = None,
     ):
+        """
+        The pool options are passed to `asyncpg.create_pool`, with its defaults.
+
+        Queries are prepared once per connection and kept in its statement cache,
+        set `statement_cache_size` to 0 behind a pgbouncer in transaction mode.
+        `query_timeout` is in seconds, None to wait indefinitely.
+        """
         self.database_url = database_url
         self.pool: Optional[asyncpg.Pool] = None
         self.storage_client = storage_client
         self.show_logger = show_logger
 
+        self.min_pool_size = min(min_pool_size, max_pool_size)
+        self.max_pool_size = max_pool_size
+        self.statement_cache_size = statement_cache_size
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.query_timeout = query_timeout
+
+        self._connect_lock = asyncio.Lock()
+        self._waiting = 0
+        self._acquired = 0
+        self._acquire_wait_total = 0.0
+        self._acquire_wait_max = 0.0
+        self._connection_errors = 0
+
     async def connect(self):
-        if not self.pool:
-            self.pool = await asyncpg.create_pool(self.database_url)
+        async with self._connect_lock:
+            if not self.pool:
+                self.pool = await asyncpg.create_pool(
+                    self.database_url,
+                    min_size=self.min_pool_size,
+                    max_size=self.max_pool_size,
+                    statement_cache_size=self.statement_cache_size,
+                    max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+                    init=self._init_connection,
+                )
+
+    @staticmethod
+    async def _init_connection(connection: asyncpg.Connection):
+        # Decode JSON columns (metadata, props, aggregated rows) natively
+        for json_type in ("json", "jsonb"):
+            await connection.set_type_codec(
+                json_type,
+                encoder=_encode_json,
+                decoder=json.loads,
+                schema="pg_catalog",
+            )
+
+    def pool_stats(self) -> Dict[str, Union[int, float]]:
+        """Saturation metrics of the connection pool."""
+        size = self.pool.get_size() if self.pool else 0
+        idle = self.pool.get_idle_size() if self.pool else 0
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "max_size": self.max_pool_size,
+            # Queries waiting for a free connection
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "acquire_wait_avg": (
+                self._acquire_wait_total / self._acquired if self._acquired else 0.0
+            ),
+            "acquire_wait_max": self._acquire_wait_max,
+            "connection_errors": self._connection_errors,
+        }
+
+    async def create_indexes(self):
+        """
+        Create the indexes used to list threads and favorites, if they are missing.
+
+        The schema is managed by the Prisma migrations, this helps existing
+        databases catch up. On large tables, prefer running the statements
+        with CREATE INDEX CONCURRENTLY during a maintenance window.
+        """
+        for statement in THREAD_INDEXES + STEP_INDEXES:
+            await self.execute_query(statement)
 
     async def get_current_timestamp(self) -> datetime:
         return datetime.now()
@@ -62,26 +222,48 @@ class ChainlitDataLayer(BaseDataLayer):
         if not self.pool:
             await self.connect()
 
+        args = list(params.values()) if params else []
         try:
-            async with self.pool.acquire() as connection:  # type: ignore
-                try:
-                    if params:
-                        records = await connection.fetch(query, *params.values())
-                    else:
-                        records = await connection.fetch(query)
-                    return [dict(record) for record in records]
-                except Exception as e:
-                    logger.error(f"Database error: {e!s}")
-                    raise
-        except (
-            asyncpg.exceptions.ConnectionDoesNotExistError,
-            asyncpg.exceptions.InterfaceError,
-        ) as e:
-            # Handle connection issues by cleaning up and rethrowing
+            return await self._fetch(query, args)
+        except CONNECTION_ERRORS as e:
+            # The broken connection was dropped, the pool replaces it.
+            # Queries are idempotent upserts / deletes, retry once.
+            logger.warning(f"Connection error, retrying on a new connection: {e!s}")
+
+        try:
+            return await self._fetch(query, args)
+        except CONNECTION_ERRORS as e:
             logger.error(f"Connection error: {e!s}")
-            await self.cleanup()
             raise
 
+    async def _fetch(self, query: str, args: List[Any]) -> List[Dict[str, Any]]:
+        assert self.pool
+
+        self._waiting += 1
+        start = time.monotonic()
+        try:
+            connection = await self.pool.acquire()
+        finally:
+            self._waiting -= 1
+
+        wait = time.monotonic() - start
+        self._acquired += 1
+        self._acquire_wait_total += wait
+        self._acquire_wait_max = max(self._acquire_wait_max, wait)
+
+        try:
+            records = await connection.fetch(query, *args, timeout=self.query_timeout)
+            return [dict(record) for record in records]
+        except CONNECTION_ERRORS:
+            self._connection_errors += 1
+            connection.terminate()
+            raise
+        except Exception as e:
+            logger.error(f"Database error: {e!s}")
+            raise
+        finally:
+            await self.pool.release(connection)
+
     async def get_user(self, identifier: str) -> Optional[PersistedUser]:
         query = """
         SELECT * FROM "User"
@@ -96,7 +278,7 @@ class ChainlitDataLayer(BaseDataLayer):
             id=str(row.get("id")),
             identifier=str(row.get("identifier")),
             createdAt=row.get("createdAt").isoformat(),  # type: ignore
-            metadata=json.loads(row.get("metadata", "{}")),
+            metadata=_load_json(row.get("metadata")),
         )
 
     async def create_user(self, user: User) -> Optional[PersistedUser]:
@@ -122,7 +304,7 @@ class ChainlitDataLayer(BaseDataLayer):
             id=str(row.get("id")),
             identifier=str(row.get("identifier")),
             createdAt=row.get("createdAt").isoformat(),  # type: ignore
-            metadata=json.loads(row.get("metadata", "{}")),
+            metadata=_load_json(row.get("metadata")),
         )
 
     async def delete_feedback(self, feedback_id: str) -> bool:
@@ -179,17 +361,10 @@ class ChainlitDataLayer(BaseDataLayer):
         # Handle file uploads only if storage_client is configured
         path = None
         if self.storage_client:
-            content: Optional[Union[bytes, str]] = None
-
-            if element.path:
-                async with aiofiles.open(element.path, "rb") as f:
-                    content = await f.read()
-            elif element.content:
-                content = element.content
-            elif not element.url:
+            if not (element.path or element.content or element.url):
                 raise ValueError("Element url, path or content must be provided")
 
-            if content is not None:
+            if element.path or element.content:
                 if element.thread_id:
                     path = f"threads/{element.thread_id}/files/{element.id}"
                 else:
@@ -203,13 +378,23 @@ class ChainlitDataLayer(BaseDataLayer):
                     )
                     else None
                 )
-                await self.storage_client.upload_file(
-                    object_key=path,
-                    data=content,
-                    mime=element.mime or "application/octet-stream",
-                    overwrite=True,
-                    content_disposition=content_disposition,
-                )
+                if element.path:
+                    # Streamed to the storage client, never held in memory whole
+                    await self.storage_client.upload_stream(
+                        object_key=path,
+                        source=element.path,
+                        mime=element.mime or "application/octet-stream",
+                        overwrite=True,
+                        content_disposition=content_disposition,
+                    )
+                elif element.content:
+                    await self.storage_client.upload_file(
+                        object_key=path,
+                        data=element.content,
+                        mime=element.mime or "application/octet-stream",
+                        overwrite=True,
+                        content_disposition=content_disposition,
+                    )
 
         else:
             # Log warning only if element has file content that needs uploading
@@ -271,7 +456,7 @@ class ChainlitDataLayer(BaseDataLayer):
             return None
 
         row = results[0]
-        metadata = json.loads(row.get("metadata", "{}"))
+        metadata = _load_json(row.get("metadata"))
 
         return ElementDict(
             id=str(row["id"]),
@@ -289,7 +474,7 @@ class ChainlitDataLayer(BaseDataLayer):
             page=row["page"],
             autoPlay=row.get("autoPlay"),
             playerConfig=row.get("playerConfig"),
-            props=json.loads(row.get("props", "{}")),
+            props=_load_json(row.get("props")),
         )
 
     @queue_until_user_message()
@@ -459,8 +644,7 @@ class ChainlitDataLayer(BaseDataLayer):
         query = """
         SELECT
             t.*,
-            u.identifier as user_identifier,
-            (SELECT COUNT(*) FROM "Thread" WHERE "userId" = t."userId") as total
+            u.identifier as user_identifier
         FROM "Thread" t
         LEFT JOIN "User" u ON t."userId" = u.id
         WHERE t."deletedAt" IS NULL
@@ -478,12 +662,15 @@ class ChainlitDataLayer(BaseDataLayer):
             params["user_id"] = filters.userId
             param_count += 1
 
+        # Keyset pagination on (updatedAt, id), the cursor is the last thread id
         if pagination.cursor:
-            query += f' AND t."updatedAt" < (SELECT "updatedAt" FROM "Thread" WHERE id = ${param_count})'
+            query += f""" AND (t."updatedAt", t.id) < (
+                SELECT "updatedAt", id FROM "Thread" WHERE id = ${param_count}
+            )"""
             params["cursor"] = pagination.cursor
             param_count += 1
 
-        query += f' ORDER BY t."updatedAt" DESC LIMIT ${param_count}'
+        query += f' ORDER BY t."updatedAt" DESC, t.id DESC LIMIT ${param_count}'
         params["limit"] = pagination.first + 1
 
         results = await self.execute_query(query, params)
@@ -501,7 +688,7 @@ class ChainlitDataLayer(BaseDataLayer):
                 name=thread["name"],
                 userId=str(thread["userId"]) if thread["userId"] else None,
                 userIdentifier=thread["user_identifier"],
-                metadata=json.loads(thread["metadata"]),
+                metadata=_load_json(thread["metadata"]),
                 steps=[],
                 elements=[],
                 tags=[],
@@ -518,8 +705,28 @@ class ChainlitDataLayer(BaseDataLayer):
         )
 
     async def get_thread(self, thread_id: str) -> Optional[ThreadDict]:
+        # Thread, steps with their feedback and elements in one round trip
         query = """
-        SELECT t.*, u.identifier as user_identifier
+        SELECT  t.*,
+                u.identifier as user_identifier,
+                COALESCE(
+                    (
+                        SELECT json_agg(s ORDER BY s."startTime")
+                        FROM (
+                            SELECT  st.*,
+                                    f.id feedback_id,
+                                    f.value feedback_value,
+                                    f."comment" feedback_comment
+                            FROM "Step" st left join "Feedback" f on st.id = f."stepId"
+                            WHERE st."threadId" = t.id
+                        ) s
+                    ),
+                    '[]'::json
+                ) as steps,
+                COALESCE(
+                    (SELECT json_agg(e) FROM "Element" e WHERE e."threadId" = t.id),
+                    '[]'::json
+                ) as elements
         FROM "Thread" t
         LEFT JOIN "User" u ON t."userId" = u.id
         WHERE t.id = $1 AND t."deletedAt" IS NULL
@@ -529,35 +736,123 @@ class ChainlitDataLayer(BaseDataLayer):
         if not results:
             return None
 
-        thread = results[0]
-
-        # Get steps and related feedback
-        steps_query = """
-        SELECT  s.*,
-                f.id feedback_id,
-                f.value feedback_value,
-                f."comment" feedback_comment
-        FROM "Step" s left join "Feedback" f on s.id = f."stepId"
-        WHERE s."threadId" = $1
-        ORDER BY "startTime"
+        return await self._thread_row_to_dict(results[0])
+
+    async def get_thread_page(
+        self, thread_id: str, limit: int, before: Optional[str] = None
+    ) -> Optional[ThreadPageDict]:
+        # Latest top-level steps first, one more than the window to tell if
+        # there are older ones. Steps whose parent is missing are top-level too.
+        keyset = ""
+        if before is not None:
+            keyset = """
+                AND (s."startTime", s.id) < (
+                    SELECT c."startTime", c.id FROM "Step" c
+                    WHERE c.id = $3 AND c."threadId" = $1
+                )
+            """
+        # The window steps come with the steps nested in them at any depth,
+        # the latest window also gets the elements not attached to a step
+        orphans = ""
+        if before is None:
+            orphans = """
+                OR e."stepId" IS NULL
+                OR NOT EXISTS (SELECT 1 FROM "Step" o WHERE o.id = e."stepId")
+            """
+        query = f"""
+        WITH RECURSIVE roots AS (
+            SELECT s.id, s."startTime"
+            FROM "Step" s
+            WHERE s."threadId" = $1
+              AND (s."parentId" IS NULL OR NOT EXISTS (
+                  SELECT 1 FROM "Step" p
+                  WHERE p.id = s."parentId" AND p."threadId" = s."threadId"
+              ))
+              {keyset}
+            ORDER BY s."startTime" DESC, s.id DESC
+            LIMIT $2 + 1
+        ),
+        window_roots AS (
+            SELECT id, "startTime" FROM roots
+            ORDER BY "startTime" DESC, id DESC
+            LIMIT $2
+        ),
+        window_steps AS (
+            SELECT id FROM window_roots
+            UNION
+            SELECT s.id
+            FROM "Step" s JOIN window_steps w ON s."parentId" = w.id
+            WHERE s."threadId" = $1
+        )
+        SELECT  t.*,
+                u.identifier as user_identifier,
+                COALESCE(
+                    (
+                        SELECT json_agg(s ORDER BY s."startTime")
+                        FROM (
+                            SELECT  st.*,
+                                    f.id feedback_id,
+                                    f.value feedback_value,
+                                    f."comment" feedback_comment
+                            FROM "Step" st left join "Feedback" f on st.id = f."stepId"
+                            WHERE st.id IN (SELECT id FROM window_steps)
+                        ) s
+                    ),
+                    '[]'::json
+                ) as steps,
+                COALESCE(
+                    (
+                        SELECT json_agg(e) FROM "Element" e
+                        WHERE e."threadId" = t.id AND (
+                            e."stepId" IN (SELECT id FROM window_steps) {orphans}
+                        )
+                    ),
+                    '[]'::json
+                ) as elements,
+                (SELECT count(*) FROM roots) > $2 as has_older_steps,
+                (
+                    SELECT id FROM window_roots ORDER BY "startTime", id LIMIT 1
+                ) as older_steps_cursor
+        FROM "Thread" t
+        LEFT JOIN "User" u ON t."userId" = u.id
+        WHERE t.id = $1 AND t."deletedAt" IS NULL
         """
-        steps_results = await self.execute_query(steps_query, {"thread_id": thread_id})
+        params: Dict[str, Any] = {"thread_id": thread_id, "limit": limit}
+        if before is not None:
+            params["before"] = before
+        results = await self.execute_query(query, params)
 
-        # Get elements
-        elements_query = """
-        SELECT * FROM "Element"
-        WHERE "threadId" = $1
-        """
-        elements_results = await self.execute_query(
-            elements_query, {"thread_id": thread_id}
+        if not results:
+            return None
+
+        thread = results[0]
+        has_older_steps = bool(thread["has_older_steps"])
+        return ThreadPageDict(
+            **await self._thread_row_to_dict(thread),
+            stepsPageInfo={
+                "hasOlderSteps": has_older_steps,
+                "olderStepsCursor": (
+                    str(thread["older_steps_cursor"]) if has_older_steps else None
+                ),
+            },
         )
 
+    async def _thread_row_to_dict(self, thread: Dict[str, Any]) -> ThreadDict:
+        """Thread of a row selected with its steps and elements as JSON."""
+        steps_results = _load_json(thread["steps"])
+        elements_results = _load_json(thread["elements"])
+
         if self.storage_client is not None:
-            for elem in elements_results:
-                if not elem["url"] and elem["objectKey"]:
-                    elem["url"] = await self.storage_client.get_read_url(
-                        object_key=elem["objectKey"],
-                    )
+            unsigned = [
+                elem
+                for elem in elements_results
+                if not elem["url"] and elem["objectKey"]
+            ]
+            urls = await self.storage_client.get_read_urls(
+                elem["objectKey"] for elem in unsigned
+            )
+            for elem in unsigned:
+                elem["url"] = urls.get(elem["objectKey"])
 
         return ThreadDict(
             id=str(thread["id"]),
@@ -565,7 +860,7 @@ class ChainlitDataLayer(BaseDataLayer):
             name=thread["name"],
             userId=str(thread["userId"]) if thread["userId"] else None,
             userIdentifier=thread["user_identifier"],
-            metadata=json.loads(thread["metadata"]),
+            metadata=_load_json(thread["metadata"]),
             steps=[self._convert_step_row_to_dict(step) for step in steps_results],
             elements=[
                 self._convert_element_row_to_dict(elem) for elem in elements_results
@@ -665,7 +960,7 @@ class ChainlitDataLayer(BaseDataLayer):
                 FROM "Step" s
                          JOIN "Thread" t ON s."threadId" = t.id
                 WHERE t."userId" = $1
-                  AND s.metadata::jsonb->>'favorite' = 'true'
+                  AND (s.metadata::jsonb ->> 'favorite') = 'true'
                 ORDER BY s."createdAt" DESC \
                 """
         results = await self.execute_query(query, {"user_id": user_id})
@@ -690,17 +985,17 @@ class ChainlitDataLayer(BaseDataLayer):
             type=row["type"],
             input=row.get("input", {}),
             output=row.get("output", {}),
-            metadata=json.loads(row.get("metadata", "{}")),
-            createdAt=row["createdAt"].isoformat() if row.get("createdAt") else None,
-            start=row["startTime"].isoformat() if row.get("startTime") else None,
+            metadata=_load_json(row.get("metadata")),
+            createdAt=_isoformat(row.get("createdAt")),
+            start=_isoformat(row.get("startTime")),
             showInput=row.get("showInput"),
             isError=row.get("isError"),
-            end=row["endTime"].isoformat() if row.get("endTime") else None,
+            end=_isoformat(row.get("endTime")),
             feedback=self._extract_feedback_dict_from_step_row(row),
         )
 
     def _convert_element_row_to_dict(self, row: Dict) -> ElementDict:
-        metadata = json.loads(row.get("metadata", "{}"))
+        metadata = _load_json(row.get("metadata"))
         return ElementDict(
             id=str(row["id"]),
             threadId=str(row["threadId"]) if row.get("threadId") else None,
@@ -717,7 +1012,7 @@ class ChainlitDataLayer(BaseDataLayer):
             page=row["page"],
             autoPlay=row.get("autoPlay"),
             playerConfig=row.get("playerConfig"),
-            props=json.loads(row.get("props") or "{}"),
+            props=_load_json(row.get("props")),
         )
 
     async def build_debug_url(self) -> str:
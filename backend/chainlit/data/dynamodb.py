@@ -6,20 +6,22 @@ import random
 from dataclasses import asdict
 from datetime import datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, cast
 
-import aiofiles
-import aiohttp
+import anyio
 import boto3  # type: ignore
 from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config as BotoConfig
 
 from chainlit.context import context
 from chainlit.data.base import BaseDataLayer
-from chainlit.data.storage_clients.base import BaseStorageClient
+from chainlit.data.storage_clients.base import BaseStorageClient, upload_chunk_size
 from chainlit.data.utils import queue_until_user_message
 from chainlit.element import ElementDict
+from chainlit.http_client import get_http_client
 from chainlit.logger import logger
 from chainlit.step import StepDict
+from chainlit.sync import make_async
 from chainlit.types import (
     Feedback,
     PageInfo,
@@ -47,20 +49,54 @@ class DynamoDBDataLayer(BaseDataLayer):
         client: Optional["DynamoDBClient"] = None,
         storage_provider: Optional[BaseStorageClient] = None,
         user_thread_limit: int = 10,
+        max_concurrency: int = 10,
+        favorites_index: bool = False,
     ):
+        """
+        With `favorites_index`, favorites are also written as records keyed by
+        user, read instead of searching every thread of the user. Index the
+        favorites set before with `create_favorites_index`.
+        """
         if client:
             self.client = client
         else:
             region_name = os.environ.get("AWS_REGION", "us-east-1")
-            self.client = boto3.client("dynamodb", region_name=region_name)  # type: ignore
+            self.client = boto3.client(  # type: ignore
+                "dynamodb",
+                region_name=region_name,
+                # One pooled connection per worker thread
+                config=BotoConfig(max_pool_connections=max_concurrency),
+            )
 
         self.table_name = table_name
         self.storage_provider = storage_provider
         self.user_thread_limit = user_thread_limit
+        self.favorites_index = favorites_index
+
+        # boto3 clients are blocking: calls run in worker threads, at most
+        # max_concurrency at a time, so the event loop is never stalled.
+        self._limiter = anyio.CapacityLimiter(max_concurrency)
 
         self._type_deserializer = TypeDeserializer()
         self._type_serializer = TypeSerializer()
 
+    async def _call(self, operation: str, **kwargs: Any) -> Dict[str, Any]:
+        """Run a DynamoDB client operation in a worker thread."""
+        method = getattr(self.client, operation)
+        return await make_async(method, limiter=self._limiter)(**kwargs)
+
+    async def _query_all(self, **query_args: Any) -> List[Dict[str, Any]]:
+        """Run a query and follow its pagination, returning deserialized items."""
+        items: List[Dict[str, Any]] = []
+
+        while True:
+            response = await self._call("query", **query_args)
+            items.extend(map(self._deserialize_item, response.get("Items", [])))
+
+            if "LastEvaluatedKey" not in response:
+                return items
+            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
     def _get_current_timestamp(self) -> str:
         return datetime.now().isoformat() + "Z"
 
@@ -96,7 +132,7 @@ class DynamoDBDataLayer(BaseDataLayer):
             for key, value in item.items()
         }
 
-    def _update_item(self, key: Dict[str, Any], updates: Dict[str, Any]):
+    async def _update_item(self, key: Dict[str, Any], updates: Dict[str, Any]):
         update_expr: List[str] = []
         expression_attribute_names = {}
         expression_attribute_values = {}
@@ -110,7 +146,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             expression_attribute_names[k] = attr
             expression_attribute_values[v] = value
 
-        self.client.update_item(
+        await self._call(
+            "update_item",
             TableName=self.table_name,
             Key=self._serialize_item(key),
             UpdateExpression="SET " + ", ".join(update_expr),
@@ -125,7 +162,8 @@ class DynamoDBDataLayer(BaseDataLayer):
     async def get_user(self, identifier: str) -> Optional["PersistedUser"]:
         _logger.info("DynamoDB: get_user identifier=%s", identifier)
 
-        response = self.client.get_item(
+        response = await self._call(
+            "get_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"USER#{identifier}"},
@@ -160,7 +198,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             "createdAt": ts,
         }
 
-        self.client.put_item(
+        await self._call(
+            "put_item",
             TableName=self.table_name,
             Item=self._serialize_item(item),
         )
@@ -180,7 +219,8 @@ class DynamoDBDataLayer(BaseDataLayer):
         thread_id = thread_id.strip("THREAD#")
         step_id = step_id.strip("STEP#")
 
-        self.client.update_item(
+        await self._call(
+            "update_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -208,7 +248,8 @@ class DynamoDBDataLayer(BaseDataLayer):
         feedback.id = f"THREAD#{feedback.threadId}::STEP#{feedback.forId}"
         serialized_feedback = self._type_serializer.serialize(asdict(feedback))
 
-        self.client.update_item(
+        await self._call(
+            "update_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{feedback.threadId}"},
@@ -240,46 +281,50 @@ class DynamoDBDataLayer(BaseDataLayer):
             )
             return
 
-        content: Optional[Union[bytes, str]] = None
+        if not element.mime:
+            element.mime = "application/octet-stream"
+
+        context_user = self.context.session.user
+        user_folder = getattr(context_user, "id", "unknown")
+        file_object_key = f"{user_folder}/{element.thread_id}/{element.id}"
 
+        # Files are streamed to the storage provider, never held in memory whole
         if element.content:
-            content = element.content
+            uploaded_file = await self.storage_provider.upload_file(
+                object_key=file_object_key,
+                data=element.content,
+                mime=element.mime,
+                overwrite=True,
+            )
 
         elif element.path:
             _logger.debug("DynamoDB: create_element reading file %s", element.path)
-            async with aiofiles.open(element.path, "rb") as f:
-                content = await f.read()
+            uploaded_file = await self.storage_provider.upload_stream(
+                object_key=file_object_key,
+                source=element.path,
+                mime=element.mime,
+                overwrite=True,
+            )
 
         elif element.url:
             _logger.debug("DynamoDB: create_element http %s", element.url)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(element.url) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                    else:
-                        raise ValueError(
-                            f"Failed to read content from {element.url} status {response.status}",
-                        )
+            async with get_http_client().stream(
+                "GET", element.url, follow_redirects=True
+            ) as response:
+                if response.status_code != 200:
+                    raise ValueError(
+                        f"Failed to read content from {element.url} status {response.status_code}",
+                    )
+                uploaded_file = await self.storage_provider.upload_stream(
+                    object_key=file_object_key,
+                    source=response.aiter_bytes(upload_chunk_size),
+                    mime=element.mime,
+                    overwrite=True,
+                )
 
         else:
             raise ValueError("Element url, path or content must be provided")
 
-        if content is None:
-            raise ValueError("Content is None, cannot upload file")
-
-        if not element.mime:
-            element.mime = "application/octet-stream"
-
-        context_user = self.context.session.user
-        user_folder = getattr(context_user, "id", "unknown")
-        file_object_key = f"{user_folder}/{element.thread_id}/{element.id}"
-
-        uploaded_file = await self.storage_provider.upload_file(
-            object_key=file_object_key,
-            data=content,
-            mime=element.mime,
-            overwrite=True,
-        )
         if not uploaded_file:
             raise ValueError(
                 "DynamoDB Error: create_element, Failed to persist data in storage_provider",
@@ -295,7 +340,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             }
         )
 
-        self.client.put_item(
+        await self._call(
+            "put_item",
             TableName=self.table_name,
             Item=self._serialize_item(element_dict),
         )
@@ -307,7 +353,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             "DynamoDB: get_element thread=%s element=%s", thread_id, element_id
         )
 
-        response = self.client.get_item(
+        response = await self._call(
+            "get_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -327,7 +374,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             "DynamoDB: delete_element thread=%s element=%s", thread_id, element_id
         )
 
-        self.client.delete_item(
+        await self._call(
+            "delete_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -353,7 +401,8 @@ class DynamoDBDataLayer(BaseDataLayer):
             }
         )
 
-        self.client.put_item(
+        await self._call(
+            "put_item",
             TableName=self.table_name,
             Item=self._serialize_item(item),
         )
@@ -367,7 +416,7 @@ class DynamoDBDataLayer(BaseDataLayer):
         )
         _logger.debug("DynamoDB: update_step: %s", step_dict)
 
-        self._update_item(
+        await self._update_item(
             key={
                 # ignore type, dynamo needs these so we want to fail if not set
                 "PK": f"THREAD#{step_dict['threadId']}",  # type: ignore
@@ -381,7 +430,8 @@ class DynamoDBDataLayer(BaseDataLayer):
         thread_id = self.context.session.thread_id
         _logger.info("DynamoDB: delete_feedback thread=%s step=%s", thread_id, step_id)
 
-        self.client.delete_item(
+        await self._call(
+            "delete_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -392,7 +442,8 @@ class DynamoDBDataLayer(BaseDataLayer):
     async def get_thread_author(self, thread_id: str) -> str:
         _logger.info("DynamoDB: get_thread_author thread=%s", thread_id)
 
-        response = self.client.get_item(
+        response = await self._call(
+            "get_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -407,30 +458,16 @@ class DynamoDBDataLayer(BaseDataLayer):
         item = self._deserialize_item(response["Item"])
         return item["userId"]
 
-    async def delete_thread(self, thread_id: str):
-        _logger.info("DynamoDB: delete_thread thread=%s", thread_id)
-
-        thread = await self.get_thread(thread_id)
-        if not thread:
-            return
-
-        items: List[Any] = thread["steps"]
-        if thread["elements"]:
-            items.extend(thread["elements"])
-
-        delete_requests = []
-        for item in items:
-            key = self._serialize_item({"PK": item["PK"], "SK": item["SK"]})
-            req = {"DeleteRequest": {"Key": key}}
-            delete_requests.append(req)
-
+    async def _batch_write(self, requests: List[Dict[str, Any]]):
+        """Run put / delete requests in batches, retrying the unprocessed ones."""
         BATCH_ITEM_SIZE = 25  # pylint: disable=invalid-name
-        for i in range(0, len(delete_requests), BATCH_ITEM_SIZE):
-            chunk = delete_requests[i : i + BATCH_ITEM_SIZE]
-            response = self.client.batch_write_item(
+        for i in range(0, len(requests), BATCH_ITEM_SIZE):
+            chunk = requests[i : i + BATCH_ITEM_SIZE]
+            response = await self._call(
+                "batch_write_item",
                 RequestItems={
                     self.table_name: chunk,  # type: ignore
-                }
+                },
             )
 
             backoff_time = 1
@@ -440,11 +477,70 @@ class DynamoDBDataLayer(BaseDataLayer):
                 delay = min(backoff_time, 32) + random.uniform(0, 1)
                 await asyncio.sleep(delay)
 
-                response = self.client.batch_write_item(
-                    RequestItems=response["UnprocessedItems"]
+                response = await self._call(
+                    "batch_write_item", RequestItems=response["UnprocessedItems"]
                 )
 
-        self.client.delete_item(
+    async def _batch_get(self, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get items by key in batches, returning the deserialized items found."""
+        BATCH_ITEM_SIZE = 100  # pylint: disable=invalid-name
+
+        async def get_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            items: List[Dict[str, Any]] = []
+            request_items: Dict[str, Any] = {self.table_name: {"Keys": chunk}}
+
+            backoff_time = 1
+            while True:
+                response = await self._call(
+                    "batch_get_item", RequestItems=request_items
+                )
+                items.extend(
+                    map(
+                        self._deserialize_item,
+                        response.get("Responses", {}).get(self.table_name, []),
+                    )
+                )
+
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    return items
+
+                backoff_time *= 2
+                delay = min(backoff_time, 32) + random.uniform(0, 1)
+                await asyncio.sleep(delay)
+
+        chunks = await asyncio.gather(
+            *(
+                get_chunk(keys[i : i + BATCH_ITEM_SIZE])
+                for i in range(0, len(keys), BATCH_ITEM_SIZE)
+            )
+        )
+        return [item for chunk in chunks for item in chunk]
+
+    async def delete_thread(self, thread_id: str):
+        _logger.info("DynamoDB: delete_thread thread=%s", thread_id)
+
+        thread = await self.get_thread(thread_id)
+        if not thread:
+            return
+
+        items: List[Any] = thread["steps"]
+        if thread["elements"]:
+            items.extend(thread["elements"])
+
+        keys = [{"PK": item["PK"], "SK": item["SK"]} for item in items]
+        if self.favorites_index and thread.get("userId"):
+            keys.extend(
+                self._favorite_key(thread["userId"], thread_id, step["id"])  # type: ignore
+                for step in thread["steps"]
+            )
+
+        await self._batch_write(
+            [{"DeleteRequest": {"Key": self._serialize_item(key)}} for key in keys]
+        )
+
+        await self._call(
+            "delete_item",
             TableName=self.table_name,
             Key={
                 "PK": {"S": f"THREAD#{thread_id}"},
@@ -489,7 +585,7 @@ class DynamoDBDataLayer(BaseDataLayer):
             query_args["ExpressionAttributeNames"]["#name"] = "name"
             query_args["ExpressionAttributeValues"][":search"] = {"S": filters.search}
 
-        response = self.client.query(**query_args)  # type: ignore
+        response = await self._call("query", **query_args)
 
         if "LastEvaluatedKey" in response:
             paginated_response.pageInfo.hasNextPage = True
@@ -508,65 +604,59 @@ class DynamoDBDataLayer(BaseDataLayer):
 
         return paginated_response
 
+    def _query_thread_records(self, thread_id: str, sk_prefix: str) -> Dict[str, Any]:
+        return {
+            "TableName": self.table_name,
+            "KeyConditionExpression": "#pk = :pk AND begins_with(#sk, :sk_prefix)",
+            "ExpressionAttributeNames": {"#pk": "PK", "#sk": "SK"},
+            "ExpressionAttributeValues": {
+                ":pk": {"S": f"THREAD#{thread_id}"},
+                ":sk_prefix": {"S": sk_prefix},
+            },
+        }
+
     async def get_thread(self, thread_id: str) -> "Optional[ThreadDict]":
         _logger.info("DynamoDB: get_thread thread=%s", thread_id)
 
-        # Get all thread records
-        thread_items: List[Any] = []
-
-        cursor: Dict[str, Any] = {}
-        while True:
-            response = self.client.query(
+        # Fetch the thread record, its steps and its elements in parallel
+        thread_response, steps, elements = await asyncio.gather(
+            self._call(
+                "get_item",
                 TableName=self.table_name,
-                KeyConditionExpression="#pk = :pk",
-                ExpressionAttributeNames={"#pk": "PK"},
-                ExpressionAttributeValues={":pk": {"S": f"THREAD#{thread_id}"}},
-                **cursor,
-            )
-
-            deserialized_items = map(self._deserialize_item, response["Items"])
-            thread_items.extend(deserialized_items)
-
-            if "LastEvaluatedKey" not in response:
-                break
-            cursor["ExclusiveStartKey"] = response["LastEvaluatedKey"]
-
-        if len(thread_items) == 0:
-            return None
-
-        # process accordingly
-        thread_dict: Optional[ThreadDict] = None
-        steps = []
-        elements = []
-
-        for item in thread_items:
-            if item["SK"] == "THREAD":
-                thread_dict = item
-
-            elif item["SK"].startswith("ELEMENT"):
-                if self.storage_provider is not None:
-                    item["url"] = await self.storage_provider.get_read_url(
-                        object_key=item["objectKey"],
-                    )
-                elements.append(item)
-
-            elif item["SK"].startswith("STEP"):
-                if "feedback" in item:  # Decimal is not json serializable
-                    item["feedback"]["value"] = int(item["feedback"]["value"])
-                steps.append(item)
+                Key={
+                    "PK": {"S": f"THREAD#{thread_id}"},
+                    "SK": {"S": "THREAD"},
+                },
+            ),
+            self._query_all(**self._query_thread_records(thread_id, "STEP#")),
+            self._query_all(**self._query_thread_records(thread_id, "ELEMENT#")),
+        )
 
-        if not thread_dict:
-            if len(thread_items) > 0:
+        if "Item" not in thread_response:
+            if steps or elements:
                 _logger.warning(
                     "DynamoDB: found orphaned items for thread=%s", thread_id
                 )
             return None
 
+        thread_dict: ThreadDict = self._deserialize_item(thread_response["Item"])  # type: ignore
+
+        for step in steps:
+            if "feedback" in step:  # Decimal is not json serializable
+                step["feedback"]["value"] = int(step["feedback"]["value"])
+
+        if self.storage_provider is not None and elements:
+            urls = await self.storage_provider.get_read_urls(
+                element["objectKey"] for element in elements
+            )
+            for element in elements:
+                element["url"] = urls.get(element["objectKey"])
+
         steps.sort(key=lambda i: i["createdAt"])
         thread_dict.update(
             {
-                "steps": steps,
-                "elements": elements,
+                "steps": steps,  # type: ignore
+                "elements": elements,  # type: ignore
             }
         )
 
@@ -607,7 +697,7 @@ class DynamoDBDataLayer(BaseDataLayer):
             # user_id may be None on subsequent calls, don't update UserThreadPK to "USER#{None}"
             item["UserThreadPK"] = f"USER#{user_id}"
 
-        self._update_item(
+        await self._update_item(
             key={
                 "PK": f"THREAD#{thread_id}",
                 "SK": "THREAD",
@@ -615,65 +705,163 @@ class DynamoDBDataLayer(BaseDataLayer):
             updates=item,
         )
 
-    async def get_favorite_steps(self, user_id: str) -> List["StepDict"]:
-        _logger.info("DynamoDB: get_favorite_steps user_id=%s", user_id)
+    async def set_step_favorite(
+        self, step_dict: "StepDict", favorite: bool
+    ) -> "StepDict":
+        step_dict = await super().set_step_favorite(step_dict, favorite)
 
-        thread_ids = []
-        query_args: Dict[str, Any] = {
+        if not self.favorites_index:
+            return step_dict
+
+        user_id = await self.get_thread_author(step_dict["threadId"])  # type: ignore
+        key = self._favorite_key(user_id, step_dict["threadId"], step_dict["id"])  # type: ignore
+        if favorite:
+            await self._call(
+                "put_item",
+                TableName=self.table_name,
+                Item=self._serialize_item(
+                    {
+                        **key,
+                        "threadId": step_dict["threadId"],  # type: ignore
+                        "stepId": step_dict["id"],
+                    }
+                ),
+            )
+        else:
+            await self._call(
+                "delete_item",
+                TableName=self.table_name,
+                Key=self._serialize_item(key),
+            )
+
+        return step_dict
+
+    def _favorite_key(
+        self, user_id: str, thread_id: str, step_id: str
+    ) -> Dict[str, str]:
+        return {
+            "PK": f"FAVORITES#{user_id}",
+            "SK": f"THREAD#{thread_id}::STEP#{step_id}",
+        }
+
+    async def create_favorites_index(self):
+        """
+        Write the favorite records of the steps marked as favorite in their
+        metadata. This scans the whole table, run it once when enabling
+        `favorites_index`.
+        """
+        scan_args: Dict[str, Any] = {
             "TableName": self.table_name,
-            "IndexName": "UserThread",
-            "KeyConditionExpression": "#UserThreadPK = :pk",
-            "ExpressionAttributeNames": {"#UserThreadPK": "UserThreadPK"},
-            "ExpressionAttributeValues": {":pk": {"S": f"USER#{user_id}"}},
+            "FilterExpression": "#sk = :thread OR #metadata.#favorite = :true",
+            "ExpressionAttributeNames": {
+                "#sk": "SK",
+                "#metadata": "metadata",
+                "#favorite": "favorite",
+            },
+            "ExpressionAttributeValues": {
+                ":thread": {"S": "THREAD"},
+                ":true": {"BOOL": True},
+            },
         }
 
+        authors: Dict[str, str] = {}
+        favorites: List[Dict[str, Any]] = []
         while True:
-            response = self.client.query(**query_args)  # type: ignore
-            for item in response.get("Items", []):
-                pk = item.get("PK", {}).get("S")
-                if pk:
-                    thread_ids.append(pk.removeprefix("THREAD#"))
+            response = await self._call("scan", **scan_args)
+            for item in map(self._deserialize_item, response.get("Items", [])):
+                thread_id = item["PK"].removeprefix("THREAD#")
+                if item["SK"] == "THREAD":
+                    if item.get("userId"):
+                        authors[thread_id] = item["userId"]
+                elif item["SK"].startswith("STEP#"):
+                    favorites.append(item)
 
             if "LastEvaluatedKey" not in response:
                 break
-            query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+            scan_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        await self._batch_write(
+            [
+                {
+                    "PutRequest": {
+                        "Item": self._serialize_item(
+                            {
+                                **self._favorite_key(
+                                    authors[step["threadId"]],
+                                    step["threadId"],
+                                    step["id"],
+                                ),
+                                "threadId": step["threadId"],
+                                "stepId": step["id"],
+                            }
+                        )
+                    }
+                }
+                for step in favorites
+                if step.get("threadId") in authors
+            ]
+        )
 
-        favorite_steps: List[Dict[str, Any]] = []
+    async def get_favorite_steps(self, user_id: str) -> List["StepDict"]:
+        _logger.info("DynamoDB: get_favorite_steps user_id=%s", user_id)
 
-        for thread_id in thread_ids:
-            t_query_args: Dict[str, Any] = {
-                "TableName": self.table_name,
-                "KeyConditionExpression": "#pk = :pk AND begins_with(#sk, :sk_prefix)",
-                "FilterExpression": "#metadata.#favorite = :true",
-                "ExpressionAttributeNames": {
-                    "#pk": "PK",
-                    "#sk": "SK",
-                    "#metadata": "metadata",
-                    "#favorite": "favorite",
-                },
-                "ExpressionAttributeValues": {
-                    ":pk": {"S": f"THREAD#{thread_id}"},
-                    ":sk_prefix": {"S": "STEP#"},
-                    ":true": {"BOOL": True},
-                },
-            }
+        if self.favorites_index:
+            records = await self._query_all(
+                TableName=self.table_name,
+                KeyConditionExpression="#pk = :pk",
+                ExpressionAttributeNames={"#pk": "PK"},
+                ExpressionAttributeValues={":pk": {"S": f"FAVORITES#{user_id}"}},
+            )
+            steps = await self._batch_get(
+                [
+                    self._serialize_item(
+                        {
+                            "PK": f"THREAD#{record['threadId']}",
+                            "SK": f"STEP#{record['stepId']}",
+                        }
+                    )
+                    for record in records
+                ]
+            )
+            return self._favorite_steps([steps])
 
-            while True:
-                response = self.client.query(**t_query_args)  # type: ignore
-                for item in response.get("Items", []):
-                    step = self._deserialize_item(item)
-                    if "PK" in step:
-                        del step["PK"]
-                    if "SK" in step:
-                        del step["SK"]
-                    if "feedback" in step:
-                        del step["feedback"]
-
-                    favorite_steps.append(step)
-
-                if "LastEvaluatedKey" not in response:
-                    break
-                t_query_args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        user_threads = await self._query_all(
+            TableName=self.table_name,
+            IndexName="UserThread",
+            KeyConditionExpression="#UserThreadPK = :pk",
+            ExpressionAttributeNames={"#UserThreadPK": "UserThreadPK"},
+            ExpressionAttributeValues={":pk": {"S": f"USER#{user_id}"}},
+        )
+        thread_ids = [
+            item["PK"].removeprefix("THREAD#") for item in user_threads if "PK" in item
+        ]
+
+        def favorite_query(thread_id: str) -> Dict[str, Any]:
+            query_args = self._query_thread_records(thread_id, "STEP#")
+            query_args["FilterExpression"] = "#metadata.#favorite = :true"
+            query_args["ExpressionAttributeNames"].update(
+                {"#metadata": "metadata", "#favorite": "favorite"}
+            )
+            query_args["ExpressionAttributeValues"][":true"] = {"BOOL": True}
+            return query_args
+
+        # Per-thread queries run concurrently, bounded by max_concurrency
+        per_thread_steps = await asyncio.gather(
+            *(self._query_all(**favorite_query(thread_id)) for thread_id in thread_ids)
+        )
+
+        return self._favorite_steps(per_thread_steps)
+
+    def _favorite_steps(
+        self, step_lists: List[List[Dict[str, Any]]]
+    ) -> List["StepDict"]:
+        favorite_steps: List[Dict[str, Any]] = []
+        for steps in step_lists:
+            for step in steps:
+                step.pop("PK", None)
+                step.pop("SK", None)
+                step.pop("feedback", None)
+                favorite_steps.append(step)
 
         favorite_steps.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
         return cast(List["StepDict"], favorite_steps)
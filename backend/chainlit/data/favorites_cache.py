@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from chainlit.data.base import BaseDataLayer
+    from chainlit.step import StepDict
+
+
+class FavoritesCache:
+    """
+    TTL + LRU cache of the favorite steps of each user, newest first.
+
+    A favorite toggle updates the cached list of its user instead of
+    dropping it. Lists are replaced, never mutated, so a list handed out
+    stays consistent while it is being sent.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[str, Tuple[List[StepDict], float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[List["StepDict"]]:
+        entry = self._entries.get(user_id)
+
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: str, steps: List["StepDict"]):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        self._entries[user_id] = (list(steps), time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, user_id: str, step_dict: "StepDict", favorite: bool):
+        """Add or remove a step from the cached favorites of a user, if cached."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+
+        steps = [step for step in entry[0] if step.get("id") != step_dict.get("id")]
+        if favorite:
+            steps.append(step_dict)
+            steps.sort(key=lambda step: step.get("createdAt") or "", reverse=True)
+
+        self._entries[user_id] = (steps, entry[1])
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_favorites_cache: Optional[FavoritesCache] = None
+
+# Time (in seconds) the favorites are cached when the ttl is not configured
+DEFAULT_TTL = 60
+
+
+def get_favorites_cache() -> FavoritesCache:
+    global _favorites_cache
+
+    if _favorites_cache is None:
+        from chainlit.config import config
+        from chainlit.session_registry import get_session_store
+
+        settings = config.project.favorites_cache
+        ttl = settings.ttl
+        if ttl is None:
+            # Toggles made on another worker would go unnoticed until expiry
+            ttl = 0 if get_session_store() else DEFAULT_TTL
+        _favorites_cache = FavoritesCache(max_size=settings.max_size, ttl=ttl)
+
+    return _favorites_cache
+
+
+async def get_cached_favorite_steps(
+    data_layer: "BaseDataLayer", user_id: str
+) -> List["StepDict"]:
+    """Favorite steps of a user, from the cache or the data layer."""
+    cache = get_favorites_cache()
+
+    if (steps := cache.get(user_id)) is None:
+        steps = await data_layer.get_favorite_steps(user_id)
+        cache.set(user_id, steps)
+
+    return steps
+
+
+def invalidate_favorites(user_id: str):
+    """Drop the cached favorites of a user, e.g. after one of its threads was deleted."""
+    if _favorites_cache is not None:
+        _favorites_cache.invalidate(user_id)
@@ -3,19 +3,19 @@ import ssl
 import uuid
 from dataclasses import asdict
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import aiofiles
-import aiohttp
-from sqlalchemy import text
+from sqlalchemy import TextClause, bindparam, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from chainlit.data.base import BaseDataLayer
-from chainlit.data.storage_clients.base import BaseStorageClient
+from chainlit.data.storage_clients.base import BaseStorageClient, upload_chunk_size
 from chainlit.data.utils import queue_until_user_message
 from chainlit.element import ElementDict
+from chainlit.http_client import get_http_client
 from chainlit.logger import logger
 from chainlit.step import StepDict
 from chainlit.types import (
@@ -26,6 +26,7 @@ from chainlit.types import (
     Pagination,
     ThreadDict,
     ThreadFilter,
+    ThreadPageDict,
 )
 from chainlit.user import PersistedUser, User
 
@@ -34,6 +35,112 @@ if TYPE_CHECKING:
     from chainlit.step import StepDict
 
 
+@lru_cache(maxsize=256)
+def upsert_statement(table: str, columns: Tuple[str, ...], rows: int = 1) -> TextClause:
+    """INSERT ... ON CONFLICT (id) DO UPDATE of a column set, built once per shape."""
+    names = ", ".join(f'"{column}"' for column in columns)
+    if rows == 1:
+        values = "(" + ", ".join(f":{column}" for column in columns) + ")"
+    else:
+        values = ", ".join(
+            "(" + ", ".join(f":{column}_{index}" for column in columns) + ")"
+            for index in range(rows)
+        )
+    updates = ", ".join(
+        f'"{column}" = excluded."{column}"' for column in columns if column != "id"
+    )
+    return text(
+        f"INSERT INTO {table} ({names}) VALUES {values} "
+        f"ON CONFLICT (id) DO UPDATE SET {updates};"
+    )
+
+
+# Index of the favorite steps of each user, see SQLAlchemyDataLayer.create_favorites_table
+FAVORITES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS favorites (
+        "stepId" UUID PRIMARY KEY,
+        "threadId" UUID NOT NULL,
+        "userId" UUID NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS "favorites_userId_idx" ON favorites ("userId")',
+]
+
+# Matches the favorites in the JSON dump of the step metadata
+FAVORITE_PATTERN = '%"favorite": true%'
+
+# Columns of the steps (and their feedback) and elements loaded with a thread
+STEP_FEEDBACK_COLUMNS = """
+    s."id" AS step_id,
+    s."name" AS step_name,
+    s."type" AS step_type,
+    s."threadId" AS step_threadid,
+    s."parentId" AS step_parentid,
+    s."streaming" AS step_streaming,
+    s."waitForAnswer" AS step_waitforanswer,
+    s."isError" AS step_iserror,
+    s."metadata" AS step_metadata,
+    s."tags" AS step_tags,
+    s."input" AS step_input,
+    s."output" AS step_output,
+    s."createdAt" AS step_createdat,
+    s."start" AS step_start,
+    s."end" AS step_end,
+    s."generation" AS step_generation,
+    s."showInput" AS step_showinput,
+    s."language" AS step_language,
+    f."value" AS feedback_value,
+    f."comment" AS feedback_comment,
+    f."id" AS feedback_id
+"""
+
+ELEMENT_COLUMNS = """
+    e."id" AS element_id,
+    e."threadId" as element_threadid,
+    e."type" AS element_type,
+    e."chainlitKey" AS element_chainlitkey,
+    e."url" AS element_url,
+    e."objectKey" as element_objectkey,
+    e."name" AS element_name,
+    e."display" AS element_display,
+    e."size" AS element_size,
+    e."language" AS element_language,
+    e."page" AS element_page,
+    e."forId" AS element_forid,
+    e."mime" AS element_mime,
+    e."props" AS props
+"""
+
+
+def rows_to_dicts(keys: Sequence[str], rows: Sequence[Sequence[Any]]):
+    """
+    Convert result rows to dicts, with UUID values as strings.
+
+    A column is typed by its first non-null value, only the UUID columns are
+    converted.
+    """
+    uuid_columns = [
+        index
+        for index in range(len(keys))
+        if isinstance(
+            next((row[index] for row in rows if row[index] is not None), None),
+            uuid.UUID,
+        )
+    ]
+    if not uuid_columns:
+        return [dict(zip(keys, row)) for row in rows]
+
+    dicts = []
+    for row in rows:
+        values = list(row)
+        for index in uuid_columns:
+            if values[index] is not None:
+                values[index] = str(values[index])
+        dicts.append(dict(zip(keys, values)))
+    return dicts
+
+
 class SQLAlchemyDataLayer(BaseDataLayer):
     def __init__(
         self,
@@ -43,8 +150,24 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         storage_provider: Optional[BaseStorageClient] = None,
         user_thread_limit: Optional[int] = 1000,
         show_logger: Optional[bool] = False,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_pre_ping: bool = False,
+        pool_recycle: int = -1,
+        favorites_table: bool = False,
     ):
+        """
+        `pool_size` and `max_overflow` default to SQLAlchemy's (5 and 10).
+        `pool_pre_ping` tests connections on checkout, to survive database
+        restarts, and `pool_recycle` replaces connections older than this many
+        seconds, e.g. below a proxy idle timeout.
+
+        With `favorites_table`, favorites are kept in the indexed `favorites`
+        table instead of being searched in the metadata of every step of the
+        user. Create it first with `create_favorites_table`.
+        """
         self._conninfo = conninfo
+        self.favorites_table = favorites_table
         self.user_thread_limit = user_thread_limit
         self.show_logger = show_logger
         if connect_args is None:
@@ -55,8 +178,20 @@ class SQLAlchemyDataLayer(BaseDataLayer):
             ssl_context.check_hostname = False
             ssl_context.verify_mode = ssl.CERT_NONE
             connect_args["ssl"] = ssl_context
+        pool_options: Dict[str, Any] = {
+            "pool_pre_ping": pool_pre_ping,
+            "pool_recycle": pool_recycle,
+        }
+        if pool_size is not None:
+            pool_options["pool_size"] = pool_size
+        if max_overflow is not None:
+            pool_options["max_overflow"] = max_overflow
         self.engine: AsyncEngine = create_async_engine(
-            self._conninfo, connect_args=connect_args
+            self._conninfo, connect_args=connect_args, **pool_options
+        )
+        # Reads run outside of a transaction, on the same pool
+        self.read_engine: AsyncEngine = self.engine.execution_options(
+            isolation_level="AUTOCOMMIT"
         )
         self.async_session = sessionmaker(
             bind=self.engine, expire_on_commit=False, class_=AsyncSession
@@ -76,21 +211,21 @@ class SQLAlchemyDataLayer(BaseDataLayer):
 
     ###### SQL Helpers ######
     async def execute_sql(
-        self, query: str, parameters: dict
+        self, query: Union[str, TextClause], parameters: dict
     ) -> Union[List[Dict[str, Any]], int, None]:
-        parameterized_query = text(query)
+        parameterized_query = text(query) if isinstance(query, str) else query
+        if self._is_read_only(parameterized_query.text):
+            return await self._execute_read(parameterized_query, parameters)
+
         async with self.async_session() as session:
             try:
                 await session.begin()
                 result = await session.execute(parameterized_query, parameters)
                 await session.commit()
                 if result.returns_rows:
-                    json_result = [dict(row._mapping) for row in result.fetchall()]
-                    clean_json_result = self.clean_result(json_result)
-                    assert isinstance(clean_json_result, list) or isinstance(
-                        clean_json_result, int
+                    return self.clean_result(
+                        rows_to_dicts(list(result.keys()), result.fetchall())
                     )
-                    return clean_json_result
                 else:
                     return result.rowcount
             except SQLAlchemyError as e:
@@ -102,17 +237,37 @@ class SQLAlchemyDataLayer(BaseDataLayer):
                 logger.warning(f"An unexpected error occurred: {e}")
                 return None
 
+    @staticmethod
+    def _is_read_only(query: str) -> bool:
+        return query.lstrip()[:6].upper() == "SELECT"
+
+    async def _execute_read(
+        self, query: TextClause, parameters: dict
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Run a SELECT without a session nor a transaction."""
+        try:
+            async with self.read_engine.connect() as connection:
+                result = await connection.execute(query, parameters)
+                return self.clean_result(
+                    rows_to_dicts(list(result.keys()), result.fetchall())
+                )
+        except SQLAlchemyError as e:
+            logger.warning(f"An error occurred: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"An unexpected error occurred: {e}")
+            return None
+
     async def get_current_timestamp(self) -> str:
         return datetime.now().isoformat() + "Z"
 
     def clean_result(self, obj):
-        """Recursively change UUID -> str and serialize dictionaries"""
-        if isinstance(obj, dict):
-            return {k: self.clean_result(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self.clean_result(item) for item in obj]
-        elif isinstance(obj, uuid.UUID):
-            return str(obj)
+        """
+        Post-process the rows returned by execute_sql, as a list of dicts.
+
+        UUID values are already converted to strings by rows_to_dicts, override
+        to further transform the rows.
+        """
         return obj
 
     ###### User ######
@@ -215,6 +370,140 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         else:
             return None
 
+    async def get_thread_page(
+        self, thread_id: str, limit: int, before: Optional[str] = None
+    ) -> Optional[ThreadPageDict]:
+        if self.show_logger:
+            logger.info(
+                f"SQLAlchemy: get_thread_page, thread_id={thread_id}, before={before}"
+            )
+        threads = await self.execute_sql(
+            query="""
+                SELECT
+                    t."id" AS thread_id,
+                    t."createdAt" AS thread_createdat,
+                    t."name" AS thread_name,
+                    t."userId" AS user_id,
+                    t."userIdentifier" AS user_identifier,
+                    t."tags" AS thread_tags,
+                    t."metadata" AS thread_metadata
+                FROM threads t
+                WHERE t."id" = :thread_id
+            """,
+            parameters={"thread_id": thread_id},
+        )
+        if not isinstance(threads, list) or not threads:
+            return None
+        thread = threads[0]
+
+        # Latest top-level steps first, one more than the window to tell if there
+        # are older ones. Steps whose parent is missing are top-level steps too.
+        keyset = ""
+        if before is not None:
+            keyset = """
+                AND EXISTS (
+                    SELECT 1 FROM steps c
+                    WHERE c."id" = :before AND c."threadId" = :thread_id
+                      AND (s."createdAt" < c."createdAt"
+                           OR (s."createdAt" = c."createdAt" AND s."id" < c."id"))
+                )
+            """
+        roots = await self.execute_sql(
+            query=f"""
+                SELECT s."id" AS id
+                FROM steps s
+                WHERE s."threadId" = :thread_id
+                  AND (s."parentId" IS NULL OR NOT EXISTS (
+                      SELECT 1 FROM steps p
+                      WHERE p."id" = s."parentId" AND p."threadId" = s."threadId"
+                  ))
+                  {keyset}
+                ORDER BY s."createdAt" DESC, s."id" DESC
+                LIMIT :limit
+            """,
+            parameters={
+                "thread_id": thread_id,
+                "limit": limit + 1,
+                **({"before": before} if before is not None else {}),
+            },
+        )
+        roots = roots if isinstance(roots, list) else []
+        root_ids = [root["id"] for root in roots[:limit]]
+        has_older_steps = len(roots) > limit
+
+        steps: List[StepDict] = []
+        if root_ids:
+            # The window steps, with the steps nested in them at any depth
+            steps_feedbacks = await self.execute_sql(
+                query=text(
+                    f"""
+                    WITH RECURSIVE window_steps("id") AS (
+                        SELECT s."id" FROM steps s WHERE s."id" IN :root_ids
+                        UNION
+                        SELECT s."id"
+                        FROM steps s JOIN window_steps w ON s."parentId" = w."id"
+                        WHERE s."threadId" = :thread_id
+                    )
+                    SELECT {STEP_FEEDBACK_COLUMNS}
+                    FROM window_steps w
+                        JOIN steps s ON s."id" = w."id"
+                        LEFT JOIN feedbacks f ON s."id" = f."forId"
+                    ORDER BY s."createdAt" ASC
+                    """
+                ).bindparams(bindparam("root_ids", expanding=True)),
+                parameters={"thread_id": thread_id, "root_ids": root_ids},
+            )
+            if isinstance(steps_feedbacks, list):
+                steps = [self._step_dict_from_row(row) for row in steps_feedbacks]
+
+        # Elements of the window steps, the latest window also gets the elements
+        # not attached to any step of the thread
+        step_ids = [step["id"] for step in steps]
+        conditions = []
+        if step_ids:
+            conditions.append('e."forId" IN :step_ids')
+        if before is None:
+            conditions.append(
+                'e."forId" IS NULL OR NOT EXISTS '
+                '(SELECT 1 FROM steps s WHERE s."id" = e."forId")'
+            )
+        elements: List[ElementDict] = []
+        if conditions:
+            elements_query = text(
+                f"""
+                SELECT {ELEMENT_COLUMNS}
+                FROM elements e
+                WHERE e."threadId" = :thread_id AND ({" OR ".join(conditions)})
+                """
+            )
+            parameters: Dict[str, Any] = {"thread_id": thread_id}
+            if step_ids:
+                elements_query = elements_query.bindparams(
+                    bindparam("step_ids", expanding=True)
+                )
+                parameters["step_ids"] = step_ids
+            element_rows = await self.execute_sql(
+                query=elements_query, parameters=parameters
+            )
+            if isinstance(element_rows, list):
+                elements = await self._element_dicts_from_rows(element_rows)
+
+        return ThreadPageDict(
+            id=thread["thread_id"],
+            createdAt=thread["thread_createdat"],
+            name=thread["thread_name"],
+            userId=thread["user_id"],
+            userIdentifier=thread["user_identifier"],
+            tags=thread["thread_tags"],
+            metadata=thread["thread_metadata"],
+            steps=steps,
+            elements=elements,
+            stepsPageInfo={
+                "hasOlderSteps": has_older_steps,
+                "olderStepsCursor": root_ids[-1] if has_older_steps else None,
+            },
+        )
+
     async def update_thread(
         self,
         thread_id: str,
@@ -317,6 +606,11 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         await self.execute_sql(query=elements_query, parameters=parameters)
         await self.execute_sql(query=steps_query, parameters=parameters)
         await self.execute_sql(query=thread_query, parameters=parameters)
+        if self.favorites_table:
+            await self.execute_sql(
+                query="""DELETE FROM favorites WHERE "threadId" = :id""",
+                parameters=parameters,
+            )
 
     async def list_threads(
         self, pagination: Pagination, filters: ThreadFilter
@@ -327,58 +621,112 @@ class SQLAlchemyDataLayer(BaseDataLayer):
             )
         if not filters.userId:
             raise ValueError("userId is required")
-        all_user_threads: List[ThreadDict] = (
-            await self.get_all_user_threads(user_id=filters.userId) or []
-        )
 
-        search_keyword = filters.search.lower() if filters.search else None
-        feedback_value = int(filters.feedback) if filters.feedback else None
-
-        filtered_threads = []
-        for thread in all_user_threads:
-            keyword_match = True
-            feedback_match = True
-            if search_keyword or feedback_value is not None:
-                if search_keyword:
-                    keyword_match = any(
-                        search_keyword in step["output"].lower()
-                        for step in thread["steps"]
-                        if "output" in step
-                    )
-                if feedback_value is not None:
-                    feedback_match = False  # Assume no match until found
-                    for step in thread["steps"]:
-                        feedback = step.get("feedback")
-                        if feedback and feedback.get("value") == feedback_value:
-                            feedback_match = True
-                            break
-            if keyword_match and feedback_match:
-                filtered_threads.append(thread)
-
-        start = 0
+        parameters: Dict[str, Any] = {
+            "user_id": filters.userId,
+            "limit": pagination.first + 1,
+        }
+        conditions = ['t."userId" = :user_id']
+
+        if filters.search:
+            conditions.append(
+                """EXISTS (
+                    SELECT 1 FROM steps s
+                    WHERE s."threadId" = t."id"
+                      AND LOWER(s."output") LIKE :search ESCAPE '\\'
+                )"""
+            )
+            parameters["search"] = f"%{self._escape_like(filters.search.lower())}%"
+
+        if filters.feedback is not None:
+            conditions.append(
+                """EXISTS (
+                    SELECT 1 FROM feedbacks f
+                    JOIN steps s ON f."forId" = s."id"
+                    WHERE s."threadId" = t."id" AND f."value" = :feedback
+                )"""
+            )
+            parameters["feedback"] = int(filters.feedback)
+
+        # Keyset pagination on (updatedAt, id), resolved from the cursor thread id
+        cursor_join = ""
+        cursor_condition = ""
         if pagination.cursor:
-            for i, thread in enumerate(filtered_threads):
-                if (
-                    thread["id"] == pagination.cursor
-                ):  # Find the start index using pagination.cursor
-                    start = i + 1
-                    break
-        end = start + pagination.first
-        paginated_threads = filtered_threads[start:end] or []
-
-        has_next_page = len(filtered_threads) > end
-        start_cursor = paginated_threads[0]["id"] if paginated_threads else None
-        end_cursor = paginated_threads[-1]["id"] if paginated_threads else None
+            parameters["cursor"] = pagination.cursor
+            cursor_join = """
+                CROSS JOIN (
+                    SELECT MAX(s."createdAt") AS "updatedAt"
+                    FROM steps s WHERE s."threadId" = :cursor
+                ) c"""
+            cursor_condition = """
+                WHERE (
+                    c."updatedAt" IS NULL
+                    AND th."updatedAt" IS NULL
+                    AND th."id" < :cursor
+                ) OR (
+                    c."updatedAt" IS NOT NULL
+                    AND (
+                        th."updatedAt" < c."updatedAt"
+                        OR (th."updatedAt" = c."updatedAt" AND th."id" < :cursor)
+                        OR th."updatedAt" IS NULL
+                    )
+                )"""
+
+        query = f"""
+            SELECT th.* FROM (
+                SELECT
+                    t."id",
+                    t."createdAt",
+                    t."name",
+                    t."userId",
+                    t."userIdentifier",
+                    t."tags",
+                    t."metadata",
+                    (
+                        SELECT MAX(s."createdAt") FROM steps s
+                        WHERE s."threadId" = t."id"
+                    ) AS "updatedAt"
+                FROM threads t
+                WHERE {" AND ".join(conditions)}
+            ) th{cursor_join}{cursor_condition}
+            ORDER BY th."updatedAt" DESC NULLS LAST, th."id" DESC
+            LIMIT :limit
+        """
+        result = await self.execute_sql(query=query, parameters=parameters)
+        rows = result if isinstance(result, list) else []
+
+        has_next_page = len(rows) > pagination.first
+        if has_next_page:
+            rows = rows[: pagination.first]
+
+        threads = [
+            ThreadDict(
+                id=row["id"],
+                createdAt=row["createdAt"],
+                name=row["name"],
+                userId=row["userId"],
+                userIdentifier=row["userIdentifier"],
+                tags=row["tags"],
+                metadata=row["metadata"],
+                steps=[],
+                elements=[],
+            )
+            for row in rows
+        ]
 
         return PaginatedResponse(
             pageInfo=PageInfo(
                 hasNextPage=has_next_page,
-                startCursor=start_cursor,
-                endCursor=end_cursor,
+                startCursor=threads[0]["id"] if threads else None,
+                endCursor=threads[-1]["id"] if threads else None,
             ),
-            data=paginated_threads,
+            data=threads,
         )
 
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
     ###### Steps ######
     @queue_until_user_message()
     async def create_step(self, step_dict: "StepDict"):
@@ -387,6 +735,55 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         if self.show_logger:
             logger.info(f"SQLAlchemy: create_step, step_id={step_dict.get('id')}")
 
+        parameters = self._step_parameters(step_dict)
+        query = upsert_statement("steps", tuple(parameters.keys()))
+        await self.execute_sql(query=query, parameters=parameters)
+
+    @queue_until_user_message()
+    async def update_step(self, step_dict: "StepDict"):
+        if self.show_logger:
+            logger.info(f"SQLAlchemy: update_step, step_id={step_dict.get('id')}")
+        await self.create_step(step_dict)
+
+    @queue_until_user_message()
+    async def create_steps(self, step_dicts: List["StepDict"]):
+        if self.show_logger:
+            logger.info(f"SQLAlchemy: create_steps, count={len(step_dicts)}")
+
+        for thread_id in dict.fromkeys(
+            step_dict["threadId"] for step_dict in step_dicts
+        ):
+            await self.update_thread(thread_id)
+
+        # Steps persisting the same columns share a multi-row upsert
+        batches: Dict[tuple, List[Dict[str, Any]]] = {}
+        for step_dict in step_dicts:
+            parameters = self._step_parameters(step_dict)
+            batches.setdefault(tuple(parameters.keys()), []).append(parameters)
+
+        async with self.async_session() as session:
+            try:
+                await session.begin()
+                for keys, rows in batches.items():
+                    query = upsert_statement("steps", keys, len(rows))
+                    parameters = {
+                        f"{key}_{index}": value
+                        for index, row in enumerate(rows)
+                        for key, value in row.items()
+                    }
+                    await session.execute(query, parameters)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"An error occurred while persisting steps: {e}")
+
+    @queue_until_user_message()
+    async def update_steps(self, step_dicts: List["StepDict"]):
+        if self.show_logger:
+            logger.info(f"SQLAlchemy: update_steps, count={len(step_dicts)}")
+        await self.create_steps(step_dicts)
+
+    def _step_parameters(self, step_dict: "StepDict") -> Dict[str, Any]:
         step_dict["showInput"] = (
             str(step_dict.get("showInput", "")).lower()
             if "showInput" in step_dict
@@ -399,24 +796,7 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         }
         parameters["metadata"] = json.dumps(step_dict.get("metadata", {}))
         parameters["generation"] = json.dumps(step_dict.get("generation", {}))
-        columns = ", ".join(f'"{key}"' for key in parameters.keys())
-        values = ", ".join(f":{key}" for key in parameters.keys())
-        updates = ", ".join(
-            f'"{key}" = :{key}' for key in parameters.keys() if key != "id"
-        )
-        query = f"""
-            INSERT INTO steps ({columns})
-            VALUES ({values})
-            ON CONFLICT (id) DO UPDATE
-            SET {updates};
-        """
-        await self.execute_sql(query=query, parameters=parameters)
-
-    @queue_until_user_message()
-    async def update_step(self, step_dict: "StepDict"):
-        if self.show_logger:
-            logger.info(f"SQLAlchemy: update_step, step_id={step_dict.get('id')}")
-        await self.create_step(step_dict)
+        return parameters
 
     @queue_until_user_message()
     async def delete_step(self, step_id: str):
@@ -562,7 +942,7 @@ class SQLAlchemyDataLayer(BaseDataLayer):
                 url=element_dict.get("url"),
                 objectKey=element_dict.get("objectKey"),
                 name=element_dict["name"],
-                props=json.loads(element_dict.get("props", "{}")),
+                props=json.loads(element_dict.get("props") or "{}"),
                 display=element_dict["display"],
                 size=element_dict.get("size"),
                 language=element_dict.get("language"),
@@ -588,25 +968,6 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         if not element.for_id:
             return
 
-        content: Optional[Union[bytes, str]] = None
-
-        if element.path:
-            async with aiofiles.open(element.path, "rb") as f:
-                content = await f.read()
-        elif element.url:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(element.url) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                    else:
-                        content = None
-        elif element.content:
-            content = element.content
-        else:
-            raise ValueError("Element url, path or content must be provided")
-        if content is None:
-            raise ValueError("Content is None, cannot upload file")
-
         user_id: str = await self._get_user_id_by_thread(element.thread_id) or "unknown"
         file_object_key = f"{user_id}/{element.id}" + (
             f"/{element.name}" if element.name else ""
@@ -615,9 +976,35 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         if not element.mime:
             element.mime = "application/octet-stream"
 
-        uploaded_file = await self.storage_provider.upload_file(
-            object_key=file_object_key, data=content, mime=element.mime, overwrite=True
-        )
+        # Files are streamed to the storage provider, never held in memory whole
+        if element.path:
+            uploaded_file = await self.storage_provider.upload_stream(
+                object_key=file_object_key,
+                source=element.path,
+                mime=element.mime,
+                overwrite=True,
+            )
+        elif element.url:
+            async with get_http_client().stream(
+                "GET", element.url, follow_redirects=True
+            ) as response:
+                if response.status_code != 200:
+                    raise ValueError("Content is None, cannot upload file")
+                uploaded_file = await self.storage_provider.upload_stream(
+                    object_key=file_object_key,
+                    source=response.aiter_bytes(upload_chunk_size),
+                    mime=element.mime,
+                    overwrite=True,
+                )
+        elif element.content:
+            uploaded_file = await self.storage_provider.upload_file(
+                object_key=file_object_key,
+                data=element.content,
+                mime=element.mime,
+                overwrite=True,
+            )
+        else:
+            raise ValueError("Element url, path or content must be provided")
         if not uploaded_file:
             raise ValueError(
                 "SQLAlchemy Error: create_element, Failed to persist data in storage_provider"
@@ -632,14 +1019,7 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         if "props" in element_dict_cleaned:
             element_dict_cleaned["props"] = json.dumps(element_dict_cleaned["props"])
 
-        columns = ", ".join(f'"{column}"' for column in element_dict_cleaned.keys())
-        placeholders = ", ".join(f":{column}" for column in element_dict_cleaned.keys())
-        updates = ", ".join(
-            f'"{column}" = :{column}'
-            for column in element_dict_cleaned.keys()
-            if column != "id"
-        )
-        query = f"INSERT INTO elements ({columns}) VALUES ({placeholders}) ON CONFLICT (id) DO UPDATE SET {updates};"
+        query = upsert_statement("elements", tuple(element_dict_cleaned.keys()))
         await self.execute_sql(query=query, parameters=element_dict_cleaned)
 
     @queue_until_user_message()
@@ -713,28 +1093,7 @@ class SQLAlchemyDataLayer(BaseDataLayer):
             )
 
         steps_feedbacks_query = f"""
-            SELECT
-                s."id" AS step_id,
-                s."name" AS step_name,
-                s."type" AS step_type,
-                s."threadId" AS step_threadid,
-                s."parentId" AS step_parentid,
-                s."streaming" AS step_streaming,
-                s."waitForAnswer" AS step_waitforanswer,
-                s."isError" AS step_iserror,
-                s."metadata" AS step_metadata,
-                s."tags" AS step_tags,
-                s."input" AS step_input,
-                s."output" AS step_output,
-                s."createdAt" AS step_createdat,
-                s."start" AS step_start,
-                s."end" AS step_end,
-                s."generation" AS step_generation,
-                s."showInput" AS step_showinput,
-                s."language" AS step_language,
-                f."value" AS feedback_value,
-                f."comment" AS feedback_comment,
-                f."id" AS feedback_id
+            SELECT {STEP_FEEDBACK_COLUMNS}
             FROM steps s LEFT JOIN feedbacks f ON s."id" = f."forId"
             WHERE s."threadId" IN {thread_ids}
             ORDER BY s."createdAt" ASC
@@ -744,21 +1103,7 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         )
 
         elements_query = f"""
-            SELECT
-                e."id" AS element_id,
-                e."threadId" as element_threadid,
-                e."type" AS element_type,
-                e."chainlitKey" AS element_chainlitkey,
-                e."url" AS element_url,
-                e."objectKey" as element_objectkey,
-                e."name" AS element_name,
-                e."display" AS element_display,
-                e."size" AS element_size,
-                e."language" AS element_language,
-                e."page" AS element_page,
-                e."forId" AS element_forid,
-                e."mime" AS element_mime,
-                e."props" AS props
+            SELECT {ELEMENT_COLUMNS}
             FROM elements e
             WHERE e."threadId" IN {thread_ids}
         """
@@ -782,72 +1127,83 @@ class SQLAlchemyDataLayer(BaseDataLayer):
         # Process steps_feedbacks to populate the steps in the corresponding ThreadDict
         if isinstance(steps_feedbacks, list):
             for step_feedback in steps_feedbacks:
-                thread_id = step_feedback["step_threadid"]
-                if thread_id is not None:
-                    feedback = None
-                    if step_feedback["feedback_value"] is not None:
-                        feedback = FeedbackDict(
-                            forId=step_feedback["step_id"],
-                            id=step_feedback.get("feedback_id"),
-                            value=step_feedback["feedback_value"],
-                            comment=step_feedback.get("feedback_comment"),
-                        )
-                    step_dict = StepDict(
-                        id=step_feedback["step_id"],
-                        name=step_feedback["step_name"],
-                        type=step_feedback["step_type"],
-                        threadId=thread_id,
-                        parentId=step_feedback.get("step_parentid"),
-                        streaming=step_feedback.get("step_streaming", False),
-                        waitForAnswer=step_feedback.get("step_waitforanswer"),
-                        isError=step_feedback.get("step_iserror"),
-                        metadata=(
-                            step_feedback["step_metadata"]
-                            if step_feedback.get("step_metadata") is not None
-                            else {}
-                        ),
-                        tags=step_feedback.get("step_tags"),
-                        input=(
-                            step_feedback.get("step_input", "")
-                            if step_feedback.get("step_showinput")
-                            not in [None, "false"]
-                            else ""
-                        ),
-                        output=step_feedback.get("step_output", ""),
-                        createdAt=step_feedback.get("step_createdat"),
-                        start=step_feedback.get("step_start"),
-                        end=step_feedback.get("step_end"),
-                        generation=step_feedback.get("step_generation"),
-                        showInput=step_feedback.get("step_showinput"),
-                        language=step_feedback.get("step_language"),
-                        feedback=feedback,
-                    )
+                if step_feedback["step_threadid"] is not None:
+                    step_dict = self._step_dict_from_row(step_feedback)
                     # Append the step to the steps list of the corresponding ThreadDict
-                    thread_dicts[thread_id]["steps"].append(step_dict)
+                    thread_dicts[step_dict["threadId"]]["steps"].append(step_dict)
 
         if isinstance(elements, list):
-            for element in elements:
-                thread_id = element["element_threadid"]
-                if thread_id is not None:
-                    element_url: str | None = None
-                    object_key_val = element.get("element_objectkey")
-                    if (
-                        self.storage_provider is not None
-                        and isinstance(object_key_val, str)
-                        and object_key_val.strip()
-                    ):
-                        try:
-                            element_url = await self.storage_provider.get_read_url(
-                                object_key=object_key_val,
-                            )
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to get read URL for object_key '{object_key_val}': {e}. Falling back to stored URL."
-                            )
-                            element_url = element.get("element_url")
-                    else:
-                        element_url = element.get("element_url")
-                    element_dict = ElementDict(
+            for element_dict in await self._element_dicts_from_rows(elements):
+                thread_dicts[element_dict["threadId"]]["elements"].append(  # type: ignore
+                    element_dict
+                )
+
+        return list(thread_dicts.values())
+
+    def _step_dict_from_row(self, step_feedback: Dict[str, Any]) -> StepDict:
+        """Step of a row selected with STEP_FEEDBACK_COLUMNS."""
+        feedback = None
+        if step_feedback["feedback_value"] is not None:
+            feedback = FeedbackDict(
+                forId=step_feedback["step_id"],
+                id=step_feedback.get("feedback_id"),
+                value=step_feedback["feedback_value"],
+                comment=step_feedback.get("feedback_comment"),
+            )
+        return StepDict(
+            id=step_feedback["step_id"],
+            name=step_feedback["step_name"],
+            type=step_feedback["step_type"],
+            threadId=step_feedback["step_threadid"],
+            parentId=step_feedback.get("step_parentid"),
+            streaming=step_feedback.get("step_streaming", False),
+            waitForAnswer=step_feedback.get("step_waitforanswer"),
+            isError=step_feedback.get("step_iserror"),
+            metadata=(
+                step_feedback["step_metadata"]
+                if step_feedback.get("step_metadata") is not None
+                else {}
+            ),
+            tags=step_feedback.get("step_tags"),
+            input=(
+                step_feedback.get("step_input", "")
+                if step_feedback.get("step_showinput") not in [None, "false"]
+                else ""
+            ),
+            output=step_feedback.get("step_output", ""),
+            createdAt=step_feedback.get("step_createdat"),
+            start=step_feedback.get("step_start"),
+            end=step_feedback.get("step_end"),
+            generation=step_feedback.get("step_generation"),
+            showInput=step_feedback.get("step_showinput"),
+            language=step_feedback.get("step_language"),
+            feedback=feedback,
+        )
+
+    async def _element_dicts_from_rows(
+        self, elements: List[Dict[str, Any]]
+    ) -> List[ElementDict]:
+        """Elements of rows selected with ELEMENT_COLUMNS, with signed URLs."""
+        # Sign the element URLs concurrently, falling back to the stored URL
+        read_urls: Dict[str, str] = {}
+        if self.storage_provider is not None:
+            read_urls = await self.storage_provider.get_read_urls(
+                object_key
+                for element in elements
+                if isinstance(object_key := element.get("element_objectkey"), str)
+                and object_key.strip()
+            )
+
+        element_dicts = []
+        for element in elements:
+            thread_id = element["element_threadid"]
+            if thread_id is not None:
+                element_url: str | None = read_urls.get(
+                    element.get("element_objectkey") or "",
+                    element.get("element_url"),
+                )
+                element_dicts.append(
+                    ElementDict(
                         id=element["element_id"],
                         threadId=thread_id,
                         type=element["element_type"],
@@ -865,15 +1221,77 @@ class SQLAlchemyDataLayer(BaseDataLayer):
                         forId=element.get("element_forid"),
                         mime=element.get("element_mime"),
                     )
-                    thread_dicts[thread_id]["elements"].append(element_dict)  # type: ignore
+                )
+        return element_dicts
 
-        return list(thread_dicts.values())
+    async def create_favorites_table(self):
+        """
+        Create the `favorites` table if it is missing, and index the steps
+        already marked as favorite in their metadata.
+        """
+        for statement in FAVORITES_SCHEMA:
+            await self.execute_sql(statement, {})
+
+        await self.execute_sql(
+            """
+            INSERT INTO favorites ("stepId", "threadId", "userId")
+            SELECT s."id", s."threadId", t."userId"
+            FROM steps s
+                     JOIN threads t ON s."threadId" = t."id"
+            WHERE t."userId" IS NOT NULL
+              AND s."metadata" LIKE :favorite_pattern
+            ON CONFLICT ("stepId") DO NOTHING
+            """,
+            {"favorite_pattern": FAVORITE_PATTERN},
+        )
+
+    async def set_step_favorite(self, step_dict: "StepDict", favorite: bool):
+        step_dict = await super().set_step_favorite(step_dict, favorite)
+
+        if not self.favorites_table:
+            return step_dict
+
+        if favorite:
+            await self.execute_sql(
+                """
+                INSERT INTO favorites ("stepId", "threadId", "userId")
+                SELECT :step_id, t."id", t."userId"
+                FROM threads t
+                WHERE t."id" = :thread_id
+                  AND t."userId" IS NOT NULL
+                ON CONFLICT ("stepId") DO NOTHING
+                """,
+                {"step_id": step_dict["id"], "thread_id": step_dict["threadId"]},
+            )
+        else:
+            await self.execute_sql(
+                """DELETE FROM favorites WHERE "stepId" = :step_id""",
+                {"step_id": step_dict["id"]},
+            )
+
+        return step_dict
 
     async def get_favorite_steps(self, user_id: str) -> List[StepDict]:
         if self.show_logger:
             logger.info(f"SQLAlchemy: get_favorite_steps, user_id={user_id}")
 
-        query = """
+        if self.favorites_table:
+            source = """
+                FROM favorites f
+                         JOIN steps s ON s."id" = f."stepId"
+                WHERE f."userId" = :user_id
+            """
+            parameters = {"user_id": user_id}
+        else:
+            source = """
+                FROM steps s
+                         JOIN threads t ON s."threadId" = t.id
+                WHERE t."userId" = :user_id
+                  AND s."metadata" LIKE :favorite_pattern
+            """
+            parameters = {"user_id": user_id, "favorite_pattern": FAVORITE_PATTERN}
+
+        query = f"""
                 SELECT
                     s."id" AS step_id,
                     s."name" AS step_name,
@@ -893,16 +1311,11 @@ class SQLAlchemyDataLayer(BaseDataLayer):
                     s."generation" AS step_generation,
                     s."showInput" AS step_showinput,
                     s."language" AS step_language
-                FROM steps s
-                         JOIN threads t ON s."threadId" = t.id
-                WHERE t."userId" = :user_id
-                  AND s."metadata" LIKE :favorite_pattern
-                ORDER BY s."createdAt" DESC \
+                {source}
+                ORDER BY s."createdAt" DESC
                 """
 
-        result = await self.execute_sql(
-            query, {"user_id": user_id, "favorite_pattern": '%"favorite": true%'}
-        )
+        result = await self.execute_sql(query, parameters)
 
         steps = []
         if isinstance(result, list):
@@ -7,7 +7,12 @@ from azure.storage.filedatalake import (
     FileSystemClient,
 )
 
-from chainlit.data.storage_clients.base import BaseStorageClient
+from chainlit import make_async
+from chainlit.data.storage_clients.base import (
+    BaseStorageClient,
+    UploadSource,
+    iter_chunks,
+)
 from chainlit.logger import logger
 
 if TYPE_CHECKING:
@@ -83,6 +88,52 @@ class AzureStorageClient(BaseStorageClient):
             logger.warning(f"AzureStorageClient, upload_file error: {e}")
             return {}
 
+    async def upload_stream(
+        self,
+        object_key: str,
+        source: UploadSource,
+        mime: str = "application/octet-stream",
+        overwrite: bool = True,
+        content_disposition: str | None = None,
+    ) -> Dict[str, Any]:
+        """Append the source to the file chunk by chunk, then flush it once."""
+        try:
+            file_client: DataLakeFileClient = self.container_client.get_file_client(
+                object_key
+            )
+
+            if not overwrite and await make_async(file_client.exists)():
+                raise Exception(
+                    f"File {object_key} already exists and overwrite is False"
+                )
+
+            content_settings = ContentSettings(
+                content_type=mime, content_disposition=content_disposition
+            )
+            await make_async(file_client.create_file)(content_settings=content_settings)
+
+            offset = 0
+            async for chunk in iter_chunks(source):
+                await make_async(file_client.append_data)(
+                    chunk, offset=offset, length=len(chunk)
+                )
+                offset += len(chunk)
+
+            # Flushing commits the appended data, content settings are kept
+            await make_async(file_client.flush_data)(
+                offset, content_settings=content_settings
+            )
+
+            url = (
+                f"{file_client.url}{self.sas_token}"
+                if self.sas_token
+                else file_client.url
+            )
+            return {"object_key": object_key, "url": url}
+        except Exception as e:
+            logger.warning(f"AzureStorageClient, upload_stream error: {e}")
+            return {}
+
     async def close(self) -> None:
         self.container_client.close()
         self.data_lake_client.close()
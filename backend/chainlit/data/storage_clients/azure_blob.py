@@ -1,10 +1,22 @@
+import base64
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Union
-
-from azure.storage.blob import BlobSasPermissions, ContentSettings, generate_blob_sas
+from typing import Any, Dict, List, Union
+
+from azure.core import MatchConditions
+from azure.storage.blob import (
+    BlobBlock,
+    BlobSasPermissions,
+    ContentSettings,
+    generate_blob_sas,
+)
 from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 
-from chainlit.data.storage_clients.base import BaseStorageClient, storage_expiry_time
+from chainlit.data.storage_clients.base import (
+    BaseStorageClient,
+    UploadSource,
+    iter_chunks,
+    storage_expiry_time,
+)
 from chainlit.logger import logger
 
 
@@ -69,22 +81,62 @@ class AzureBlobStorageClient(BaseStorageClient):
                 data, overwrite=overwrite, content_settings=content_settings
             )
 
-            properties = await blob_client.get_blob_properties()
+            return await self._get_upload_result(blob_client, object_key)
+
+        except Exception as e:
+            raise Exception(f"Failed to upload file to Azure Blob Storage: {e!s}")
+
+    async def upload_stream(
+        self,
+        object_key: str,
+        source: UploadSource,
+        mime: str = "application/octet-stream",
+        overwrite: bool = True,
+        content_disposition: str | None = None,
+    ) -> Dict[str, Any]:
+        """Stage the source block by block and commit them, one block in memory at a time."""
+        try:
+            blob_client = self.container_client.get_blob_client(object_key)
+
+            block_list: List[BlobBlock] = []
+            async for chunk in iter_chunks(source):
+                # Block ids of a blob must all have the same length
+                block_id = base64.b64encode(f"{len(block_list):08d}".encode()).decode()
+                await blob_client.stage_block(block_id, chunk, length=len(chunk))
+                block_list.append(BlobBlock(block_id=block_id))
 
-            return {
-                "path": object_key,
-                "object_key": object_key,
-                "url": await self.get_read_url(object_key),
-                "size": properties.size,
-                "last_modified": properties.last_modified,
-                "etag": properties.etag,
-                "content_type": properties.content_settings.content_type,
-            }
+            content_settings = ContentSettings(
+                content_type=mime, content_disposition=content_disposition
+            )
+            conditions: Dict[str, Any] = (
+                {}
+                if overwrite
+                else {"etag": "*", "match_condition": MatchConditions.IfMissing}
+            )
+            await blob_client.commit_block_list(
+                block_list, content_settings=content_settings, **conditions
+            )
+
+            return await self._get_upload_result(blob_client, object_key)
 
         except Exception as e:
             raise Exception(f"Failed to upload file to Azure Blob Storage: {e!s}")
 
+    async def _get_upload_result(self, blob_client, object_key: str) -> Dict[str, Any]:
+        properties = await blob_client.get_blob_properties()
+
+        return {
+            "path": object_key,
+            "object_key": object_key,
+            "url": await self.get_read_url(object_key),
+            "size": properties.size,
+            "last_modified": properties.last_modified,
+            "etag": properties.etag,
+            "content_type": properties.content_settings.content_type,
+        }
+
     async def delete_file(self, object_key: str) -> bool:
+        self.read_url_cache.invalidate(object_key)
         try:
             blob_client = self.container_client.get_blob_client(blob=object_key)
             await blob_client.delete_blob()
@@ -1,9 +1,128 @@
+import asyncio
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Union
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiofiles
+
+from chainlit.logger import logger
 
 storage_expiry_time = int(os.getenv("STORAGE_EXPIRY_TIME", 3600))
 
+# Maximum number of read URLs signed concurrently
+read_url_concurrency = int(os.getenv("STORAGE_READ_URL_CONCURRENCY", 16))
+
+# Size of the parts streamed to the storage providers (S3 parts must be >= 5 MiB)
+upload_chunk_size = int(os.getenv("STORAGE_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+
+# A local file path or an async iterator of bytes
+UploadSource = Union[str, "os.PathLike[str]", AsyncIterable[bytes]]
+
+
+async def iter_file(
+    path: Union[str, "os.PathLike[str]"], chunk_size: int = upload_chunk_size
+) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
+
+async def iter_chunks(
+    source: UploadSource, chunk_size: int = upload_chunk_size
+) -> AsyncIterator[bytes]:
+    """Read an upload source in chunks of `chunk_size` bytes, the last one may be smaller."""
+    if isinstance(source, (str, os.PathLike)):
+        source = iter_file(source, chunk_size)
+
+    buffer = bytearray()
+    async for data in source:
+        buffer += data
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+
+    if buffer:
+        yield bytes(buffer)
+
+
+async def next_chunk(chunks: AsyncIterator[bytes]) -> Optional[bytes]:
+    """Next chunk of an iterator, None once exhausted."""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class ReadUrlCache:
+    """
+    LRU cache of signed read URLs by object key.
+
+    URLs are reused for half of `storage_expiry_time`, so a URL handed out
+    from the cache stays valid for at least the other half.
+    """
+
+    def __init__(self, ttl: float = storage_expiry_time / 2, max_size: int = 10_000):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, object_key: str) -> Optional[str]:
+        entry = self._entries.get(object_key)
+
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[object_key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(object_key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, object_key: str, url: str):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        self._entries[object_key] = (url, time.monotonic() + self.ttl)
+        self._entries.move_to_end(object_key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, object_key: str):
+        """Forget the URL of an object, e.g. once it is deleted."""
+        self._entries.pop(object_key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
 
 class BaseStorageClient(ABC):
     """Base class for non-text data persistence like Azure Data Lake, S3, Google Storage, etc."""
@@ -19,6 +138,32 @@ class BaseStorageClient(ABC):
     ) -> Dict[str, Any]:
         pass
 
+    async def upload_stream(
+        self,
+        object_key: str,
+        source: UploadSource,
+        mime: str = "application/octet-stream",
+        overwrite: bool = True,
+        content_disposition: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a file path or an async iterator of bytes.
+
+        Providers override it to send the content in parts and keep memory bounded,
+        this fallback buffers the whole content for `upload_file`.
+        """
+        data = bytearray()
+        async for chunk in iter_chunks(source):
+            data += chunk
+
+        return await self.upload_file(
+            object_key=object_key,
+            data=bytes(data),
+            mime=mime,
+            overwrite=overwrite,
+            content_disposition=content_disposition,
+        )
+
     @abstractmethod
     async def delete_file(self, object_key: str) -> bool:
         pass
@@ -27,6 +172,47 @@ class BaseStorageClient(ABC):
     async def get_read_url(self, object_key: str) -> str:
         pass
 
+    @property
+    def read_url_cache(self) -> ReadUrlCache:
+        # Created lazily, subclasses don't call the base constructor
+        if (cache := self.__dict__.get("_read_url_cache")) is None:
+            cache = self.__dict__["_read_url_cache"] = ReadUrlCache()
+        return cache
+
+    async def get_read_urls(self, object_keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Signed read URLs of several objects, by object key.
+
+        Cache misses are signed concurrently, `read_url_concurrency` at a time.
+        Objects that could not be signed (get_read_url raised) are left out of the
+        result and not cached. Clients invalidate the URL of the objects they delete.
+        """
+        urls: Dict[str, str] = {}
+        missing = []
+        for object_key in dict.fromkeys(object_keys):
+            if (url := self.read_url_cache.get(object_key)) is not None:
+                urls[object_key] = url
+            else:
+                missing.append(object_key)
+
+        semaphore = asyncio.Semaphore(read_url_concurrency)
+
+        async def sign(object_key: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.get_read_url(object_key)
+                except Exception as e:
+                    logger.warning(f"Failed to get read URL for '{object_key}': {e}")
+                    return None
+
+        signed = await asyncio.gather(*(sign(object_key) for object_key in missing))
+        for object_key, url in zip(missing, signed):
+            if url is not None:
+                self.read_url_cache.set(object_key, url)
+                urls[object_key] = url
+
+        return urls
+
     @abstractmethod
     async def close(self) -> None:
         pass
@@ -5,7 +5,14 @@ from google.cloud import storage  # type: ignore
 from google.oauth2 import service_account
 
 from chainlit import make_async
-from chainlit.data.storage_clients.base import BaseStorageClient, storage_expiry_time
+from chainlit.data.storage_clients.base import (
+    BaseStorageClient,
+    UploadSource,
+    iter_chunks,
+    next_chunk,
+    storage_expiry_time,
+    upload_chunk_size,
+)
 from chainlit.logger import logger
 
 
@@ -89,6 +96,50 @@ class GCSStorageClient(BaseStorageClient):
             object_key, data, mime, overwrite
         )
 
+    async def upload_stream(
+        self,
+        object_key: str,
+        source: UploadSource,
+        mime: str = "application/octet-stream",
+        overwrite: bool = True,
+        content_disposition: str | None = None,
+    ) -> Dict[str, Any]:
+        """Upload the source with a resumable upload, one chunk in memory at a time."""
+        chunks = iter_chunks(source)
+        first_chunk = await next_chunk(chunks) or b""
+        second_chunk = await next_chunk(chunks)
+
+        if second_chunk is None:
+            return await self.upload_file(object_key, first_chunk, mime, overwrite)
+
+        try:
+            blob = self.bucket.blob(object_key)
+
+            if not overwrite and await make_async(blob.exists)():
+                raise Exception(
+                    f"File {object_key} already exists and overwrite is False"
+                )
+
+            # Resumable upload chunks must be a multiple of 256 KiB
+            chunk_size = -(-upload_chunk_size // (256 * 1024)) * 256 * 1024
+            writer = await make_async(blob.open)(
+                "wb", content_type=mime, chunk_size=chunk_size
+            )
+            await make_async(writer.write)(first_chunk)
+            await make_async(writer.write)(second_chunk)
+            async for chunk in chunks:
+                await make_async(writer.write)(chunk)
+            # Finalizes the upload, unfinished ones are never committed
+            await make_async(writer.close)()
+
+            return {
+                "object_key": object_key,
+                "url": await self.get_read_url(object_key),
+            }
+
+        except Exception as e:
+            raise Exception(f"Failed to upload file to GCS: {e!s}")
+
     def sync_delete_file(self, object_key: str) -> bool:
         try:
             self.bucket.blob(object_key).delete()
@@ -98,6 +149,7 @@ class GCSStorageClient(BaseStorageClient):
             return False
 
     async def delete_file(self, object_key: str) -> bool:
+        self.read_url_cache.invalidate(object_key)
         return await make_async(self.sync_delete_file)(object_key)
 
     async def close(self) -> None:
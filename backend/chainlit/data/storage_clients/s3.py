@@ -1,10 +1,16 @@
 import os
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 
 import boto3  # type: ignore
 
 from chainlit import make_async
-from chainlit.data.storage_clients.base import BaseStorageClient, storage_expiry_time
+from chainlit.data.storage_clients.base import (
+    BaseStorageClient,
+    UploadSource,
+    iter_chunks,
+    next_chunk,
+    storage_expiry_time,
+)
 from chainlit.logger import logger
 
 
@@ -22,16 +28,11 @@ class S3StorageClient(BaseStorageClient):
             logger.warning(f"S3StorageClient initialization error: {e}")
 
     def sync_get_read_url(self, object_key: str) -> str:
-        try:
-            url = self.client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.bucket, "Key": object_key},
-                ExpiresIn=storage_expiry_time,
-            )
-            return url
-        except Exception as e:
-            logger.warning(f"S3StorageClient, get_read_url error: {e}")
-            return object_key
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": object_key},
+            ExpiresIn=storage_expiry_time,
+        )
 
     async def get_read_url(self, object_key: str) -> str:
         return await make_async(self.sync_get_read_url)(object_key)
@@ -57,13 +58,16 @@ class S3StorageClient(BaseStorageClient):
                 self.client.put_object(
                     Bucket=self.bucket, Key=object_key, Body=data, ContentType=mime
                 )
-            endpoint = os.environ.get("DEV_AWS_ENDPOINT", "amazonaws.com")
-            url = f"https://{self.bucket}.s3.{endpoint}/{object_key}"
-            return {"object_key": object_key, "url": url}
+            return self._get_upload_result(object_key)
         except Exception as e:
             logger.warning(f"S3StorageClient, upload_file error: {e}")
             return {}
 
+    def _get_upload_result(self, object_key: str) -> Dict[str, Any]:
+        endpoint = os.environ.get("DEV_AWS_ENDPOINT", "amazonaws.com")
+        url = f"https://{self.bucket}.s3.{endpoint}/{object_key}"
+        return {"object_key": object_key, "url": url}
+
     async def upload_file(
         self,
         object_key: str,
@@ -76,6 +80,74 @@ class S3StorageClient(BaseStorageClient):
             object_key, data, mime, overwrite, content_disposition
         )
 
+    async def upload_stream(
+        self,
+        object_key: str,
+        source: UploadSource,
+        mime: str = "application/octet-stream",
+        overwrite: bool = True,
+        content_disposition: str | None = None,
+    ) -> Dict[str, Any]:
+        """Upload the source as a multipart upload, one part in memory at a time."""
+        extra_args = {"ContentType": mime}
+        if content_disposition is not None:
+            extra_args["ContentDisposition"] = content_disposition
+
+        upload_id = None
+        try:
+            chunks = iter_chunks(source)
+            first_chunk = await next_chunk(chunks) or b""
+            second_chunk = await next_chunk(chunks)
+
+            if second_chunk is None:
+                # Fits in a single part
+                return await self.upload_file(
+                    object_key, first_chunk, mime, overwrite, content_disposition
+                )
+
+            upload = await make_async(self.client.create_multipart_upload)(
+                Bucket=self.bucket, Key=object_key, **extra_args
+            )
+            upload_id = upload["UploadId"]
+
+            parts: List[Dict[str, Any]] = []
+
+            async def upload_part(body: bytes):
+                part_number = len(parts) + 1
+                response = await make_async(self.client.upload_part)(
+                    Bucket=self.bucket,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+            await upload_part(first_chunk)
+            await upload_part(second_chunk)
+            async for chunk in chunks:
+                await upload_part(chunk)
+
+            await make_async(self.client.complete_multipart_upload)(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            return self._get_upload_result(object_key)
+        except Exception as e:
+            logger.warning(f"S3StorageClient, upload_stream error: {e}")
+            if upload_id:
+                try:
+                    await make_async(self.client.abort_multipart_upload)(
+                        Bucket=self.bucket, Key=object_key, UploadId=upload_id
+                    )
+                except Exception as abort_error:
+                    logger.warning(
+                        f"S3StorageClient, abort_multipart_upload error: {abort_error}"
+                    )
+            return {}
+
     def sync_delete_file(self, object_key: str) -> bool:
         try:
             self.client.delete_object(Bucket=self.bucket, Key=object_key)
@@ -85,6 +157,7 @@ class S3StorageClient(BaseStorageClient):
             return False
 
     async def delete_file(self, object_key: str) -> bool:
+        self.read_url_cache.invalidate(object_key)
         return await make_async(self.sync_delete_file)(object_key)
 
     async def close(self) -> None:
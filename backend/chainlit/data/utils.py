@@ -1,8 +1,10 @@
 import functools
 from collections import deque
+from typing import Dict, Optional, cast
 
 from chainlit.context import context
 from chainlit.session import WebsocketSession
+from chainlit.types import ThreadDict, ThreadPageDict
 
 
 def queue_until_user_message():
@@ -27,3 +29,58 @@ def queue_until_user_message():
         return wrapper
 
     return decorator
+
+
+def paginate_thread(
+    thread: ThreadDict, limit: int, before: Optional[str] = None
+) -> ThreadPageDict:
+    """
+    Window of a thread: its latest `limit` top-level steps before the `before`
+    step (the end of the thread when None), with their nested steps and elements.
+
+    Elements of steps missing from the thread come with the latest window.
+    """
+    steps = thread["steps"]
+    parents = {step["id"]: step.get("parentId") for step in steps}
+
+    # Top-level ancestor of every step, nested steps stay with their root
+    roots: Dict[str, str] = {}
+    for step in steps:
+        step_id = step["id"]
+        path = []
+        while step_id not in roots:
+            path.append(step_id)
+            parent = parents[step_id]
+            # No parent, a parent missing from the thread or a cycle
+            if parent not in parents or parent in path:
+                roots[step_id] = step_id
+                break
+            step_id = parent
+        for visited in path:
+            roots[visited] = roots[step_id]
+
+    root_ids = [step["id"] for step in steps if roots[step["id"]] == step["id"]]
+    if before is None:
+        end = len(root_ids)
+    else:
+        end = root_ids.index(before) if before in root_ids else 0
+    start = max(0, end - limit)
+
+    window = set(root_ids[start:end])
+    page_steps = [step for step in steps if roots[step["id"]] in window]
+    page_step_ids = {step["id"] for step in page_steps}
+    elements = [
+        element
+        for element in thread.get("elements") or []
+        if element.get("forId") in page_step_ids
+        or (before is None and element.get("forId") not in roots)
+    ]
+
+    page = cast(ThreadPageDict, {**thread})
+    page["steps"] = page_steps
+    page["elements"] = elements
+    page["stepsPageInfo"] = {
+        "hasOlderSteps": start > 0,
+        "olderStepsCursor": root_ids[start] if start > 0 else None,
+    }
+    return page
@@ -0,0 +1,248 @@
+import asyncio
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Tuple
+
+from chainlit.context import ChainlitContext, context_var
+from chainlit.logger import logger
+
+if TYPE_CHECKING:
+    from chainlit.data.base import BaseDataLayer
+    from chainlit.element import Element
+    from chainlit.step import StepDict
+
+WriteOperation = Literal[
+    "create_step", "update_step", "delete_step", "create_element", "delete_element"
+]
+
+
+@dataclass
+class PendingWrite:
+    operation: WriteOperation
+    payload: Any
+    # Context of the caller, the data layer relies on it (queue_until_user_message)
+    context: Optional[ChainlitContext]
+
+
+class WriteBehindQueue:
+    """
+    Buffer step and element writes and persist them to the data layer in batches.
+
+    Writes are keyed by step (or element) id, so successive writes to the same
+    id are coalesced: a pending creation followed by updates is persisted as a
+    single creation with the latest content, and a deletion drops the pending
+    writes. Batches are flushed every `flush_interval` seconds, or as soon as
+    `max_batch_size` writes are pending, one batch at a time to keep writes
+    ordered. When `max_queue_size` writes are pending, callers wait for the
+    next flush instead of piling up tasks.
+    """
+
+    def __init__(
+        self,
+        data_layer: "BaseDataLayer",
+        flush_interval: float = 0.1,
+        max_batch_size: int = 100,
+        max_queue_size: int = 1000,
+    ):
+        self.data_layer = data_layer
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+
+        self._pending: Dict[Tuple[str, str], PendingWrite] = {}
+        self._room = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._has_pending = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.writes_received = 0
+        self.writes_coalesced = 0
+        self.writes_persisted = 0
+        self.batches_flushed = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "writes_received": self.writes_received,
+            "writes_coalesced": self.writes_coalesced,
+            "writes_persisted": self.writes_persisted,
+            "batches_flushed": self.batches_flushed,
+            "pending_writes": len(self._pending),
+        }
+
+    async def create_step(self, step_dict: "StepDict"):
+        await self._enqueue(("step", step_dict["id"]), "create_step", step_dict)
+
+    async def update_step(self, step_dict: "StepDict"):
+        await self._enqueue(("step", step_dict["id"]), "update_step", step_dict)
+
+    async def delete_step(self, step_id: str):
+        await self._enqueue(("step", step_id), "delete_step", step_id)
+
+    async def create_element(self, element: "Element"):
+        await self._enqueue(("element", element.id), "create_element", element)
+
+    async def delete_element(self, element_id: str, thread_id: Optional[str] = None):
+        await self._enqueue(
+            ("element", element_id), "delete_element", (element_id, thread_id)
+        )
+
+    async def _enqueue(
+        self, key: Tuple[str, str], operation: WriteOperation, payload: Any
+    ):
+        write = PendingWrite(operation, payload, context_var.get(None))
+        self.writes_received += 1
+
+        if self._closed:
+            # Shutting down, persist right away
+            await self._persist([write])
+            return
+
+        async with self._room:
+            while (
+                key not in self._pending and len(self._pending) >= self.max_queue_size
+            ):
+                self._batch_ready.set()
+                await self._room.wait()
+
+            if previous := self._pending.get(key):
+                self.writes_coalesced += 1
+                if previous.operation == "create_step" and operation == "update_step":
+                    # The step is not persisted yet, create it with its latest content
+                    write.operation = "create_step"
+
+            self._pending[key] = write
+
+            self._has_pending.set()
+            if len(self._pending) >= self.max_batch_size:
+                self._batch_ready.set()
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closed:
+            await self._has_pending.wait()
+            if not self._closed:
+                try:
+                    await asyncio.wait_for(
+                        self._batch_ready.wait(), timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_batch()
+
+    async def _flush_batch(self) -> int:
+        async with self._flush_lock:
+            async with self._room:
+                keys = list(islice(self._pending, self.max_batch_size))
+                batch = [self._pending.pop(key) for key in keys]
+
+                if len(self._pending) < self.max_batch_size:
+                    self._batch_ready.clear()
+                if not self._pending:
+                    self._has_pending.clear()
+                self._room.notify_all()
+
+            if batch:
+                await self._persist(batch)
+                self.batches_flushed += 1
+
+            return len(batch)
+
+    async def flush(self):
+        """Persist every pending write."""
+        while await self._flush_batch():
+            pass
+
+    async def close(self):
+        """Stop batching and drain the pending writes."""
+        self._closed = True
+        self._has_pending.set()
+        self._batch_ready.set()
+
+        if self._worker:
+            try:
+                await self._worker
+            except Exception as e:
+                logger.error(f"Write-behind worker failed: {e!s}")
+
+        await self.flush()
+
+    async def _persist(self, batch: List[PendingWrite]):
+        # Data layer methods resolve the session from the context, group per session
+        groups: Dict[Optional[str], List[PendingWrite]] = {}
+        for write in batch:
+            session_id = write.context.session.id if write.context else None
+            groups.setdefault(session_id, []).append(write)
+
+        for writes in groups.values():
+            token = context_var.set(writes[0].context) if writes[0].context else None
+            try:
+                await self._persist_session_writes(writes)
+            finally:
+                if token:
+                    context_var.reset(token)
+
+        self.writes_persisted += len(batch)
+
+    async def _persist_session_writes(self, writes: List[PendingWrite]):
+        creates = [w.payload for w in writes if w.operation == "create_step"]
+        updates = [w.payload for w in writes if w.operation == "update_step"]
+
+        try:
+            if creates:
+                await self.data_layer.create_steps(creates)
+            if updates:
+                await self.data_layer.update_steps(updates)
+        except Exception as e:
+            logger.error(f"Failed to persist steps: {e!s}")
+
+        for write in writes:
+            try:
+                if write.operation == "delete_step":
+                    await self.data_layer.delete_step(write.payload)
+                elif write.operation == "create_element":
+                    await self.data_layer.create_element(write.payload)
+                elif write.operation == "delete_element":
+                    await self.data_layer.delete_element(*write.payload)
+            except Exception as e:
+                logger.error(f"Failed to persist {write.operation}: {e!s}")
+
+
+_write_behind_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind_queue() -> Optional[WriteBehindQueue]:
+    """Return the write-behind queue, if enabled and a data layer is configured."""
+    global _write_behind_queue
+
+    from chainlit.config import config
+    from chainlit.data import get_data_layer
+
+    settings = config.project.write_behind
+    if not settings.enabled:
+        return None
+
+    if _write_behind_queue is None:
+        if not (data_layer := get_data_layer()):
+            return None
+
+        _write_behind_queue = WriteBehindQueue(
+            data_layer,
+            flush_interval=settings.flush_interval_ms / 1000,
+            max_batch_size=settings.max_batch_size,
+            max_queue_size=settings.max_queue_size,
+        )
+
+    return _write_behind_queue
+
+
+async def close_write_behind_queue():
+    """Drain and forget the write-behind queue."""
+    global _write_behind_queue
+
+    if _write_behind_queue:
+        await _write_behind_queue.close()
+        _write_behind_queue = None
@@ -21,8 +21,10 @@ from pydantic import Field
 from pydantic.dataclasses import dataclass
 from syncer import asyncio
 
+from chainlit.config import config
 from chainlit.context import context
 from chainlit.data import get_data_layer
+from chainlit.data.write_behind import get_write_behind_queue
 from chainlit.logger import logger
 
 mime_types = {
@@ -213,7 +215,10 @@ class Element:
 
         if (data_layer := get_data_layer()) and persist:
             try:
-                asyncio.create_task(data_layer.create_element(self))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.create_element(self)
+                else:
+                    asyncio.create_task(data_layer.create_element(self))
             except Exception as e:
                 logger.error(f"Failed to create element: {e!s}")
         if not self.url and (not self.chainlit_key or self.updatable):
@@ -222,6 +227,7 @@ class Element:
                 path=self.path,
                 content=self.content,
                 mime=self.mime or "",
+                reference=config.project.reference_local_files,
             )
             self.chainlit_key = file_dict["id"]
 
@@ -231,7 +237,9 @@ class Element:
 
     async def remove(self):
         data_layer = get_data_layer()
-        if data_layer:
+        if write_behind := get_write_behind_queue():
+            await write_behind.delete_element(self.id, self.thread_id)
+        elif data_layer:
             await data_layer.delete_element(self.id, self.thread_id)
         await context.emitter.emit("remove_element", {"id": self.id})
 
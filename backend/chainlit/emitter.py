@@ -4,15 +4,18 @@ from typing import Any, Dict, List, Literal, Optional, Union, cast, get_args
 
 from socketio.exceptions import TimeoutError
 
+from chainlit.audio_pipeline import get_audio_output_buffer
 from chainlit.chat_context import chat_context
 from chainlit.config import config
 from chainlit.data import get_data_layer
+from chainlit.data.acl import get_thread_author_cache
 from chainlit.element import Element, ElementDict, File
 from chainlit.logger import logger
 from chainlit.message import Message
 from chainlit.mode import Mode
 from chainlit.session import BaseSession, WebsocketSession
 from chainlit.step import StepDict
+from chainlit.stream_coalescer import get_stream_coalescer
 from chainlit.types import (
     AskActionResponse,
     AskElementResponse,
@@ -139,6 +142,10 @@ class BaseChainlitEmitter:
         """Stub method to send a message token to the UI."""
         pass
 
+    async def flush_tokens(self):
+        """Stub method to send the buffered tokens to the UI."""
+        pass
+
     async def set_chat_settings(self, settings: dict):
         """Stub method to set chat settings."""
         pass
@@ -216,28 +223,37 @@ class ChainlitEmitter(BaseChainlitEmitter):
         await self.emit("audio_connection", state)
 
     async def send_audio_chunk(self, chunk: OutputAudioChunk):
-        """Send an audio chunk to the UI."""
-        await self.emit("audio_chunk", chunk)
+        """Send an audio chunk to the UI, through the audio output buffer if enabled."""
+        if buffer := get_audio_output_buffer(self.session):
+            await buffer.add_chunk(chunk)
+        else:
+            await self.emit("audio_chunk", chunk)
 
     async def send_audio_interrupt(self):
         """Method to interrupt the current audio response."""
+        if buffer := get_audio_output_buffer(self.session):
+            # The buffered audio belongs to the interrupted response
+            buffer.discard()
         await self.emit("audio_interrupt", {})
 
     async def send_element(self, element_dict: ElementDict):
         """Stub method to send an element to the UI."""
         await self.emit("element", element_dict)
 
-    def send_step(self, step_dict: StepDict):
+    async def send_step(self, step_dict: StepDict):
         """Send a message to the UI."""
-        return self.emit("new_message", step_dict)
+        await self.flush_tokens()
+        await self.emit("new_message", step_dict)
 
-    def update_step(self, step_dict: StepDict):
+    async def update_step(self, step_dict: StepDict):
         """Update a message in the UI."""
-        return self.emit("update_message", step_dict)
+        await self.flush_tokens()
+        await self.emit("update_message", step_dict)
 
-    def delete_step(self, step_dict: StepDict):
+    async def delete_step(self, step_dict: StepDict):
         """Delete a message in the UI."""
-        return self.emit("delete_message", step_dict)
+        await self.flush_tokens()
+        await self.emit("delete_message", step_dict)
 
     def send_timeout(self, event: Literal["ask_timeout", "call_fn_timeout"]):
         return self.emit(event, {})
@@ -266,6 +282,11 @@ class ChainlitEmitter(BaseChainlitEmitter):
                     user_id=self._get_thread_user_id(),
                     tags=self._get_thread_tags(),
                 )
+                # The session was authorized for its thread when it connected
+                if self._get_thread_user_id() and self.session.user:
+                    get_thread_author_cache().set(
+                        self.session.thread_id, self.session.user.identifier
+                    )
             except Exception as e:
                 logger.error(f"Error updating thread: {e}")
             asyncio.create_task(self.session.flush_method_queue())
@@ -424,26 +445,38 @@ class ChainlitEmitter(BaseChainlitEmitter):
                             # Get data layer and storage provider for direct URL construction
                             data_layer = get_data_layer()
                             if data_layer and hasattr(data_layer, 'storage_provider') and data_layer.storage_provider:
+                                storage_provider = data_layer.storage_provider
+                                # Build every object_key first, looking up each thread's user once
+                                user_ids: Dict[Optional[str], str] = {}
+                                object_keys: Dict[str, str] = {}
                                 for element in elements:
-                                    try:
-                                        # Construct object_key directly (same pattern as in create_element)
+                                    if element.thread_id not in user_ids:
                                         user_id = "unknown"  # Default user_id as used in data_layer
                                         if hasattr(data_layer, '_get_user_id_by_thread'):
                                             try:
                                                 user_id = await data_layer._get_user_id_by_thread(element.thread_id) or "unknown"
                                             except:
                                                 pass
-                                        
-                                        # Build object_key matching the pattern from create_element
-                                        object_key = f"{user_id}/{element.id}"
-                                        if element.name:
-                                            object_key += f"/{element.name}"
-                                        
-                                        # Get SAS token directly from storage provider
-                                        sas_token = await data_layer.storage_provider.get_read_url(object_key)
+                                        user_ids[element.thread_id] = user_id
+
+                                    # Build object_key matching the pattern from create_element
+                                    object_key = f"{user_ids[element.thread_id]}/{element.id}"
+                                    if element.name:
+                                        object_key += f"/{element.name}"
+                                    object_keys[element.id] = object_key
+
+                                # Get the SAS tokens concurrently, reusing the cached ones
+                                sas_tokens = await storage_provider.get_read_urls(object_keys.values())
+
+                                for element in elements:
+                                    try:
+                                        object_key = object_keys[element.id]
+                                        if object_key not in sas_tokens:
+                                            logger.error(f"Failed to get SAS token for element {element.id}")
+                                            continue
+                                        sas_token = sas_tokens[object_key]
                                         
                                         # Construct base URL (matching the pattern from AzureBlobStorageClient)
-                                        storage_provider = data_layer.storage_provider
                                         if hasattr(storage_provider, 'blob_endpoint') and storage_provider.blob_endpoint:
                                             base_url = f"{storage_provider.blob_endpoint}/{storage_provider.container_name}/{object_key}"
                                         elif hasattr(storage_provider, 'storage_account') and hasattr(storage_provider, 'container_name'):
@@ -518,24 +551,36 @@ class ChainlitEmitter(BaseChainlitEmitter):
         """
         return self.emit("task_start", {})
 
-    def task_end(self):
+    async def task_end(self):
         """Send a task end signal to the UI."""
-        return self.emit("task_end", {})
+        await self.flush_tokens()
+        await self.emit("task_end", {})
 
-    def stream_start(self, step_dict: StepDict):
+    async def stream_start(self, step_dict: StepDict):
         """Send a stream start signal to the UI."""
-        return self.emit(
+        await self.flush_tokens()
+        await self.emit(
             "stream_start",
             step_dict,
         )
 
     def send_token(self, id: str, token: str, is_sequence=False, is_input=False):
         """Send a message token to the UI."""
+        if coalescer := get_stream_coalescer(self.session):
+            return coalescer.add_token(
+                id=id, token=token, is_sequence=is_sequence, is_input=is_input
+            )
+
         return self.emit(
             "stream_token",
             {"id": id, "token": token, "isSequence": is_sequence, "isInput": is_input},
         )
 
+    async def flush_tokens(self):
+        """Send the tokens buffered by the stream coalescer to the UI."""
+        if coalescer := get_stream_coalescer(self.session):
+            await coalescer.flush()
+
     def set_chat_settings(self, settings: Dict[str, Any]):
         self.session.chat_settings = settings
 
@@ -0,0 +1,61 @@
+import asyncio
+import importlib.util
+import os
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+# Connections kept open across requests, and for how long (in seconds) when idle
+max_connections = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+max_keepalive_connections = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 20))
+keepalive_expiry = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", 30))
+
+# Timeouts (in seconds) to connect, and to read, write or wait for a connection
+connect_timeout = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", 10))
+timeout = float(os.getenv("HTTP_CLIENT_TIMEOUT", 30))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        # The client is shared by every user: never store the cookies of a response,
+        # they would be sent along with the requests made for other users
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        # HTTP/2 needs the optional h2 package (httpx[http2])
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the HTTP client shared by the process, to reuse its connections.
+
+    It is opened with the app and closed on shutdown, callers must not close it.
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    # Connections can't be shared across event loops
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = create_http_client()
+        _http_client_loop = loop
+
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client, _http_client_loop
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _http_client_loop = None
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import time
 import uuid
 from abc import ABC
@@ -12,8 +11,10 @@ from chainlit.chat_context import chat_context
 from chainlit.config import config
 from chainlit.context import context, local_steps
 from chainlit.data import get_data_layer
+from chainlit.data.write_behind import get_write_behind_queue
 from chainlit.element import CustomElement, ElementBased
 from chainlit.logger import logger
+from chainlit.serialization import dumps_content
 from chainlit.step import StepDict
 from chainlit.types import (
     AskActionResponse,
@@ -113,7 +114,10 @@ class MessageBase(ABC):
         data_layer = get_data_layer()
         if data_layer:
             try:
-                asyncio.create_task(data_layer.update_step(step_dict))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.update_step(step_dict)
+                else:
+                    asyncio.create_task(data_layer.update_step(step_dict))
             except Exception as e:
                 if self.fail_on_persist_error:
                     raise e
@@ -132,7 +136,10 @@ class MessageBase(ABC):
         data_layer = get_data_layer()
         if data_layer:
             try:
-                asyncio.create_task(data_layer.delete_step(step_dict["id"]))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.delete_step(step_dict["id"])
+                else:
+                    asyncio.create_task(data_layer.delete_step(step_dict["id"]))
             except Exception as e:
                 if self.fail_on_persist_error:
                     raise e
@@ -147,7 +154,10 @@ class MessageBase(ABC):
         data_layer = get_data_layer()
         if data_layer and not self.persisted:
             try:
-                asyncio.create_task(data_layer.create_step(step_dict))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.create_step(step_dict)
+                else:
+                    asyncio.create_task(data_layer.create_step(step_dict))
                 self.persisted = True
             except Exception as e:
                 if self.fail_on_persist_error:
@@ -231,7 +241,7 @@ class Message(MessageBase):
         self.language = language
         if isinstance(content, dict):
             try:
-                self.content = json.dumps(content, indent=4, ensure_ascii=False)
+                self.content = dumps_content(content)
                 self.language = "json"
             except TypeError:
                 self.content = str(content)
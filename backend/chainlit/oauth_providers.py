@@ -3,9 +3,9 @@ import os
 import urllib.parse
 from typing import Dict, List, Optional, Tuple
 
-import httpx
 from fastapi import HTTPException
 
+from chainlit.http_client import get_http_client
 from chainlit.secret import random_secret
 from chainlit.user import User
 
@@ -78,13 +78,13 @@ class GithubOAuthProvider(OAuthProvider):
             "client_secret": self.client_secret,
             "code": code,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=payload,
-            )
-            response.raise_for_status()
-            return urllib.parse.parse_qs(response.text)
+        client = get_http_client()
+        response = await client.post(
+            self.token_url,
+            data=payload,
+        )
+        response.raise_for_status()
+        return urllib.parse.parse_qs(response.text)
 
     async def get_token(self, code: str, url: str):
         content = await self.get_raw_token_response(code, url)
@@ -94,27 +94,27 @@ class GithubOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get(
-                self.user_info_url,
-                headers={"Authorization": f"token {token}"},
-            )
-            user_response.raise_for_status()
-            github_user = user_response.json()
+        client = get_http_client()
+        user_response = await client.get(
+            self.user_info_url,
+            headers={"Authorization": f"token {token}"},
+        )
+        user_response.raise_for_status()
+        github_user = user_response.json()
 
-            emails_response = await client.get(
-                urllib.parse.urljoin(self.user_info_url + "/", "emails"),
-                headers={"Authorization": f"token {token}"},
-            )
-            emails_response.raise_for_status()
-            emails = emails_response.json()
+        emails_response = await client.get(
+            urllib.parse.urljoin(self.user_info_url + "/", "emails"),
+            headers={"Authorization": f"token {token}"},
+        )
+        emails_response.raise_for_status()
+        emails = emails_response.json()
 
-            github_user.update({"emails": emails})
-            user = User(
-                identifier=github_user["login"],
-                metadata={"image": github_user["avatar_url"], "provider": "github"},
-            )
-            return (github_user, user)
+        github_user.update({"emails": emails})
+        user = User(
+            identifier=github_user["login"],
+            metadata={"image": github_user["avatar_url"], "provider": "github"},
+        )
+        return (github_user, user)
 
 
 class GoogleOAuthProvider(OAuthProvider):
@@ -142,13 +142,13 @@ class GoogleOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            "https://oauth2.googleapis.com/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json = await self.get_raw_token_response(code, url)
@@ -158,18 +158,18 @@ class GoogleOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/userinfo/v2/me",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            google_user = response.json()
-            user = User(
-                identifier=google_user["email"],
-                metadata={"image": google_user["picture"], "provider": "google"},
-            )
-            return (google_user, user)
+        client = get_http_client()
+        response = await client.get(
+            "https://www.googleapis.com/userinfo/v2/me",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        google_user = response.json()
+        user = User(
+            identifier=google_user["email"],
+            metadata={"image": google_user["picture"], "provider": "google"},
+        )
+        return (google_user, user)
 
 
 class AzureADOAuthProvider(OAuthProvider):
@@ -214,13 +214,13 @@ class AzureADOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            self.token_url,
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json = await self.get_raw_token_response(code, url)
@@ -233,38 +233,38 @@ class AzureADOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://graph.microsoft.com/v1.0/me",
+        client = get_http_client()
+        response = await client.get(
+            "https://graph.microsoft.com/v1.0/me",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+
+        azure_user = response.json()
+
+        try:
+            photo_response = await client.get(
+                "https://graph.microsoft.com/v1.0/me/photos/48x48/$value",
                 headers={"Authorization": f"Bearer {token}"},
             )
-            response.raise_for_status()
-
-            azure_user = response.json()
-
-            try:
-                photo_response = await client.get(
-                    "https://graph.microsoft.com/v1.0/me/photos/48x48/$value",
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                photo_data = await photo_response.aread()
-                base64_image = base64.b64encode(photo_data)
-                azure_user["image"] = (
-                    f"data:{photo_response.headers['Content-Type']};base64,{base64_image.decode('utf-8')}"
-                )
-            except Exception:
-                # Ignore errors getting the photo
-                pass
-
-            user = User(
-                identifier=azure_user["userPrincipalName"],
-                metadata={
-                    "image": azure_user.get("image"),
-                    "provider": "azure-ad",
-                    "refresh_token": getattr(self, "_refresh_token", None),
-                },
-            )
-            return (azure_user, user)
+            photo_data = await photo_response.aread()
+            base64_image = base64.b64encode(photo_data)
+            azure_user["image"] = (
+                f"data:{photo_response.headers['Content-Type']};base64,{base64_image.decode('utf-8')}"
+            )
+        except Exception:
+            # Ignore errors getting the photo
+            pass
+
+        user = User(
+            identifier=azure_user["userPrincipalName"],
+            metadata={
+                "image": azure_user.get("image"),
+                "provider": "azure-ad",
+                "refresh_token": getattr(self, "_refresh_token", None),
+            },
+        )
+        return (azure_user, user)
 
 
 class AzureADHybridOAuthProvider(OAuthProvider):
@@ -311,13 +311,13 @@ class AzureADHybridOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            self.token_url,
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json = await self.get_raw_token_response(code, url)
@@ -330,38 +330,38 @@ class AzureADHybridOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://graph.microsoft.com/v1.0/me",
+        client = get_http_client()
+        response = await client.get(
+            "https://graph.microsoft.com/v1.0/me",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+
+        azure_user = response.json()
+
+        try:
+            photo_response = await client.get(
+                "https://graph.microsoft.com/v1.0/me/photos/48x48/$value",
                 headers={"Authorization": f"Bearer {token}"},
             )
-            response.raise_for_status()
-
-            azure_user = response.json()
-
-            try:
-                photo_response = await client.get(
-                    "https://graph.microsoft.com/v1.0/me/photos/48x48/$value",
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                photo_data = await photo_response.aread()
-                base64_image = base64.b64encode(photo_data)
-                azure_user["image"] = (
-                    f"data:{photo_response.headers['Content-Type']};base64,{base64_image.decode('utf-8')}"
-                )
-            except Exception:
-                # Ignore errors getting the photo
-                pass
-
-            user = User(
-                identifier=azure_user["userPrincipalName"],
-                metadata={
-                    "image": azure_user.get("image"),
-                    "provider": "azure-ad",
-                    "refresh_token": getattr(self, "_refresh_token", None),
-                },
-            )
-            return (azure_user, user)
+            photo_data = await photo_response.aread()
+            base64_image = base64.b64encode(photo_data)
+            azure_user["image"] = (
+                f"data:{photo_response.headers['Content-Type']};base64,{base64_image.decode('utf-8')}"
+            )
+        except Exception:
+            # Ignore errors getting the photo
+            pass
+
+        user = User(
+            identifier=azure_user["userPrincipalName"],
+            metadata={
+                "image": azure_user.get("image"),
+                "provider": "azure-ad",
+                "refresh_token": getattr(self, "_refresh_token", None),
+            },
+        )
+        return (azure_user, user)
 
 
 class OktaOAuthProvider(OAuthProvider):
@@ -407,13 +407,13 @@ class OktaOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.domain}/oauth2{self.get_authorization_server_path()}/v1/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            f"{self.domain}/oauth2{self.get_authorization_server_path()}/v1/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json_data = await self.get_raw_token_response(code, url)
@@ -423,19 +423,19 @@ class OktaOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.domain}/oauth2{self.get_authorization_server_path()}/v1/userinfo",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            okta_user = response.json()
+        client = get_http_client()
+        response = await client.get(
+            f"{self.domain}/oauth2{self.get_authorization_server_path()}/v1/userinfo",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        okta_user = response.json()
 
-            user = User(
-                identifier=okta_user.get("email"),
-                metadata={"image": "", "provider": "okta"},
-            )
-            return (okta_user, user)
+        user = User(
+            identifier=okta_user.get("email"),
+            metadata={"image": "", "provider": "okta"},
+        )
+        return (okta_user, user)
 
 
 class Auth0OAuthProvider(OAuthProvider):
@@ -472,13 +472,13 @@ class Auth0OAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.domain}/oauth/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            f"{self.domain}/oauth/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json_content = await self.get_raw_token_response(code, url)
@@ -488,21 +488,21 @@ class Auth0OAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.original_domain}/userinfo",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            auth0_user = response.json()
-            user = User(
-                identifier=auth0_user.get("email"),
-                metadata={
-                    "image": auth0_user.get("picture", ""),
-                    "provider": "auth0",
-                },
-            )
-            return (auth0_user, user)
+        client = get_http_client()
+        response = await client.get(
+            f"{self.original_domain}/userinfo",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        auth0_user = response.json()
+        user = User(
+            identifier=auth0_user.get("email"),
+            metadata={
+                "image": auth0_user.get("picture", ""),
+                "provider": "auth0",
+            },
+        )
+        return (auth0_user, user)
 
 
 class DescopeOAuthProvider(OAuthProvider):
@@ -533,13 +533,13 @@ class DescopeOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.domain}/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            f"{self.domain}/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json_content = await self.get_raw_token_response(code, url)
@@ -549,18 +549,18 @@ class DescopeOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.domain}/userinfo", headers={"Authorization": f"Bearer {token}"}
-            )
-            response.raise_for_status()  # This will raise an exception for 4xx/5xx responses
-            descope_user = response.json()
+        client = get_http_client()
+        response = await client.get(
+            f"{self.domain}/userinfo", headers={"Authorization": f"Bearer {token}"}
+        )
+        response.raise_for_status()  # This will raise an exception for 4xx/5xx responses
+        descope_user = response.json()
 
-            user = User(
-                identifier=descope_user.get("email"),
-                metadata={"image": "", "provider": "descope"},
-            )
-            return (descope_user, user)
+        user = User(
+            identifier=descope_user.get("email"),
+            metadata={"image": "", "provider": "descope"},
+        )
+        return (descope_user, user)
 
 
 class AWSCognitoOAuthProvider(OAuthProvider):
@@ -594,13 +594,13 @@ class AWSCognitoOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            self.token_url,
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json = await self.get_raw_token_response(code, url)
@@ -613,24 +613,24 @@ class AWSCognitoOAuthProvider(OAuthProvider):
         user_info_url = (
             f"https://{os.environ.get('OAUTH_COGNITO_DOMAIN')}/oauth2/userInfo"
         )
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                user_info_url,
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
+        client = get_http_client()
+        response = await client.get(
+            user_info_url,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
 
-            cognito_user = response.json()
+        cognito_user = response.json()
 
-            # Customize user metadata as needed
-            user = User(
-                identifier=cognito_user["email"],
-                metadata={
-                    "image": cognito_user.get("picture", ""),
-                    "provider": "aws-cognito",
-                },
-            )
-            return (cognito_user, user)
+        # Customize user metadata as needed
+        user = User(
+            identifier=cognito_user["email"],
+            metadata={
+                "image": cognito_user.get("picture", ""),
+                "provider": "aws-cognito",
+            },
+        )
+        return (cognito_user, user)
 
 
 class GitlabOAuthProvider(OAuthProvider):
@@ -665,13 +665,13 @@ class GitlabOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.domain}/oauth/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            f"{self.domain}/oauth/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json_content = await self.get_raw_token_response(code, url)
@@ -681,21 +681,21 @@ class GitlabOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.domain}/oauth/userinfo",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            gitlab_user = response.json()
-            user = User(
-                identifier=gitlab_user.get("email"),
-                metadata={
-                    "image": gitlab_user.get("picture", ""),
-                    "provider": "gitlab",
-                },
-            )
-            return (gitlab_user, user)
+        client = get_http_client()
+        response = await client.get(
+            f"{self.domain}/oauth/userinfo",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        gitlab_user = response.json()
+        user = User(
+            identifier=gitlab_user.get("email"),
+            metadata={
+                "image": gitlab_user.get("picture", ""),
+                "provider": "gitlab",
+            },
+        )
+        return (gitlab_user, user)
 
 
 class KeycloakOAuthProvider(OAuthProvider):
@@ -733,13 +733,13 @@ class KeycloakOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/token",
-                data=payload,
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(
+            f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/token",
+            data=payload,
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str):
         json = await self.get_raw_token_response(code, url)
@@ -751,18 +751,18 @@ class KeycloakOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/userinfo",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            kc_user = response.json()
-            user = User(
-                identifier=kc_user["email"],
-                metadata={"provider": "keycloak"},
-            )
-            return (kc_user, user)
+        client = get_http_client()
+        response = await client.get(
+            f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/userinfo",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        kc_user = response.json()
+        user = User(
+            identifier=kc_user["email"],
+            metadata={"provider": "keycloak"},
+        )
+        return (kc_user, user)
 
 
 class GenericOAuthProvider(OAuthProvider):
@@ -801,10 +801,10 @@ class GenericOAuthProvider(OAuthProvider):
             "grant_type": "authorization_code",
             "redirect_uri": url,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(self.token_url, data=payload)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client()
+        response = await client.post(self.token_url, data=payload)
+        response.raise_for_status()
+        return response.json()
 
     async def get_token(self, code: str, url: str) -> str:
         json = await self.get_raw_token_response(code, url)
@@ -814,20 +814,20 @@ class GenericOAuthProvider(OAuthProvider):
         return token
 
     async def get_user_info(self, token: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.user_info_url,
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            response.raise_for_status()
-            server_user = response.json()
-            user = User(
-                identifier=server_user.get(self.user_identifier),
-                metadata={
-                    "provider": self.id,
-                },
-            )
-            return (server_user, user)
+        client = get_http_client()
+        response = await client.get(
+            self.user_info_url,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+        server_user = response.json()
+        user = User(
+            identifier=server_user.get(self.user_identifier),
+            metadata={
+                "provider": self.id,
+            },
+        )
+        return (server_user, user)
 
 
 providers = [
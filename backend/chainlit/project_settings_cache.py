@@ -0,0 +1,137 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+# (language, chat profile, user partition)
+CacheKey = Tuple[str, Optional[str], str]
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize like starlette's JSONResponse."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+@dataclass
+class CachedProjectSettings:
+    """A serialized /project/settings response."""
+
+    body: bytes
+    # Strong ETag of the body, with quotes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedProjectSettings":
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class ProjectSettingsCache:
+    """
+    TTL + LRU cache of the /project/settings responses.
+
+    Responses are keyed by language, chat profile and the partition key the app
+    declares for the user. The serialized `ui` / `features` settings are kept
+    apart, so the responses of a partition share them across languages.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: OrderedDict[CacheKey, Tuple[CachedProjectSettings, float]] = (
+            OrderedDict()
+        )
+        self._fragments: OrderedDict[Hashable, Tuple[bytes, bytes]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[CachedProjectSettings]:
+        entry = self._entries.get(key)
+
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: CacheKey, response: CachedProjectSettings):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        self._entries[key] = (response, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_ui_features(self, key: Hashable, cfg) -> Tuple[bytes, bytes]:
+        """Serialized `ui` and `features` settings of a config, dumped once per key."""
+        if fragments := self._fragments.get(key):
+            self._fragments.move_to_end(key)
+            return fragments
+
+        fragments = (
+            dump_json(cfg.ui.model_dump()),
+            dump_json(cfg.features.model_dump()),
+        )
+        self._fragments[key] = fragments
+        while len(self._fragments) > max(self.max_size, 1):
+            self._fragments.popitem(last=False)
+        return fragments
+
+    def clear(self):
+        self._entries.clear()
+        self._fragments.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_project_settings_cache: Optional[ProjectSettingsCache] = None
+
+
+def get_project_settings_cache() -> Optional[ProjectSettingsCache]:
+    """Return the project settings cache, if enabled."""
+    global _project_settings_cache
+
+    from chainlit.config import config
+
+    settings = config.project.settings_cache
+    if not settings.enabled:
+        return None
+
+    if _project_settings_cache is None:
+        _project_settings_cache = ProjectSettingsCache(
+            max_size=settings.max_size, ttl=settings.ttl
+        )
+
+    return _project_settings_cache
+
+
+def clear_project_settings_cache():
+    """Forget every cached response, e.g. after the config or the app was reloaded."""
+    global _project_settings_cache
+
+    _project_settings_cache = None
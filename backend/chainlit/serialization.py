@@ -0,0 +1,118 @@
+import json
+import reprlib
+from typing import Any
+
+from engineio import json as engineio_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+TRUNCATED_SUFFIX = " ... (truncated)"
+
+# Bounds of the shallow representations, e.g. of the arguments of a step
+_repr = reprlib.Repr()
+_repr.maxstring = 200
+_repr.maxother = 200
+
+
+def use_orjson() -> bool:
+    from chainlit.config import config
+
+    return orjson is not None and config.project.step_serialization.orjson
+
+
+def dumps_content(content: Any) -> str:
+    """
+    Serialize a dict/list step content to JSON.
+
+    Contents are indented unless `project.step_serialization.compact_json` is set,
+    the UI then pretty-prints them. Raises a TypeError if the content is not
+    JSON serializable.
+    """
+    from chainlit.config import config
+
+    if not config.project.step_serialization.compact_json:
+        return json.dumps(content, indent=4, ensure_ascii=False)
+
+    if use_orjson():
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers over 64 bits, the standard library handles them
+            pass
+
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+
+
+class OrjsonPacketSerializer:
+    """
+    Drop-in for the json module used by python-socketio to encode its packets.
+
+    Frames are encoded with orjson and decoded with the default engine.io
+    decoder, which bounds the size of the integers it parses.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, *args, **kwargs) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            return json.dumps(obj, *args, **kwargs)
+
+    @staticmethod
+    def loads(*args, **kwargs) -> Any:
+        return engineio_json.loads(*args, **kwargs)
+
+
+def get_socketio_json():
+    """The json module python-socketio should encode packets with, None for its default."""
+    return OrjsonPacketSerializer if use_orjson() else None
+
+
+def shallow_repr(value: Any) -> Any:
+    """A bounded representation of a value: JSON scalars as is, strings truncated."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > _repr.maxstring:
+            return value[: _repr.maxstring] + TRUNCATED_SUFFIX
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return "STRIPPED_BINARY_DATA"
+    return _repr.repr(value)
+
+
+def dumps_truncated(content: Any, max_bytes: int) -> str:
+    """
+    Serialize a content to JSON, truncated to `max_bytes` (0 for no limit).
+
+    The content is encoded incrementally and the encoding stops once over budget,
+    so large contents cost no more than the budget. Values that are not JSON
+    serializable are replaced by their shallow repr.
+    """
+    from chainlit.config import config
+
+    if config.project.step_serialization.compact_json:
+        encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=shallow_repr
+        )
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=4, default=shallow_repr)
+
+    chunks = []
+    # A character is at least a byte, count them to stop early without encoding
+    size = 0
+    for chunk in encoder.iterencode(content):
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            break
+
+    serialized = "".join(chunks)
+    if max_bytes and (size > max_bytes or len(serialized.encode()) > max_bytes):
+        encoded = serialized.encode()[:max_bytes]
+        return encoded.decode(errors="ignore") + TRUNCATED_SUFFIX
+
+    return serialized
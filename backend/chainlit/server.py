@@ -1,6 +1,8 @@
 import asyncio
 import fnmatch
 import glob
+import gzip
+import hashlib
 import json
 import mimetypes
 import os
@@ -9,8 +11,9 @@ import shutil
 import urllib.parse
 import webbrowser
 from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional, Union, cast, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union, cast, Any
 
 import socketio
 from fastapi import (
@@ -34,7 +37,13 @@ from starlette.types import Receive, Scope, Send
 from typing_extensions import Annotated
 from watchfiles import awatch
 
-from chainlit.auth import create_jwt, decode_jwt, get_configuration, get_current_user
+from chainlit.auth import (
+    create_jwt,
+    decode_jwt,
+    get_configuration,
+    get_current_user,
+    invalidate_persisted_user,
+)
 from chainlit.middleware.csrf import CSRFMiddleware
 from chainlit.auth.cookie import (
     clear_auth_cookie,
@@ -59,11 +68,27 @@ from chainlit.config import (
     reload_config,
 )
 from chainlit.data import get_data_layer
-from chainlit.data.acl import is_thread_author
+from chainlit.data.acl import (
+    check_thread_author,
+    get_thread_author_cache,
+    is_thread_author,
+)
+from chainlit.data.favorites_cache import invalidate_favorites
+from chainlit.data.write_behind import close_write_behind_queue
+from chainlit.http_client import close_http_client, get_http_client
 from chainlit.logger import logger
 from chainlit.markdown import get_markdown_str
 from chainlit.oauth_providers import get_oauth_provider
+from chainlit.project_settings_cache import (
+    CachedProjectSettings,
+    CacheKey,
+    clear_project_settings_cache,
+    dump_json,
+    get_project_settings_cache,
+)
 from chainlit.secret import random_secret
+from chainlit.serialization import get_socketio_json
+from chainlit.session_registry import get_session_store
 from chainlit.types import (
     AskFileSpec,
     CallActionRequest,
@@ -78,6 +103,7 @@ from chainlit.types import (
     UpdateFeedbackRequest,
     UpdateThreadRequest,
 )
+from chainlit.upload import StreamedUpload, read_multipart_file, sniff_mime_type
 from chainlit.user import PersistedUser, User
 from chainlit.utils import utc_now
 
@@ -96,6 +122,9 @@ mimetypes.add_type("text/css", ".css")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Context manager to handle app start and shutdown."""
+    # Shared by the OAuth providers, integrations and data layers
+    get_http_client()
+
     if config.code.on_app_startup:
         await config.code.on_app_startup()
 
@@ -140,6 +169,9 @@ async def lifespan(app: FastAPI):
                             logger.error(f"Error reloading config: {e}")
                             break
 
+                        clear_html_template_cache()
+                        clear_project_settings_cache()
+
                         # Reload the module if the module name is specified in the config
                         if config.run.module_name:
                             try:
@@ -189,8 +221,16 @@ async def lifespan(app: FastAPI):
                 slack_task.cancel()
                 await slack_task
 
+            # Drain pending writes before closing the data layer
+            await close_write_behind_queue()
+
             if data_layer := get_data_layer():
                 await data_layer.close()
+
+            if session_store := get_session_store():
+                await session_store.close()
+
+            await close_http_client()
         except asyncio.exceptions.CancelledError:
             pass
 
@@ -252,11 +292,18 @@ for origin in config.project.allow_origins:
 try:
     # Disable Socket.IO CORS since FastAPI CORSMiddleware handles it
     # This prevents duplicate CORS headers
+    # Share socket.io rooms and broadcasts between workers through Redis
+    client_manager = None
+    if redis_url := os.environ.get("CHAINLIT_REDIS_URL"):
+        client_manager = socketio.AsyncRedisManager(redis_url)
+
     sio = socketio.AsyncServer(
         cors_allowed_origins=[], 
         async_mode="asgi",
         logger=False,
-        engineio_logger=False
+        engineio_logger=False,
+        client_manager=client_manager,
+        json=get_socketio_json(),
     )
 except Exception as e:
     logger.error(f"CRITICAL: Failed to create Socket.IO server: {e}")
@@ -475,6 +522,83 @@ def get_html_template(root_path):
         return content
 
 
+@dataclass
+class RenderedHtmlTemplate:
+    """Index view rendered for a root path, with its precompressed variants."""
+
+    content: bytes
+    # Strong ETag of the uncompressed content, without quotes
+    etag: str
+    # Compressed content by content-encoding ("gzip", "br")
+    encodings: Dict[str, bytes]
+
+    def get_etag(self, encoding: Optional[str] = None) -> str:
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+
+_html_template_cache: Dict[str, Tuple[Tuple, RenderedHtmlTemplate]] = {}
+
+
+def _get_html_template_sources_version() -> Tuple:
+    """Modification times of the files the index view is rendered from."""
+    version = []
+    for path in (Path(build_dir) / "index.html", Path(public_dir) / "theme.json"):
+        try:
+            version.append(path.stat().st_mtime_ns)
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+def get_rendered_html_template(root_path: str) -> RenderedHtmlTemplate:
+    """
+    Get the index view for a root path, rendered and compressed once.
+
+    Cached until the config is reloaded or index.html / theme.json change.
+    """
+    sources_version = _get_html_template_sources_version()
+    if cached := _html_template_cache.get(root_path):
+        version, template = cached
+        if version == sources_version:
+            return template
+
+    content = get_html_template(root_path).encode("utf-8")
+    encodings = {"gzip": gzip.compress(content, mtime=0)}
+    try:
+        import brotli  # type: ignore
+
+        encodings["br"] = brotli.compress(content)
+    except ImportError:
+        pass
+
+    template = RenderedHtmlTemplate(
+        content=content,
+        etag=hashlib.sha256(content).hexdigest()[:32],
+        encodings=encodings,
+    )
+    _html_template_cache[root_path] = (sources_version, template)
+    return template
+
+
+def clear_html_template_cache():
+    _html_template_cache.clear()
+
+
+def _get_accepted_encodings(accept_encoding: str) -> Set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        encoding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                pass
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
 def get_user_facing_url(url: URL):
     """
     Return the user facing URL for a given URL.
@@ -564,6 +688,9 @@ async def _authenticate_user(request: Request, user: Optional[User], redirect_to
             # TODO: Make this catch only specific errors and allow others to propagate.
             logger.error(f"Error creating user: {e}")"""
 
+    # The user may come back with updated metadata
+    invalidate_persisted_user(user.identifier)
+
     access_token = create_jwt(user)
     response = _get_auth_response(access_token, redirect_to_callback, original_redirect_to)
 
@@ -872,6 +999,7 @@ async def project_translations(
 
 @router.get("/project/settings")
 async def project_settings(
+    request: Request,
     current_user: UserParam,
     language: str = Query(
         default="en-US", description="Language code", pattern=_language_pattern
@@ -885,6 +1013,18 @@ async def project_settings(
     # Use configured language if set, otherwise use the language from query
     effective_language = config.ui.language or language
 
+    settings_cache = get_project_settings_cache()
+    cache_key = (
+        await _get_project_settings_cache_key(
+            current_user, effective_language, chat_profile
+        )
+        if settings_cache
+        else None
+    )
+    if settings_cache and cache_key:
+        if cached := settings_cache.get(cache_key):
+            return _project_settings_response(request, cached)
+
     # Load the markdown file based on the provided language
     markdown = get_markdown_str(config.root, effective_language)
 
@@ -927,10 +1067,16 @@ async def project_settings(
         if current_profile and getattr(current_profile, "config_overrides", None):
             cfg = config.with_overrides(current_profile.config_overrides)
 
-    return JSONResponse(
-        content={
-            "ui": cfg.ui.model_dump(),
-            "features": cfg.features.model_dump(),
+    if settings_cache and cache_key:
+        # Profile overrides may differ between partitions
+        fragments_key = (cache_key[2], chat_profile) if cfg is not config else None
+        ui, features = settings_cache.get_ui_features(fragments_key, cfg)
+    else:
+        ui = dump_json(cfg.ui.model_dump())
+        features = dump_json(cfg.features.model_dump())
+
+    content = dump_json(
+        {
             "userEnv": cfg.project.user_env,
             "maskUserEnv": cfg.project.mask_user_env,
             "dataPersistence": data_layer is not None,
@@ -947,6 +1093,50 @@ async def project_settings(
             "debugUrl": debug_url,
         }
     )
+    response = CachedProjectSettings.from_body(
+        b'{"ui":' + ui + b',"features":' + features + b"," + content[1:]
+    )
+    if settings_cache and cache_key:
+        settings_cache.set(cache_key, response)
+
+    return _project_settings_response(request, response)
+
+
+async def _get_project_settings_cache_key(
+    current_user: GenericUser,
+    language: str,
+    chat_profile: Optional[str],
+) -> Optional[CacheKey]:
+    """Cache key of a /project/settings response, None if it can't be cached."""
+    if not (
+        config.code.set_chat_profiles
+        or config.code.set_starters
+        or config.code.set_starter_categories
+    ):
+        # Nothing depends on the user
+        return (language, chat_profile, "")
+
+    if not config.code.project_settings_cache_key:
+        return None
+
+    partition = await config.code.project_settings_cache_key(current_user)
+    if partition is None:
+        return None
+
+    return (language, chat_profile, str(partition))
+
+
+def _project_settings_response(
+    request: Request, settings: CachedProjectSettings
+) -> Response:
+    headers = {"ETag": settings.etag, "Cache-Control": "private, no-cache"}
+
+    if settings.etag in request.headers.get("If-None-Match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=settings.body, media_type="application/json", headers=headers
+    )
 
 
 @router.put("/feedback")
@@ -1027,6 +1217,11 @@ async def get_user_threads(
         payload.filter.userId = current_user.id
 
     res = await data_layer.list_threads(payload.pagination, payload.filter)
+
+    thread_author_cache = get_thread_author_cache()
+    for thread in res.data:
+        thread_author_cache.set(thread["id"], thread.get("userIdentifier"))
+
     return JSONResponse(content=res.to_dict())
 
 
@@ -1035,8 +1230,14 @@ async def get_thread(
     request: Request,
     thread_id: str,
     current_user: UserParam,
+    steps: Optional[int] = Query(
+        None, ge=1, description="Only return the latest top-level steps"
+    ),
+    before: Optional[str] = Query(
+        None, description="Return the steps before this one (olderStepsCursor)"
+    ),
 ):
-    """Get a specific thread."""
+    """Get a specific thread, whole or a window of its steps."""
     data_layer = get_data_layer()
 
     if not data_layer:
@@ -1045,9 +1246,21 @@ async def get_thread(
     if not current_user:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    await is_thread_author(current_user.identifier, thread_id)
+    thread_author_cache = get_thread_author_cache()
+    if thread_author := thread_author_cache.get(thread_id):
+        check_thread_author(current_user.identifier, thread_author)
+
+    if steps is not None:
+        res = await data_layer.get_thread_page(thread_id, limit=steps, before=before)
+    else:
+        res = await data_layer.get_thread(thread_id)
+
+    if not thread_author:
+        # Checked with the author fetched along with the thread, not served before
+        thread_author = res.get("userIdentifier") if res else None
+        check_thread_author(current_user.identifier, thread_author)
+        thread_author_cache.set(thread_id, thread_author)
 
-    res = await data_layer.get_thread(thread_id)
     return JSONResponse(content=res)
 
 
@@ -1311,6 +1524,9 @@ async def delete_thread(
     await is_thread_author(current_user.identifier, thread_id)
 
     await data_layer.delete_thread(thread_id)
+    get_thread_author_cache().invalidate(thread_id)
+    if isinstance(current_user, PersistedUser):
+        invalidate_favorites(current_user.id)
     return JSONResponse(content={"success": True})
 
 
@@ -1654,14 +1870,39 @@ async def disconnect_mcp(
     return JSONResponse(content={"success": True})
 
 
-@router.post("/project/file")
+# Room for the multipart boundaries and part headers around an uploaded file
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+@router.post(
+    "/project/file",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_file(
+    request: Request,
     current_user: UserParam,
     session_id: str,
-    file: UploadFile,
     ask_parent_id: Optional[str] = None,
 ):
-    """Upload a file to the session files directory."""
+    """
+    Upload a file to the session files directory.
+
+    The file is streamed to disk as it is received, and rejected as soon as its
+    headers, first bytes or size do not pass validation.
+    """
 
     from chainlit.session import WebsocketSession
 
@@ -1680,36 +1921,57 @@ async def upload_file(
                 detail="You are not authorized to upload files for this session",
             )
 
-    session.files_dir.mkdir(exist_ok=True)
+    spec: AskFileSpec = session.files_spec.get(ask_parent_id, None)
+    if not spec and ask_parent_id:
+        raise HTTPException(
+            status_code=404,
+            detail="Parent message not found",
+        )
+
+    # Reject oversize uploads before reading their body
+    max_size = get_max_file_size(spec)
+    content_length = request.headers.get("content-length", "")
+    if (
+        max_size is not None
+        and content_length.isdigit()
+        and int(content_length) > max_size + MULTIPART_OVERHEAD
+    ):
+        raise HTTPException(status_code=400, detail="File size too large")
 
     try:
-        content = await file.read()
+        file = await read_multipart_file(request, "file")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        assert file.filename, "No filename for uploaded file"
-        assert file.content_type, "No content type for uploaded file"
+    if not file:
+        raise HTTPException(status_code=422, detail="No file in the request")
 
-        spec: AskFileSpec = session.files_spec.get(ask_parent_id, None)
-        if not spec and ask_parent_id:
-            raise HTTPException(
-                status_code=404,
-                detail="Parent message not found",
-            )
+    assert file.filename, "No filename for uploaded file"
+    assert file.content_type, "No content type for uploaded file"
 
-        try:
-            validate_file_upload(file, spec=spec)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        validate_file_upload(file, spec=spec)
+
+        # The declared type must match the content, when we can tell
+        sniffed_mime = sniff_mime_type(await file.read_head())
+        if sniffed_mime and sniffed_mime != file.content_type:
+            validate_file_mime_type(replace(file, content_type=sniffed_mime), spec)
 
         file_response = await session.persist_file(
-            name=file.filename, content=content, mime=file.content_type
+            name=file.filename,
+            mime=file.content_type,
+            stream=file.iter_chunks(),
+            max_size=max_size,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return JSONResponse(content=file_response)
-    finally:
-        await file.close()
+    return JSONResponse(content=file_response)
 
 
-def validate_file_upload(file: UploadFile, spec: Optional[AskFileSpec] = None):
+def validate_file_upload(
+    file: Union[UploadFile, StreamedUpload], spec: Optional[AskFileSpec] = None
+):
     """Validate the file upload as configured in config.features.spontaneous_file_upload or by AskFileSpec
     for a specific message.
 
@@ -1730,7 +1992,9 @@ def validate_file_upload(file: UploadFile, spec: Optional[AskFileSpec] = None):
     validate_file_size(file, spec)
 
 
-def validate_file_mime_type(file: UploadFile, spec: Optional[AskFileSpec]):
+def validate_file_mime_type(
+    file: Union[UploadFile, StreamedUpload], spec: Optional[AskFileSpec]
+):
     """Validate the file mime type as configured in config.features.spontaneous_file_upload.
     Args:
         file (UploadFile): The file to validate.
@@ -1768,25 +2032,33 @@ def validate_file_mime_type(file: UploadFile, spec: Optional[AskFileSpec]):
     raise ValueError("File type not allowed")
 
 
-def validate_file_size(file: UploadFile, spec: Optional[AskFileSpec]):
-    """Validate the file size as configured in config.features.spontaneous_file_upload.
-    Args:
-        file (UploadFile): The file to validate.
-    Raises:
-        ValueError: If the file size is too large.
-    """
+def get_max_file_size(spec: Optional[AskFileSpec]) -> Optional[int]:
+    """Maximum size (in bytes) of an uploaded file, None if not limited."""
     if not spec and (
         config.features.spontaneous_file_upload is None
         or config.features.spontaneous_file_upload.max_size_mb is None
     ):
-        return
+        return None
 
     max_size_mb = (
         config.features.spontaneous_file_upload.max_size_mb
         if not spec
         else spec.max_size_mb
     )
-    if file.size is not None and file.size > max_size_mb * 1024 * 1024:
+    return max_size_mb * 1024 * 1024
+
+
+def validate_file_size(
+    file: Union[UploadFile, StreamedUpload], spec: Optional[AskFileSpec]
+):
+    """Validate the file size as configured in config.features.spontaneous_file_upload.
+    Args:
+        file (UploadFile): The file to validate.
+    Raises:
+        ValueError: If the file size is too large.
+    """
+    max_size = get_max_file_size(spec)
+    if max_size is not None and file.size is not None and file.size > max_size:
         raise ValueError("File size too large")
 
 
@@ -1911,10 +2183,32 @@ async def serve(request: Request):
     root_path = os.getenv("CHAINLIT_PARENT_ROOT_PATH", "") + os.getenv(
         "CHAINLIT_ROOT_PATH", ""
     )
-    html_template = get_html_template(root_path)
-    response = HTMLResponse(content=html_template, status_code=200)
+    template = get_rendered_html_template(root_path)
 
-    return response
+    accepted = _get_accepted_encodings(request.headers.get("accept-encoding", ""))
+    encoding = next(
+        (e for e in ("br", "gzip") if e in accepted and e in template.encodings), None
+    )
+
+    headers = {
+        "ETag": template.get_etag(encoding),
+        "Vary": "Accept-Encoding",
+        # Always revalidate, the ETag makes it a cheap 304
+        "Cache-Control": "no-cache",
+    }
+
+    if if_none_match := request.headers.get("if-none-match"):
+        etags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if "*" in etags or headers["ETag"] in etags:
+            return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        content = template.encodings[encoding]
+    else:
+        content = template.content
+
+    return HTMLResponse(content=content, status_code=200, headers=headers)
 
 
 app.include_router(router)
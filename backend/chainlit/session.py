@@ -1,11 +1,24 @@
 import asyncio
 import json
 import mimetypes
+import os
 import re
 import shutil
+import sys
 import uuid
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Literal, Optional, Union
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Callable,
+    Deque,
+    Dict,
+    Literal,
+    Optional,
+    Union,
+)
 
 import aiofiles
 
@@ -21,6 +34,34 @@ if TYPE_CHECKING:
 
 _CLOSE_TIMEOUT = 10.0  # seconds to wait for a background MCP task to finish
 
+# ioctl cloning a file into another on copy-on-write filesystems (btrfs, xfs)
+_FICLONE = 0x40049409
+
+
+def _copy_file(src: Union[str, "os.PathLike[str]"], dst: Path) -> int:
+    """
+    Copy a file without moving its content through Python, return its size.
+
+    Tries a reflink (copy-on-write clone), then falls back to shutil.copyfile
+    which uses sendfile / fcopyfile where available. Either way the copy is
+    independent of the source. Files that should not be copied are registered in
+    place instead, see `reference_local_files`.
+    """
+    size = os.stat(src).st_size
+
+    if sys.platform == "linux":
+        import fcntl
+
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+            return size
+        except OSError:
+            dst.unlink(missing_ok=True)
+
+    shutil.copyfile(src, dst)
+    return size
+
 
 @dataclass
 class McpSession:
@@ -156,39 +197,63 @@ class BaseSession:
         mime: str,
         path: Optional[str] = None,
         content: Optional[Union[bytes, str]] = None,
+        stream: Optional[AsyncIterable[bytes]] = None,
+        max_size: Optional[int] = None,
+        reference: bool = False,
     ) -> FileReference:
-        if not path and not content:
+        """
+        Persist a file in the session files directory, from a path, its content or
+        a stream of chunks. Streams are written chunk by chunk, and dropped with a
+        ValueError as soon as they exceed `max_size` bytes.
+
+        With `reference`, a file given by path is registered in place instead of
+        being copied: it must stay unchanged for the lifetime of the session.
+        """
+        if not path and not content and stream is None:
             raise ValueError(
                 "Either path or content must be provided to persist a file"
             )
 
-        self.files_dir.mkdir(exist_ok=True)
-
         file_id = str(uuid.uuid4())
 
-        file_path = self.files_dir / file_id
-
-        file_extension = mimetypes.guess_extension(mime)
-
-        if file_extension:
-            file_path = file_path.with_suffix(file_extension)
-
-        if path:
-            # Copy the file from the given path
-            async with (
-                aiofiles.open(path, "rb") as src,
-                aiofiles.open(file_path, "wb") as dst,
-            ):
-                await dst.write(await src.read())
-        elif content:
-            # Write the provided content to the file
-            async with aiofiles.open(file_path, "wb") as buffer:
-                if isinstance(content, str):
-                    content = content.encode("utf-8")
-                await buffer.write(content)
-
-        # Get the file size
-        file_size = file_path.stat().st_size
+        if path and reference:
+            file_path = Path(path).absolute()
+            file_size = file_path.stat().st_size
+        else:
+            from chainlit.sync import make_async
+
+            self.files_dir.mkdir(exist_ok=True)
+
+            file_path = self.files_dir / file_id
+
+            file_extension = mimetypes.guess_extension(mime)
+
+            if file_extension:
+                file_path = file_path.with_suffix(file_extension)
+
+            if path:
+                # Copy the file from the given path, off the event loop
+                file_size = await make_async(_copy_file)(path, file_path)
+            elif content:
+                # Write the provided content to the file
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    if isinstance(content, str):
+                        content = content.encode("utf-8")
+                    await buffer.write(content)
+                file_size = len(content)
+            else:
+                file_size = 0
+                try:
+                    async with aiofiles.open(file_path, "wb") as buffer:
+                        async for chunk in stream:  # type: ignore[union-attr]
+                            file_size += len(chunk)
+                            if max_size is not None and file_size > max_size:
+                                raise ValueError("File size too large")
+                            await buffer.write(chunk)
+                except BaseException:
+                    file_path.unlink(missing_ok=True)
+                    raise
+
         # Store the file content in memory
         self.files[file_id] = {
             "id": file_id,
@@ -372,10 +437,17 @@ class WebsocketSession(BaseSession):
 
     async def delete(self):
         """Delete the session."""
+        from chainlit.audio_pipeline import remove_audio_pipeline
+        from chainlit.chat_context import chat_contexts
+        from chainlit.stream_coalescer import remove_stream_coalescer
+
         if self.files_dir.is_dir():
             shutil.rmtree(self.files_dir)
         ws_sessions_sid.pop(self.socket_id, None)
         ws_sessions_id.pop(self.id, None)
+        chat_contexts.pop(self.id, None)
+        await remove_stream_coalescer(self.id)
+        await remove_audio_pipeline(self.id)
 
         for mcp_session in list(self.mcp_sessions.values()):
             try:
@@ -0,0 +1,307 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Dict, Literal, Optional, Tuple, Union
+
+from chainlit.logger import logger
+from chainlit.session import JSONEncoderIgnoreNonSerializable, WebsocketSession
+
+if TYPE_CHECKING:
+    from chainlit.user import PersistedUser, User
+
+SessionNamespace = Literal["session", "user_session", "chat_context"]
+
+
+class BaseSessionStore(ABC):
+    """
+    Base class for sharing session state between Chainlit workers.
+
+    The live `WebsocketSession` objects (socket callbacks, tasks, MCP clients)
+    always stay in the process that owns the socket. The store only holds
+    JSON-serializable snapshots of the session registry, the `user_session`
+    and the `chat_context`, so that a client reconnecting to another worker
+    can be restored there.
+    """
+
+    @abstractmethod
+    async def get(self, namespace: SessionNamespace, session_id: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(
+        self,
+        namespace: SessionNamespace,
+        session_id: str,
+        value: Any,
+        ttl: Optional[int] = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, namespace: SessionNamespace, session_id: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(BaseSessionStore):
+    """Process-local session store, useful for a single worker and for tests."""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[str, Optional[float]]] = {}
+
+    async def get(self, namespace: SessionNamespace, session_id: str) -> Optional[Any]:
+        entry = self._entries.get((namespace, session_id))
+        if not entry:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._entries.pop((namespace, session_id), None)
+            return None
+
+        return json.loads(value)
+
+    async def set(
+        self,
+        namespace: SessionNamespace,
+        session_id: str,
+        value: Any,
+        ttl: Optional[int] = None,
+    ) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[(namespace, session_id)] = (
+            json.dumps(value, cls=JSONEncoderIgnoreNonSerializable, ensure_ascii=False),
+            expires_at,
+        )
+
+    async def delete(self, namespace: SessionNamespace, session_id: str) -> None:
+        self._entries.pop((namespace, session_id), None)
+
+
+class RedisSessionStore(BaseSessionStore):
+    """
+    Redis backed session store.
+
+    Pair it with `socketio.AsyncRedisManager` (enabled automatically when
+    `CHAINLIT_REDIS_URL` is set) to run several workers without sticky sessions.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Optional[Any] = None,
+        prefix: str = "chainlit:",
+    ):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise ImportError(
+                    "The redis package is required to use the RedisSessionStore. "
+                    "Install it with `pip install redis`."
+                ) from e
+
+            client = Redis.from_url(url or "redis://localhost:6379/0")
+
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, namespace: SessionNamespace, session_id: str) -> str:
+        return f"{self.prefix}{namespace}:{session_id}"
+
+    async def get(self, namespace: SessionNamespace, session_id: str) -> Optional[Any]:
+        value = await self.client.get(self._key(namespace, session_id))
+        if value is None:
+            return None
+        return json.loads(value)
+
+    async def set(
+        self,
+        namespace: SessionNamespace,
+        session_id: str,
+        value: Any,
+        ttl: Optional[int] = None,
+    ) -> None:
+        await self.client.set(
+            self._key(namespace, session_id),
+            json.dumps(value, cls=JSONEncoderIgnoreNonSerializable, ensure_ascii=False),
+            ex=ttl or None,
+        )
+
+    async def delete(self, namespace: SessionNamespace, session_id: str) -> None:
+        await self.client.delete(self._key(namespace, session_id))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+_session_store: Optional[BaseSessionStore] = None
+_session_store_initialized = False
+
+
+def get_session_store() -> Optional[BaseSessionStore]:
+    """
+    Return the configured session store.
+
+    Resolved from the @session_store hook, then from the CHAINLIT_REDIS_URL
+    environment variable. Without any of them, sessions are not shared.
+    """
+    global _session_store, _session_store_initialized
+
+    if not _session_store_initialized:
+        from chainlit.config import config
+
+        if config.code.session_store:
+            _session_store = config.code.session_store()
+        elif redis_url := os.environ.get("CHAINLIT_REDIS_URL"):
+            _session_store = RedisSessionStore(url=redis_url)
+
+        _session_store_initialized = True
+
+    return _session_store
+
+
+def _snapshot_ttl() -> int:
+    from chainlit.config import config
+
+    # Keep the snapshot a little longer than the local session would live
+    return config.project.session_timeout + 60
+
+
+async def save_session(session: WebsocketSession) -> None:
+    """Share the state of a websocket session through the session store."""
+    from chainlit.chat_context import chat_contexts
+    from chainlit.user_session import user_sessions
+
+    if not (store := get_session_store()):
+        return
+
+    ttl = _snapshot_ttl()
+    try:
+        await store.set(
+            "session",
+            session.id,
+            {
+                "id": session.id,
+                "socket_id": session.socket_id,
+                "thread_id": session.thread_id,
+                "thread_id_to_resume": session.thread_id_to_resume,
+                "user_identifier": session.user.identifier if session.user else None,
+                "token": session.token,
+                "client_type": session.client_type,
+                "chat_profile": session.chat_profile,
+                "chat_settings": session.chat_settings,
+                "user_env": session.user_env,
+                "has_first_interaction": session.has_first_interaction,
+                "chat_started": session.chat_started,
+            },
+            ttl=ttl,
+        )
+        await store.set(
+            "user_session", session.id, user_sessions.get(session.id) or {}, ttl=ttl
+        )
+        await store.set(
+            "chat_context",
+            session.id,
+            [message.to_dict() for message in chat_contexts.get(session.id, [])],
+            ttl=ttl,
+        )
+    except Exception as e:
+        logger.error(f"Failed to save session {session.id} to the session store: {e}")
+
+
+async def delete_session(session_id: str, socket_id: Optional[str] = None) -> None:
+    """
+    Remove every shared entry of a session from the session store.
+
+    With a `socket_id`, the entries are only removed if the snapshot was saved
+    for that socket: once the client reconnected to another worker, the snapshot
+    belongs to that worker.
+    """
+    if not (store := get_session_store()):
+        return
+
+    try:
+        if socket_id is not None:
+            snapshot = await store.get("session", session_id)
+            if snapshot and snapshot.get("socket_id") != socket_id:
+                return
+
+        await store.delete("session", session_id)
+        await store.delete("user_session", session_id)
+        await store.delete("chat_context", session_id)
+    except Exception as e:
+        logger.error(
+            f"Failed to delete session {session_id} from the session store: {e}"
+        )
+
+
+async def restore_session(
+    sid: str,
+    session_id: str,
+    emit_fn: Callable,
+    emit_call_fn: Callable,
+    environ: Dict[str, Any],
+    user: Optional[Union["User", "PersistedUser"]] = None,
+    token: Optional[str] = None,
+) -> Optional[WebsocketSession]:
+    """
+    Rebuild a websocket session owned by another worker from its shared snapshot.
+
+    The session keeps the token of the new connection, the one of the snapshot
+    when the connection has none.
+
+    Raises ConnectionRefusedError if the snapshot belongs to another user.
+    """
+    from chainlit.chat_context import chat_contexts
+    from chainlit.context import init_ws_context
+    from chainlit.message import Message
+    from chainlit.user_session import user_sessions
+
+    if not (store := get_session_store()):
+        return None
+
+    try:
+        snapshot = await store.get("session", session_id)
+    except Exception as e:
+        logger.error(f"Failed to load session {session_id} from the session store: {e}")
+        return None
+
+    if not snapshot:
+        return None
+
+    if snapshot.get("user_identifier") != (user.identifier if user else None):
+        logger.error("Authorization for the session failed.")
+        raise ConnectionRefusedError("authorization failed")
+
+    session = WebsocketSession(
+        id=session_id,
+        socket_id=sid,
+        emit=emit_fn,
+        emit_call=emit_call_fn,
+        client_type=snapshot.get("client_type") or "webapp",
+        user_env=snapshot.get("user_env") or {},
+        user=user,
+        token=token or snapshot.get("token"),
+        chat_profile=snapshot.get("chat_profile"),
+        thread_id=snapshot.get("thread_id"),
+        environ=environ,
+    )
+    session.thread_id_to_resume = snapshot.get("thread_id_to_resume")
+    session.chat_settings = snapshot.get("chat_settings") or {}
+    session.has_first_interaction = bool(snapshot.get("has_first_interaction"))
+    session.chat_started = bool(snapshot.get("chat_started"))
+    session.restored = True
+
+    user_sessions[session_id] = await store.get("user_session", session_id) or {}
+
+    if message_dicts := await store.get("chat_context", session_id):
+        init_ws_context(session)
+        chat_contexts[session_id] = [
+            Message.from_dict(message_dict) for message_dict in message_dicts
+        ]
+
+    return session
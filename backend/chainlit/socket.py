@@ -9,6 +9,7 @@ from fastapi import HTTPException
 from starlette.requests import cookie_parser
 from typing_extensions import TypeAlias
 
+from chainlit.audio_pipeline import drain_audio_ingress_queue, get_audio_ingress_queue
 from chainlit.auth import (
     get_current_user,
     get_token_from_cookies,
@@ -19,14 +20,20 @@ from chainlit.chat_context import chat_context
 from chainlit.config import ChainlitConfig, config
 from chainlit.context import init_ws_context
 from chainlit.data import get_data_layer
+from chainlit.data.favorites_cache import (
+    get_cached_favorite_steps,
+    get_favorites_cache,
+)
 from chainlit.logger import logger
 from chainlit.message import ErrorMessage, Message
 from chainlit.server import sio
 from chainlit.session import ClientType, WebsocketSession
+from chainlit.session_registry import delete_session, restore_session, save_session
 from chainlit.types import (
     InputAudioChunk,
     InputAudioChunkPayload,
     MessagePayload,
+    ThreadDict,
 )
 from chainlit.user import PersistedUser, User
 from chainlit.user_session import user_sessions
@@ -98,7 +105,13 @@ async def resume_thread(session: WebsocketSession):
     data_layer = get_data_layer()
     if not data_layer or not session.user or not session.thread_id_to_resume:
         return
-    thread = await data_layer.get_thread(thread_id=session.thread_id_to_resume)
+    if window := config.project.resume_steps_window:
+        # Long threads are resumed with their latest steps only
+        thread: Optional[ThreadDict] = await data_layer.get_thread_page(
+            thread_id=session.thread_id_to_resume, limit=window
+        )
+    else:
+        thread = await data_layer.get_thread(thread_id=session.thread_id_to_resume)
     if not thread:
         return
 
@@ -388,6 +401,15 @@ async def connect(sid: str, environ: WSGIEnvironment, auth: WebSocketSessionAuth
     if restore_existing_session(
         sid, session_id, emit_fn, emit_call_fn, environ, user=user
     ):
+        # The shared snapshot now belongs to this socket
+        await save_session(WebsocketSession.require(sid))
+        return True
+
+    # The session may be owned by another worker
+    if restored_session := await restore_session(
+        sid, session_id, emit_fn, emit_call_fn, environ, user=user, token=token
+    ):
+        await save_session(restored_session)
         return True
 
     user_env_string = auth.get("userEnv", None)
@@ -399,7 +421,7 @@ async def connect(sid: str, environ: WSGIEnvironment, auth: WebSocketSessionAuth
         unquote(url_encoded_chat_profile) if url_encoded_chat_profile else None
     )
 
-    WebsocketSession(
+    session = WebsocketSession(
         id=session_id,
         socket_id=sid,
         emit=emit_fn,
@@ -412,6 +434,7 @@ async def connect(sid: str, environ: WSGIEnvironment, auth: WebSocketSessionAuth
         thread_id=thread_id,
         environ=environ,
     )
+    await save_session(session)
 
     return True
 
@@ -485,10 +508,14 @@ async def disconnect(sid):
                 user_sessions.pop(session.id)
             # Clean up the session
             await session.delete()
+            # Unless the client reconnected to another worker since
+            await delete_session(session.id, socket_id=session.socket_id)
 
     if session.to_clear:
         await clear(sid)
     else:
+        # Let another worker pick the session up if the client reconnects there
+        await save_session(session)
 
         async def clear_on_timeout(_sid):
             await asyncio.sleep(config.project.session_timeout)
@@ -529,6 +556,7 @@ async def process_message(session: WebsocketSession, payload: MessagePayload):
         ).send()
     finally:
         await context.emitter.task_end()
+        await save_session(session)
 
 
 @sio.on("edit_message")  # pyright: ignore [reportOptionalCall]
@@ -578,14 +606,12 @@ async def message_favorite(sid, payload: MessagePayload):
     step_dict = None
 
     if favorite:
-        for message in chat_context.get():
-            if message.id == payload_message["id"]:
-                message.metadata = message.metadata or {}
-                message.metadata["favorite"] = favorite
-                step_dict = message.to_dict()
-                break
+        if message := chat_context.get_message(payload_message["id"]):
+            message.metadata = message.metadata or {}
+            message.metadata["favorite"] = favorite
+            step_dict = message.to_dict()
     elif data_layer:
-        favorites = await data_layer.get_favorite_steps(session.user.id)
+        favorites = await get_cached_favorite_steps(data_layer, session.user.id)
         for fav in favorites:
             if fav["id"] == payload_message["id"]:
                 step_dict = fav
@@ -601,6 +627,7 @@ async def message_favorite(sid, payload: MessagePayload):
 
     if data_layer:
         step_dict = await data_layer.set_step_favorite(step_dict, favorite)
+        get_favorites_cache().update(session.user.id, step_dict, favorite)
 
     await context.emitter.update_step(step_dict)
     await fetch_favorites(sid)
@@ -612,7 +639,7 @@ async def fetch_favorites(sid):
     context = init_ws_context(session)
     if session.user and config.features.favorites:
         if data_layer := get_data_layer():
-            favorites = await data_layer.get_favorite_steps(session.user.id)
+            favorites = await get_cached_favorite_steps(data_layer, session.user.id)
             await context.emitter.set_favorites(favorites)
 
 
@@ -666,7 +693,8 @@ async def audio_chunk(sid, payload: InputAudioChunkPayload):
         and config.features.audio.enabled
         and config.code.on_audio_chunk
     ):
-        asyncio.create_task(config.code.on_audio_chunk(InputAudioChunk(**payload)))
+        queue = get_audio_ingress_queue(session, config.code.on_audio_chunk)
+        queue.put(InputAudioChunk(**payload))
 
 
 @sio.on("audio_end")
@@ -685,6 +713,8 @@ async def audio_end(sid):
         config: ChainlitConfig = session.get_config()  # type: ignore
 
         if config.features.audio and config.features.audio.enabled:
+            # Process the chunks received before the end of the stream first
+            await drain_audio_ingress_queue(session.id)
             await config.code.on_audio_end()
 
     except asyncio.CancelledError:
@@ -1,20 +1,21 @@
 import asyncio
 import inspect
-import json
 import time
 import uuid
 from copy import deepcopy
-from functools import wraps
-from typing import Callable, Dict, List, Optional, TypedDict, Union
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Optional, TypedDict, Union
 
 from literalai import BaseGeneration
 from literalai.observability.step import StepType, TrueStepType
 
-from chainlit.config import config
+from chainlit.config import StepInputCapture, config
 from chainlit.context import CL_RUN_NAMES, context, local_steps
 from chainlit.data import get_data_layer
+from chainlit.data.write_behind import get_write_behind_queue
 from chainlit.element import Element
 from chainlit.logger import logger
+from chainlit.serialization import dumps_content, dumps_truncated, shallow_repr
 from chainlit.types import FeedbackDict
 from chainlit.utils import utc_now
 
@@ -69,11 +70,59 @@ class StepDict(TypedDict, total=False):
     feedback: Optional[FeedbackDict]
 
 
-def flatten_args_kwargs(func, args, kwargs):
-    signature = inspect.signature(func)
-    bound_arguments = signature.bind(*args, **kwargs)
+@lru_cache(maxsize=1024)
+def _cached_signature(func) -> inspect.Signature:
+    return inspect.signature(func)
+
+
+def get_signature(func) -> inspect.Signature:
+    try:
+        return _cached_signature(func)
+    except TypeError:
+        # Unhashable callable
+        return inspect.signature(func)
+
+
+def bind_args_kwargs(func, args, kwargs) -> Dict[str, Any]:
+    bound_arguments = get_signature(func).bind(*args, **kwargs)
     bound_arguments.apply_defaults()
-    return {k: deepcopy(v) for k, v in bound_arguments.arguments.items()}
+    return bound_arguments.arguments
+
+
+def flatten_args_kwargs(func, args, kwargs):
+    return {k: deepcopy(v) for k, v in bind_args_kwargs(func, args, kwargs).items()}
+
+
+def capture_input(
+    func,
+    args,
+    kwargs,
+    capture: StepInputCapture = "deepcopy",
+    max_bytes: int = 0,
+) -> Union[Dict[str, Any], str, None]:
+    """
+    Capture the arguments of a step function as its input.
+
+    "none" captures nothing, "repr" a shallow and bounded repr of each argument,
+    "json" the arguments serialized to JSON and truncated to `max_bytes`, and
+    "deepcopy" a copy of the arguments, serialized when the step is sent.
+    """
+    if capture == "none":
+        return None
+
+    arguments = bind_args_kwargs(func, args, kwargs)
+
+    if capture == "json":
+        try:
+            return dumps_truncated(arguments, max_bytes)
+        except (TypeError, ValueError):
+            # e.g. non-string keys or circular references, fall back to reprs
+            pass
+
+    if capture in ("json", "repr"):
+        return {k: shallow_repr(v) for k, v in arguments.items()}
+    else:
+        return {k: deepcopy(v) for k, v in arguments.items()}
 
 
 def step(
@@ -90,8 +139,20 @@ def step(
     show_input: Union[bool, str] = "json",
     default_open: bool = False,
     auto_collapse: bool = False,
+    capture: Optional[StepInputCapture] = None,
 ):
-    """Step decorator for async and sync functions."""
+    """
+    Step decorator for async and sync functions.
+
+    `capture` sets how the arguments are captured as step input, see `capture_input`.
+    Defaults to `project.step_input.capture`.
+    """
+
+    def get_input(func, args, kwargs):
+        settings = config.project.step_input
+        return capture_input(
+            func, args, kwargs, capture or settings.capture, settings.max_bytes
+        )
 
     def wrapper(func: Callable):
         nonlocal name
@@ -118,7 +179,7 @@ def step(
                     metadata=metadata,
                 ) as step:
                     try:
-                        step.input = flatten_args_kwargs(func, args, kwargs)
+                        step.input = get_input(func, args, kwargs)
                     except Exception as e:
                         logger.exception(e)
                     result = await func(*args, **kwargs)
@@ -149,7 +210,7 @@ def step(
                     metadata=metadata,
                 ) as step:
                     try:
-                        step.input = flatten_args_kwargs(func, args, kwargs)
+                        step.input = get_input(func, args, kwargs)
                     except Exception as e:
                         logger.exception(e)
                     result = func(*args, **kwargs)
@@ -216,6 +277,9 @@ class Step:
         time.sleep(0.001)
         self._input = ""
         self._output = ""
+        # Contents assigned but not serialized yet, see the input/output properties
+        self._raw_input = None
+        self._raw_output = None
         self.thread_id = thread_id or context.session.thread_id
         self.name = name or ""
         self.type = type
@@ -262,44 +326,86 @@ class Step:
     def _process_content(self, content, set_language=False):
         if content is None:
             return ""
-        content = self._clean_content(content)
 
-        if (
-            isinstance(content, dict)
-            or isinstance(content, list)
-            or isinstance(content, tuple)
-        ):
+        if isinstance(content, (dict, list, tuple)):
             try:
-                processed_content = json.dumps(content, indent=4, ensure_ascii=False)
+                # Binary data is rejected by the encoder, only clean contents holding some
+                try:
+                    processed_content = dumps_content(content)
+                except TypeError:
+                    content = self._clean_content(content)
+                    processed_content = dumps_content(content)
                 if set_language:
-                    self.language = "json"
-            except TypeError:
+                    self._language = "json"
+            except (TypeError, ValueError):
+                # e.g. circular references
                 processed_content = str(content).replace("\\n", "\n")
                 if set_language:
-                    self.language = "text"
-        elif isinstance(content, str):
+                    self._language = "text"
+            return processed_content
+
+        content = self._clean_content(content)
+
+        if isinstance(content, str):
             processed_content = content
         else:
             processed_content = str(content).replace("\\n", "\n")
             if set_language:
-                self.language = "text"
+                self._language = "text"
         return processed_content
 
+    # Non-string contents are serialized when first read (e.g. to be sent), not on
+    # assignment: reassigning a content before it is sent doesn't serialize it again.
+
+    @staticmethod
+    def _snapshot_content(content):
+        # Changes made to a dict/list after its assignment are not sent
+        if isinstance(content, dict):
+            return dict(content)
+        if isinstance(content, list):
+            return list(content)
+        return content
+
     @property
     def input(self):
+        if self._raw_input is not None:
+            self._input = self._process_content(self._raw_input, set_language=False)
+            self._raw_input = None
         return self._input
 
     @input.setter
     def input(self, content: Union[Dict, str]):
-        self._input = self._process_content(content, set_language=False)
+        if content is None or isinstance(content, str):
+            self._input = content or ""
+            self._raw_input = None
+        else:
+            self._raw_input = self._snapshot_content(content)
 
     @property
     def output(self):
+        if self._raw_output is not None:
+            self._output = self._process_content(self._raw_output, set_language=True)
+            self._raw_output = None
         return self._output
 
     @output.setter
     def output(self, content: Union[Dict, str]):
-        self._output = self._process_content(content, set_language=True)
+        if content is None or isinstance(content, str):
+            self._output = content or ""
+            self._raw_output = None
+        else:
+            self._raw_output = self._snapshot_content(content)
+
+    @property
+    def language(self) -> Optional[str]:
+        # The language of a pending output depends on its serialization
+        self.output
+        return self._language
+
+    @language.setter
+    def language(self, language: Optional[str]):
+        self.output
+        self._language = language
 
     def to_dict(self) -> StepDict:
         # Move icon into metadata for storage
@@ -342,7 +448,10 @@ class Step:
 
         if data_layer:
             try:
-                asyncio.create_task(data_layer.update_step(step_dict.copy()))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.update_step(step_dict.copy())
+                else:
+                    asyncio.create_task(data_layer.update_step(step_dict.copy()))
             except Exception as e:
                 if self.fail_on_persist_error:
                     raise e
@@ -367,7 +476,10 @@ class Step:
 
         if data_layer:
             try:
-                asyncio.create_task(data_layer.delete_step(self.id))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.delete_step(self.id)
+                else:
+                    asyncio.create_task(data_layer.delete_step(self.id))
             except Exception as e:
                 if self.fail_on_persist_error:
                     raise e
@@ -393,7 +505,10 @@ class Step:
 
         if data_layer:
             try:
-                asyncio.create_task(data_layer.create_step(step_dict.copy()))
+                if write_behind := get_write_behind_queue():
+                    await write_behind.create_step(step_dict.copy())
+                else:
+                    asyncio.create_task(data_layer.create_step(step_dict.copy()))
                 self.persisted = True
             except Exception as e:
                 if self.fail_on_persist_error:
@@ -0,0 +1,148 @@
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, TypedDict
+
+from chainlit.logger import logger
+
+if TYPE_CHECKING:
+    from chainlit.session import BaseSession
+
+
+class StreamTokenFrame(TypedDict):
+    id: str
+    token: str
+    isSequence: bool
+    isInput: bool
+
+
+class StreamCoalescer:
+    """
+    Buffer streamed tokens for a session and send them in fewer websocket frames.
+
+    Consecutive tokens targeting the same step (and the same input/output field)
+    are merged into a single `stream_token` frame. Pending frames are flushed
+    after `flush_interval` seconds, as soon as `max_buffer_bytes` is reached,
+    or explicitly through `flush()` (before a step is sent, updated or deleted).
+    Frames are always emitted in the order the tokens were received.
+    """
+
+    def __init__(
+        self,
+        session: "BaseSession",
+        flush_interval: float = 0.025,
+        max_buffer_bytes: int = 4096,
+    ):
+        self.session = session
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self._pending: List[StreamTokenFrame] = []
+        self._pending_bytes = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.tokens_received = 0
+        self.frames_sent = 0
+
+    @property
+    def frames_saved(self) -> int:
+        """Number of websocket frames avoided by coalescing tokens."""
+        return self.tokens_received - self.frames_sent - len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tokens_received": self.tokens_received,
+            "frames_sent": self.frames_sent,
+            "frames_saved": self.frames_saved,
+            "pending_frames": len(self._pending),
+        }
+
+    def _buffer(self, frame: StreamTokenFrame):
+        last = self._pending[-1] if self._pending else None
+
+        if last and last["id"] == frame["id"] and last["isInput"] == frame["isInput"]:
+            if frame["isSequence"]:
+                # A sequence replaces the whole content, previous tokens are moot
+                self._pending_bytes -= len(last["token"].encode("utf-8"))
+                self._pending[-1] = frame
+            else:
+                last["token"] += frame["token"]
+        else:
+            self._pending.append(frame)
+
+        self._pending_bytes += len(frame["token"].encode("utf-8"))
+
+    async def add_token(
+        self, id: str, token: str, is_sequence=False, is_input=False
+    ) -> None:
+        """Buffer a token, flushing right away if the byte threshold is reached."""
+        self.tokens_received += 1
+        self._buffer(
+            {
+                "id": id,
+                "token": token,
+                "isSequence": is_sequence,
+                "isInput": is_input,
+            }
+        )
+
+        if self._pending_bytes >= self.max_buffer_bytes:
+            await self.flush()
+        elif not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush streamed tokens: {e!s}")
+
+    async def flush(self) -> None:
+        """Send every pending frame to the client, preserving order."""
+        async with self._lock:
+            if not self._pending:
+                return
+
+            frames = self._pending
+            self._pending = []
+            self._pending_bytes = 0
+
+            for frame in frames:
+                await self.session.emit("stream_token", frame)
+                self.frames_sent += 1
+
+    async def close(self) -> None:
+        """Flush the remaining tokens and stop the pending flush timer."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+
+stream_coalescers: Dict[str, StreamCoalescer] = {}
+
+
+def get_stream_coalescer(session: "BaseSession") -> Optional[StreamCoalescer]:
+    """Return the stream coalescer of a session, if coalescing is enabled."""
+    from chainlit.config import config
+
+    settings = config.project.stream_coalescing
+    if not settings.enabled:
+        return None
+
+    if session.id not in stream_coalescers:
+        stream_coalescers[session.id] = StreamCoalescer(
+            session,
+            flush_interval=settings.flush_interval_ms / 1000,
+            max_buffer_bytes=settings.max_buffer_bytes,
+        )
+
+    return stream_coalescers[session.id]
+
+
+async def remove_stream_coalescer(session_id: str) -> None:
+    """Flush and forget the stream coalescer of a session."""
+    if coalescer := stream_coalescers.pop(session_id, None):
+        try:
+            await coalescer.close()
+        except Exception as e:
+            logger.debug(f"Error while closing stream coalescer: {e!s}")
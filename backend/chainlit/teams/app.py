@@ -12,7 +12,6 @@ if TYPE_CHECKING:
     from botbuilder.core import TurnContext
     from botbuilder.schema import Activity
 
-import httpx
 from botbuilder.core import (
     BotFrameworkAdapter,
     BotFrameworkAdapterSettings,
@@ -34,6 +33,7 @@ from chainlit.context import ChainlitContext, HTTPSession, context, context_var
 from chainlit.data import get_data_layer
 from chainlit.element import Element, ElementDict
 from chainlit.emitter import BaseChainlitEmitter
+from chainlit.http_client import get_http_client
 from chainlit.logger import logger
 from chainlit.message import Message, StepDict
 from chainlit.types import Feedback
@@ -173,12 +173,12 @@ async def get_user(teams_user: ChannelAccount):
 
 
 async def download_teams_file(url: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        if response.status_code == 200:
-            return response.content
-        else:
-            return None
+    client = get_http_client()
+    response = await client.get(url)
+    if response.status_code == 200:
+        return response.content
+    else:
+        return None
 
 
 async def download_teams_files(
@@ -52,6 +52,19 @@ class ThreadDict(TypedDict):
     elements: Optional[List["ElementDict"]]
 
 
+class ThreadStepsPageInfo(TypedDict):
+    # Whether the thread has steps before the window
+    hasOlderSteps: bool
+    # Cursor of the previous window, the oldest top-level step of this one
+    olderStepsCursor: Optional[str]
+
+
+class ThreadPageDict(ThreadDict):
+    """A thread with a window of its steps, to load long threads lazily."""
+
+    stepsPageInfo: ThreadStepsPageInfo
+
+
 class Pagination(BaseModel):
     first: int
     cursor: Optional[str] = None
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional, Tuple
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Bytes of an upload read before validating it, enough to sniff its type
+SNIFF_SIZE = 512
+
+# Signatures of the file types we can recognize from their first bytes
+_SIGNATURES: List[Tuple[bytes, str]] = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"\x7fELF", "application/x-executable"),
+]
+
+PART_HEADERS = "headers"
+PART_DATA = "data"
+PART_END = "end"
+
+
+def _is_windows_executable(data: bytes) -> bool:
+    """
+    Whether the data starts with a PE (.exe, .dll) header: a DOS header ("MZ")
+    with the offset of the PE signature at 0x3C. Text files may start with "MZ" too.
+    """
+    if not data.startswith(b"MZ") or len(data) < 0x40:
+        return False
+
+    pe_offset = int.from_bytes(data[0x3C:0x40], "little")
+    return data[pe_offset : pe_offset + 4] == b"PE\0\0"
+
+
+def sniff_mime_type(data: bytes) -> Optional[str]:
+    """Guess the mime type of a file from its first bytes, None if unknown."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+
+    if _is_windows_executable(data):
+        return "application/x-msdownload"
+
+    for signature, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return mime
+
+    return None
+
+
+async def _iter_multipart_events(
+    request: Request,
+) -> AsyncIterator[Tuple[str, object]]:
+    """Parse a multipart body as it is received, yielding its parts headers and data."""
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("Missing multipart boundary")
+
+    events: List[Tuple[str, object]] = []
+    headers: List[Tuple[bytes, bytes]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers.append((bytes(header_field).lower(), bytes(header_value)))
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append((PART_HEADERS, dict(headers)))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append((PART_DATA, data[start:end]))
+
+    def on_part_end():
+        events.append((PART_END, None))
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    async for chunk in request.stream():
+        parser.write(chunk)
+        # At most one received chunk is buffered
+        pending, events = events, []
+        for event in pending:
+            yield event
+
+    parser.finalize()
+    for event in events:
+        yield event
+
+
+@dataclass
+class StreamedUpload:
+    """A file of a multipart request, read as it is received."""
+
+    filename: str
+    content_type: Optional[str]
+    _events: AsyncIterator[Tuple[str, object]] = field(repr=False)
+    # Unknown until the file is fully read
+    size: Optional[int] = None
+    head: bytes = b""
+    _complete: bool = False
+
+    async def read_head(self, size: int = SNIFF_SIZE) -> bytes:
+        """Read (at least) the first `size` bytes of the file, to validate it."""
+        head = bytearray()
+        async for kind, data in self._events:
+            if kind == PART_DATA:
+                head += data  # type: ignore[operator]
+                if len(head) >= size:
+                    break
+            elif kind == PART_END:
+                self._complete = True
+                break
+        else:
+            self._complete = True
+
+        self.head = bytes(head)
+        return self.head
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        if self.head:
+            yield self.head
+        if self._complete:
+            return
+
+        async for kind, data in self._events:
+            if kind == PART_DATA:
+                yield data  # type: ignore[misc]
+            elif kind == PART_END:
+                return
+
+
+async def read_multipart_file(
+    request: Request, field_name: str = "file"
+) -> Optional[StreamedUpload]:
+    """
+    Read a multipart request until the headers of its `field_name` file.
+
+    The file content is left unread, to be streamed with `StreamedUpload.iter_chunks`.
+    Parsing errors are raised as ValueError, here or while streaming the file.
+    """
+    events = _iter_multipart_events(request)
+
+    async for kind, part_headers in events:
+        if kind != PART_HEADERS:
+            continue
+
+        assert isinstance(part_headers, dict)
+        _, disposition = parse_options_header(
+            part_headers.get(b"content-disposition", b"")
+        )
+        name = disposition.get(b"name", b"").decode("utf-8")
+        filename = disposition.get(b"filename")
+        if name != field_name or filename is None:
+            continue
+
+        content_type = part_headers.get(b"content-type")
+        return StreamedUpload(
+            filename=filename.decode("utf-8"),
+            content_type=content_type.decode("latin-1") if content_type else None,
+            _events=events,
+        )
+
+    return None
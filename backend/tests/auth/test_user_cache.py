@@ -0,0 +1,115 @@
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import chainlit.auth.user_cache as user_cache_module
+from chainlit.auth import authenticate_user, create_jwt, invalidate_persisted_user
+from chainlit.auth.user_cache import PersistedUserCache
+from chainlit.data.base import BaseDataLayer
+from chainlit.user import PersistedUser, User
+
+
+@pytest.fixture
+def persisted_user():
+    return PersistedUser(
+        id="user_id", createdAt="2024-01-01T00:00:00Z", identifier="alice"
+    )
+
+
+@pytest.fixture
+def token_expiry():
+    return int(time.time()) + 3600
+
+
+@pytest.fixture(autouse=True)
+def fresh_user_cache(monkeypatch):
+    monkeypatch.setenv("CHAINLIT_AUTH_SECRET", "test-secret")
+    monkeypatch.setattr(user_cache_module, "_persisted_user_cache", None)
+
+
+def test_cache_hit_and_miss(persisted_user, token_expiry):
+    cache = PersistedUserCache()
+
+    assert cache.get("alice", token_expiry) is None
+    cache.set("alice", token_expiry, persisted_user)
+
+    cached = cache.get("alice", token_expiry)
+    assert cached == persisted_user
+    assert cached is not persisted_user
+    # A different token of the same user is a different entry
+    assert cache.get("alice", token_expiry + 1) is None
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "size": 1,
+        "hit_rate": 1 / 3,
+    }
+
+
+def test_cache_entries_expire(persisted_user, token_expiry):
+    cache = PersistedUserCache(ttl=60)
+    cache.set("alice", token_expiry, persisted_user)
+
+    key = ("alice", token_expiry)
+    cache._entries[key] = (cache._entries[key][0], time.monotonic() - 1)
+
+    assert cache.get("alice", token_expiry) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used(persisted_user, token_expiry):
+    cache = PersistedUserCache(max_size=2)
+
+    cache.set("alice", token_expiry, persisted_user)
+    cache.set("bob", token_expiry, persisted_user)
+    cache.get("alice", token_expiry)
+    cache.set("carol", token_expiry, persisted_user)
+
+    assert cache.get("bob", token_expiry) is None
+    assert cache.get("alice", token_expiry) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_invalidate(persisted_user, token_expiry):
+    cache = PersistedUserCache()
+    cache.set("alice", token_expiry, persisted_user)
+    cache.set("alice", token_expiry + 1, persisted_user)
+
+    cache.invalidate("alice")
+
+    assert cache.stats()["size"] == 0
+    assert cache._keys_by_identifier == {}
+
+
+async def test_authenticate_user_caches_persisted_user(persisted_user):
+    data_layer = AsyncMock(spec=BaseDataLayer)
+    data_layer.get_user.return_value = persisted_user
+    token = create_jwt(User(identifier="alice", display_name="Alice"))
+
+    with patch("chainlit.auth.get_data_layer", return_value=data_layer):
+        first = await authenticate_user(token)
+        second = await authenticate_user(token)
+
+        assert first == second
+        assert second.display_name == "Alice"
+        data_layer.get_user.assert_awaited_once_with("alice")
+
+        invalidate_persisted_user("alice")
+        await authenticate_user(token)
+        assert data_layer.get_user.await_count == 2
+
+
+async def test_authenticate_user_does_not_cache_failures(persisted_user):
+    data_layer = AsyncMock(spec=BaseDataLayer)
+    data_layer.get_user.side_effect = [Exception("db down"), persisted_user]
+    token = create_jwt(User(identifier="alice"))
+
+    with patch("chainlit.auth.get_data_layer", return_value=data_layer):
+        user = await authenticate_user(token)
+        assert not isinstance(user, PersistedUser)
+
+        user = await authenticate_user(token)
+        assert isinstance(user, PersistedUser)
@@ -0,0 +1,71 @@
+"""
+Benchmark the input capture of the @cl.step decorator.
+
+Times capture_input for each policy on the arguments of a retrieval-like
+function: a query, a large document list and a client object.
+
+Usage:
+    python tests/benchmarks/bench_step_decorator.py
+    python tests/benchmarks/bench_step_decorator.py --documents 10000 --max-bytes 4096
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from chainlit.config import config
+from chainlit.step import capture_input, flatten_args_kwargs
+
+
+class Client:
+    def __init__(self):
+        self.session = {f"header-{i}": "x" * 100 for i in range(100)}
+
+
+def retrieve(query: str, documents: List[dict], client: Client, top_k: int = 5):
+    pass
+
+
+def timeit(fn: Callable[[], object], runs: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main(n_documents: int, max_bytes: int, runs: int):
+    documents = [
+        {"id": f"doc-{i}", "text": "lorem ipsum " * 50, "score": i / n_documents}
+        for i in range(n_documents)
+    ]
+    args = ("what is chainlit?", documents, Client())
+
+    # The policies serialize as configured, indented by default
+    config.project.step_serialization.compact_json = False
+
+    scenarios = {
+        "legacy": lambda: flatten_args_kwargs(retrieve, args, {}),
+        "none": lambda: capture_input(retrieve, args, {}, "none"),
+        "repr": lambda: capture_input(retrieve, args, {}, "repr"),
+        "json": lambda: capture_input(retrieve, args, {}, "json", max_bytes),
+        "deepcopy": lambda: capture_input(retrieve, args, {}, "deepcopy"),
+    }
+
+    print(f"{n_documents} documents, json budget of {max_bytes} bytes")
+    print(f"{'policy':<10} {'median (us)':>14}")
+    for name, fn in scenarios.items():
+        print(f"{name:<10} {timeit(fn, runs):>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--max-bytes", type=int, default=8192)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.documents, args.max_bytes, args.runs)
@@ -0,0 +1,170 @@
+"""
+Benchmark the serialization of steps and messages sent to the UI.
+
+Times the creation, update and streaming of Steps and Messages, including the
+encoding of the websocket frames, for each serialization setting: indented or
+compact contents, with the standard library or orjson.
+
+Usage:
+    python tests/benchmarks/bench_step_serialization.py
+    python tests/benchmarks/bench_step_serialization.py --items 1000 --tokens 500
+
+Step and Message creation include the 1ms sleep of their constructors.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from chainlit.config import config
+from chainlit.context import ChainlitContext, context_var
+from chainlit.emitter import BaseChainlitEmitter
+from chainlit.message import Message
+from chainlit.serialization import OrjsonPacketSerializer, orjson
+from chainlit.session import HTTPSession
+from chainlit.step import Step, StepDict
+
+
+class EncodingEmitter(BaseChainlitEmitter):
+    """Emitter encoding the payloads like python-socketio does, without sending them."""
+
+    def __init__(self, session: HTTPSession, json_module: Any):
+        super().__init__(session)
+        self.json = json_module
+        self.frames = 0
+        self.bytes = 0
+
+    def encode(self, event: str, data: Any):
+        frame = self.json.dumps([event, data], separators=(",", ":"))
+        self.frames += 1
+        self.bytes += len(frame)
+
+    async def send_step(self, step_dict: StepDict):
+        self.encode("new_message", step_dict)
+
+    async def update_step(self, step_dict: StepDict):
+        self.encode("update_message", step_dict)
+
+    async def stream_start(self, step_dict: StepDict):
+        self.encode("stream_start", step_dict)
+
+    async def send_token(self, id: str, token: str, is_sequence=False, is_input=False):
+        self.encode(
+            "stream_token",
+            {"id": id, "token": token, "isSequence": is_sequence, "isInput": is_input},
+        )
+
+
+def tool_payload(i: int) -> Dict:
+    return {
+        "query": f"query {i}",
+        "filters": {"tags": ["alpha", "beta", "gamma"], "limit": 20},
+        "documents": [
+            {"id": f"doc-{i}-{d}", "score": d / 10, "text": "lorem ipsum " * 20}
+            for d in range(10)
+        ],
+    }
+
+
+async def create_steps(n: int):
+    for i in range(n):
+        step = Step(name="tool", type="tool")
+        step.input = tool_payload(i)
+        step.output = tool_payload(i)
+        await step.send()
+
+
+async def update_steps(steps: List[Step]):
+    for i, step in enumerate(steps):
+        step.output = tool_payload(i)
+        await step.update()
+
+
+async def stream_step(step: Step, tokens: int):
+    for i in range(tokens):
+        await step.stream_token(f"token {i} ")
+    await step.update()
+
+
+async def create_messages(n: int):
+    for i in range(n):
+        await Message(content=tool_payload(i)).send()
+
+
+async def update_messages(messages: List[Message]):
+    for message in messages:
+        message.content += "."
+        await message.update()
+
+
+async def stream_message(message: Message, tokens: int):
+    for i in range(tokens):
+        await message.stream_token(f"token {i} ")
+    await message.update()
+
+
+async def timeit(fn: Callable[[], Awaitable], runs: int) -> float:
+    await fn()  # warm up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def run(label: str, json_module: Any, n_items: int, n_tokens: int, runs: int):
+    session = HTTPSession(id="bench", thread_id="bench", client_type="webapp")
+    emitter = EncodingEmitter(session, json_module)
+    context_var.set(ChainlitContext(session, emitter))
+
+    steps = [Step(name="tool", type="tool") for _ in range(n_items)]
+    messages = [Message(content=tool_payload(i)) for i in range(n_items)]
+
+    scenarios = {
+        "step create": lambda: create_steps(n_items),
+        "step update": lambda: update_steps(steps),
+        "step stream": lambda: stream_step(Step(name="llm", type="llm"), n_tokens),
+        "msg create": lambda: create_messages(n_items),
+        "msg update": lambda: update_messages(messages),
+        "msg stream": lambda: stream_message(Message(content=""), n_tokens),
+    }
+
+    results = {}
+    for name, fn in scenarios.items():
+        emitter.frames = emitter.bytes = 0
+        results[name] = (await timeit(fn, runs), emitter.bytes // (runs + 1))
+
+    print(f"\n[{label}]")
+    print(f"{'scenario':<12} {'median (ms)':>12} {'bytes/run':>12}")
+    for name, (median, size) in results.items():
+        print(f"{name:<12} {median:>12.2f} {size:>12}")
+
+
+async def main(n_items: int, n_tokens: int, runs: int):
+    settings = config.project.step_serialization
+
+    variants = [("indented, json", False, False), ("compact, json", True, False)]
+    if orjson is not None:
+        variants.append(("compact, orjson", True, True))
+    else:
+        print("orjson is not installed, skipping its variant")
+
+    for label, compact_json, use_orjson in variants:
+        settings.compact_json = compact_json
+        settings.orjson = use_orjson
+        json_module = OrjsonPacketSerializer if use_orjson else json
+        await run(label, json_module, n_items, n_tokens, runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.items, args.tokens, args.runs))
@@ -10,12 +10,21 @@ import pytest_asyncio
 from chainlit import config
 from chainlit.callbacks import data_layer
 from chainlit.context import ChainlitContext, context_var
+from chainlit.data.acl import clear_thread_author_cache
 from chainlit.data.base import BaseDataLayer
 from chainlit.session import HTTPSession, WebsocketSession
 from chainlit.user import PersistedUser
 from chainlit.user_session import UserSession
 
 
+@pytest.fixture(autouse=True)
+def reset_thread_author_cache():
+    """Thread authors cached by a test must not authorize the next ones."""
+    clear_thread_author_cache()
+    yield
+    clear_thread_author_cache()
+
+
 @pytest.fixture
 def persisted_test_user():
     return PersistedUser(
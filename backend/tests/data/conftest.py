@@ -13,6 +13,12 @@ def mock_storage_client():
         "url": "https://example.com/test.txt",
         "object_key": "test_user/test_element/test.txt",
     }
+    mock_client.upload_stream.return_value = mock_client.upload_file.return_value
+
+    async def get_read_urls(object_keys):
+        return {key: await mock_client.get_read_url(key) for key in object_keys}
+
+    mock_client.get_read_urls.side_effect = get_read_urls
     return mock_client
 
 
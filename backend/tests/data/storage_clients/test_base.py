@@ -0,0 +1,146 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from chainlit.data.storage_clients import base
+from chainlit.data.storage_clients.base import (
+    BaseStorageClient,
+    ReadUrlCache,
+    iter_chunks,
+)
+
+
+async def _stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(source, chunk_size: int):
+    return [chunk async for chunk in iter_chunks(source, chunk_size)]
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks_rechunks_stream():
+    chunks = await _collect(_stream(b"ab", b"cdefg", b"", b"h"), 3)
+    assert chunks == [b"abc", b"def", b"gh"]
+
+
+@pytest.mark.asyncio
+async def test_iter_chunks_reads_file(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"0123456789")
+
+    assert await _collect(str(path), 4) == [b"0123", b"4567", b"89"]
+    assert await _collect(path, 20) == [b"0123456789"]
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_falls_back_to_upload_file():
+    class InMemoryStorageClient(BaseStorageClient):
+        upload_file = AsyncMock(return_value={"object_key": "key"})
+        delete_file = AsyncMock()
+        get_read_url = AsyncMock()
+        close = AsyncMock()
+
+    client = InMemoryStorageClient()
+    result = await client.upload_stream(
+        "key", _stream(b"a", b"b"), mime="text/plain", content_disposition="inline"
+    )
+
+    assert result == {"object_key": "key"}
+    client.upload_file.assert_awaited_once_with(
+        object_key="key",
+        data=b"ab",
+        mime="text/plain",
+        overwrite=True,
+        content_disposition="inline",
+    )
+
+
+class SigningStorageClient(BaseStorageClient):
+    def __init__(self):
+        self.signed = []
+
+    async def upload_file(
+        self, object_key, data, mime="", overwrite=True, content_disposition=None
+    ):
+        return {}
+
+    async def delete_file(self, object_key):
+        return True
+
+    async def get_read_url(self, object_key):
+        self.signed.append(object_key)
+        if object_key == "broken":
+            raise ValueError("cannot sign")
+        return f"https://example.com/{object_key}?sig={len(self.signed)}"
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_get_read_urls_reuses_cached_urls():
+    client = SigningStorageClient()
+
+    first = await client.get_read_urls(["a", "b", "a"])
+    second = await client.get_read_urls(["b", "c"])
+
+    assert client.signed == ["a", "b", "c"]
+    assert first == {
+        "a": "https://example.com/a?sig=1",
+        "b": "https://example.com/b?sig=2",
+    }
+    assert second["b"] == first["b"]
+    assert await client.get_read_urls(["a"]) == {"a": first["a"]}
+    assert client.read_url_cache.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_read_urls_leaves_out_failures():
+    client = SigningStorageClient()
+
+    assert await client.get_read_urls(["broken", "a"]) == {
+        "a": "https://example.com/a?sig=2"
+    }
+    # Failures are not cached
+    await client.get_read_urls(["broken"])
+    assert client.signed.count("broken") == 2
+
+
+@pytest.mark.asyncio
+async def test_get_read_urls_bounds_concurrency(monkeypatch):
+    monkeypatch.setattr(base, "read_url_concurrency", 2)
+    running = 0
+    max_running = 0
+
+    class SlowStorageClient(SigningStorageClient):
+        async def get_read_url(self, object_key):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return object_key
+
+    urls = await SlowStorageClient().get_read_urls(str(i) for i in range(6))
+
+    assert len(urls) == 6
+    assert max_running == 2
+
+
+def test_read_url_cache_expires_and_evicts():
+    cache = ReadUrlCache(ttl=60, max_size=2)
+    cache.set("a", "url_a")
+    cache.set("b", "url_b")
+    cache.get("a")
+    cache.set("c", "url_c")
+
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    cache._entries["a"] = ("url_a", time.monotonic() - 1)
+    assert cache.get("a") is None
+    assert cache.get("c") == "url_c"
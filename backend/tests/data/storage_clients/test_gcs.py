@@ -2,7 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from chainlit.data.storage_clients.base import storage_expiry_time
+from chainlit.data.storage_clients.base import storage_expiry_time, upload_chunk_size
 from chainlit.data.storage_clients.gcs import GCSStorageClient
 
 
@@ -335,3 +335,34 @@ class TestGCSStorageClient:
         mock_gcs_client["bucket"].blob.assert_called_once_with("test/path/file.txt")
         mock_gcs_client["blob"].delete.assert_called_once()
         assert result is True
+
+    @pytest.mark.asyncio
+    async def test_upload_stream_resumable(self, mock_gcs_client):
+        """Test streaming a large file with a resumable upload."""
+        client = GCSStorageClient(
+            bucket_name="test-bucket",
+            project_id="test-project",
+            client_email="test@example.com",
+            private_key="test-key",
+        )
+        mock_gcs_client["blob"].generate_signed_url.return_value = "https://signed-url"
+        writer = mock_gcs_client["blob"].open.return_value
+
+        async def stream():
+            for _ in range(9):
+                yield b"x" * 1024 * 1024
+
+        result = await client.upload_stream(
+            object_key="test/large.bin", source=stream(), mime="application/pdf"
+        )
+
+        mock_gcs_client["blob"].open.assert_called_once_with(
+            "wb", content_type="application/pdf", chunk_size=upload_chunk_size
+        )
+        assert [len(c.args[0]) for c in writer.write.call_args_list] == [
+            upload_chunk_size,
+            9 * 1024 * 1024 - upload_chunk_size,
+        ]
+        writer.close.assert_called_once()
+        mock_gcs_client["blob"].upload_from_string.assert_not_called()
+        assert result == {"object_key": "test/large.bin", "url": "https://signed-url"}
@@ -45,3 +45,85 @@ async def test_upload_file(s3_mock):
     # Verify that the file exists in the mock S3
     response = s3_mock.get_object(Bucket="my-test-bucket", Key="test.txt")
     assert response["Body"].read().decode() == "This is a test file"
+
+
+async def _stream(chunk: bytes, count: int):
+    for _ in range(count):
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_multipart(s3_mock):
+    client = S3StorageClient(bucket="my-test-bucket")
+
+    # 12 MiB, sent as an 8 MiB part and a 4 MiB part
+    result = await client.upload_stream(
+        object_key="large.bin",
+        source=_stream(b"x" * 1024 * 1024, 12),
+        mime="application/pdf",
+        content_disposition='attachment; filename="large.bin"',
+    )
+
+    assert result["object_key"] == "large.bin"
+    response = s3_mock.get_object(Bucket="my-test-bucket", Key="large.bin")
+    assert response["ContentLength"] == 12 * 1024 * 1024
+    assert response["ContentType"] == "application/pdf"
+    assert response["ContentDisposition"] == 'attachment; filename="large.bin"'
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_small_file(s3_mock, tmp_path):
+    client = S3StorageClient(bucket="my-test-bucket")
+    path = tmp_path / "small.txt"
+    path.write_bytes(b"small file")
+
+    result = await client.upload_stream(object_key="small.txt", source=str(path))
+
+    assert result["object_key"] == "small.txt"
+    response = s3_mock.get_object(Bucket="my-test-bucket", Key="small.txt")
+    assert response["Body"].read() == b"small file"
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_failed_upload(s3_mock):
+    client = S3StorageClient(bucket="my-test-bucket")
+
+    async def failing_stream():
+        # Two parts are uploaded before the failure
+        yield b"x" * 17 * 1024 * 1024
+        raise OSError("connection lost")
+
+    result = await client.upload_stream(
+        object_key="broken.bin", source=failing_stream()
+    )
+
+    assert result == {}
+    assert (
+        s3_mock.list_multipart_uploads(Bucket="my-test-bucket").get("Uploads") is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_file_invalidates_read_url(s3_mock):
+    client = S3StorageClient(bucket="my-test-bucket")
+    await client.upload_file(object_key="test.txt", data="content")
+
+    urls = await client.get_read_urls(["test.txt"])
+    assert "test.txt" in urls
+    assert client.read_url_cache.get("test.txt") == urls["test.txt"]
+
+    assert await client.delete_file("test.txt")
+    assert client.read_url_cache.get("test.txt") is None
+
+
+@pytest.mark.asyncio
+async def test_get_read_urls_does_not_cache_failures(s3_mock):
+    client = S3StorageClient(bucket="my-test-bucket")
+
+    def failing_presign(*args, **kwargs):
+        raise ValueError("cannot sign")
+
+    client.client.generate_presigned_url = failing_presign
+
+    assert await client.get_read_urls(["test.txt"]) == {}
+    assert client.read_url_cache.stats()["size"] == 0
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from chainlit.data.acl import (
+    ThreadAuthorCache,
+    get_thread_author_cache,
+    is_thread_author,
+)
+from chainlit.data.base import BaseDataLayer
+
+
+@pytest.fixture
+def data_layer():
+    data_layer = AsyncMock(spec=BaseDataLayer)
+    data_layer.get_thread_author.return_value = "author"
+    with patch("chainlit.data.acl.get_data_layer", return_value=data_layer):
+        yield data_layer
+
+
+async def test_is_thread_author_caches_the_author(data_layer):
+    assert await is_thread_author("author", "thread_1") is True
+    assert await is_thread_author("author", "thread_1") is True
+
+    data_layer.get_thread_author.assert_awaited_once_with("thread_1")
+    assert get_thread_author_cache().stats()["hits"] == 1
+
+
+async def test_is_thread_author_rejects_other_users(data_layer):
+    with pytest.raises(HTTPException) as exc_info:
+        await is_thread_author("other", "thread_1")
+    assert exc_info.value.status_code == 401
+
+    # The cached author is checked the same way
+    with pytest.raises(HTTPException) as exc_info:
+        await is_thread_author("other", "thread_1")
+    assert exc_info.value.status_code == 401
+    data_layer.get_thread_author.assert_awaited_once()
+
+
+async def test_is_thread_author_does_not_cache_missing_threads(data_layer):
+    data_layer.get_thread_author.return_value = None
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await is_thread_author("author", "thread_1")
+        assert exc_info.value.status_code == 404
+
+    assert data_layer.get_thread_author.await_count == 2
+
+
+async def test_is_thread_author_after_invalidation(data_layer):
+    await is_thread_author("author", "thread_1")
+    get_thread_author_cache().invalidate("thread_1")
+    await is_thread_author("author", "thread_1")
+
+    assert data_layer.get_thread_author.await_count == 2
+
+
+def test_lru_eviction():
+    cache = ThreadAuthorCache(max_size=2)
+    cache.set("thread_1", "a")
+    cache.set("thread_2", "b")
+    cache.get("thread_1")
+    cache.set("thread_3", "c")
+
+    assert cache.get("thread_2") is None
+    assert cache.get("thread_1") == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_with_zero_size():
+    cache = ThreadAuthorCache(max_size=0)
+    cache.set("thread_1", "a")
+
+    assert cache.get("thread_1") is None
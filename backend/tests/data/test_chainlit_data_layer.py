@@ -1,9 +1,12 @@
 import json
+from datetime import datetime
 from unittest.mock import AsyncMock
 
+import asyncpg  # type: ignore
 import pytest
 
-from chainlit.data.chainlit_data_layer import ChainlitDataLayer
+from chainlit.data.chainlit_data_layer import ChainlitDataLayer, pool_options_from_env
+from chainlit.types import Pagination, ThreadFilter
 
 
 @pytest.mark.asyncio
@@ -222,3 +225,361 @@ async def test_create_step_uses_nullif_for_output_and_input():
     assert "NULLIF(EXCLUDED.input, '')" in source, (
         "input should use NULLIF to treat empty string as NULL"
     )
+
+
+@pytest.mark.asyncio
+async def test_get_thread_signs_element_urls_in_one_batch(mock_storage_client):
+    """Element URLs are resolved together through the storage client's URL cache."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test",
+        storage_client=mock_storage_client,
+        show_logger=False,
+    )
+
+    def element_row(element_id, url=None, object_key=None):
+        return {
+            "id": element_id,
+            "threadId": "thread-1",
+            "stepId": "step-1",
+            "metadata": "{}",
+            "url": url,
+            "name": f"{element_id}.png",
+            "mime": "image/png",
+            "objectKey": object_key,
+            "display": "inline",
+            "size": None,
+            "language": None,
+            "page": None,
+        }
+
+    thread_row = {
+        "id": "thread-1",
+        "createdAt": datetime(2024, 1, 1),
+        "name": "Thread",
+        "userId": None,
+        "user_identifier": None,
+        "metadata": {},
+        "steps": [],
+        "elements": [
+            element_row("a", object_key="user/a"),
+            element_row("b", object_key="user/b"),
+            element_row("c", url="https://example.com/external.png"),
+        ],
+    }
+    data_layer.execute_query = AsyncMock(return_value=[thread_row])
+    mock_storage_client.get_read_urls.side_effect = None
+    mock_storage_client.get_read_urls.return_value = {"user/a": "https://storage/a"}
+
+    thread = await data_layer.get_thread("thread-1")
+
+    assert thread is not None
+    assert [element["url"] for element in thread["elements"]] == [
+        "https://storage/a",
+        None,
+        "https://example.com/external.png",
+    ]
+    mock_storage_client.get_read_urls.assert_awaited_once()
+    assert list(mock_storage_client.get_read_urls.await_args.args[0]) == [
+        "user/a",
+        "user/b",
+    ]
+    mock_storage_client.get_read_url.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_thread_hydrates_in_one_query():
+    """Steps and elements aggregated as JSON are converted like fetched rows."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+    steps = [
+        {
+            "id": "step-1",
+            "threadId": "thread-1",
+            "parentId": None,
+            "name": "assistant",
+            "type": "assistant_message",
+            "input": "",
+            "output": "Hello",
+            "metadata": {"favorite": True},
+            "createdAt": "2024-01-01T10:00:00.12",
+            "startTime": "2024-01-01T10:00:00",
+            "endTime": "2024-01-01T10:00:01.5",
+            "showInput": "json",
+            "isError": False,
+            "feedback_id": "feedback-1",
+            "feedback_value": 1,
+            "feedback_comment": None,
+        }
+    ]
+    data_layer.execute_query = AsyncMock(
+        return_value=[
+            {
+                "id": "thread-1",
+                "createdAt": datetime(2024, 1, 1),
+                "name": "Thread",
+                "userId": "user-1",
+                "user_identifier": "alice",
+                # Text, as fetched without the JSON codec
+                "metadata": '{"key": "value"}',
+                "steps": json.dumps(steps),
+                "elements": "[]",
+            }
+        ]
+    )
+
+    thread = await data_layer.get_thread("thread-1")
+
+    assert data_layer.execute_query.await_count == 1
+    assert thread is not None
+    assert thread["metadata"] == {"key": "value"}
+    step = thread["steps"][0]
+    assert step["metadata"] == {"favorite": True}
+    assert step["createdAt"] == "2024-01-01T10:00:00.120000"
+    assert step["start"] == "2024-01-01T10:00:00"
+    assert step["end"] == "2024-01-01T10:00:01.500000"
+    assert step["feedback"] == {
+        "forId": "step-1",
+        "id": "feedback-1",
+        "value": 1,
+        "comment": None,
+    }
+    assert thread["elements"] == []
+
+
+@pytest.mark.asyncio
+async def test_list_threads_uses_keyset_pagination():
+    """The page after a cursor is fetched on (updatedAt, id), without counting threads."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+
+    def thread_row(thread_id):
+        return {
+            "id": thread_id,
+            "updatedAt": datetime(2024, 1, 1),
+            "name": thread_id,
+            "userId": "user-1",
+            "user_identifier": "alice",
+            "metadata": {},
+        }
+
+    data_layer.execute_query = AsyncMock(
+        return_value=[thread_row("t3"), thread_row("t2"), thread_row("t1")]
+    )
+
+    response = await data_layer.list_threads(
+        Pagination(first=2, cursor="t4"), ThreadFilter(userId="user-1")
+    )
+
+    query, params = data_layer.execute_query.call_args.args
+    assert "COUNT(" not in query
+    assert '(t."updatedAt", t.id) < (' in query
+    assert 'ORDER BY t."updatedAt" DESC, t.id DESC' in query
+    assert list(params.values()) == ["user-1", "t4", 3]
+
+    assert [thread["id"] for thread in response.data] == ["t3", "t2"]
+    assert response.pageInfo.hasNextPage is True
+    assert response.pageInfo.endCursor == "t2"
+
+
+def _thread_page_row(steps, elements, has_older_steps, older_steps_cursor):
+    return {
+        "id": "thread-1",
+        "createdAt": datetime(2024, 1, 1),
+        "name": "Thread",
+        "userId": None,
+        "user_identifier": None,
+        "metadata": {},
+        "steps": json.dumps(steps),
+        "elements": json.dumps(elements),
+        "has_older_steps": has_older_steps,
+        "older_steps_cursor": older_steps_cursor,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_fetches_latest_window():
+    """The latest top-level steps are selected in the database, in one query."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+    steps = [
+        {
+            "id": step_id,
+            "threadId": "thread-1",
+            "parentId": parent_id,
+            "name": step_id,
+            "type": "assistant_message",
+            "input": "",
+            "output": step_id,
+            "metadata": {},
+            "createdAt": "2024-01-01T10:00:00",
+            "startTime": "2024-01-01T10:00:00",
+            "endTime": "2024-01-01T10:00:00",
+            "showInput": "json",
+            "isError": False,
+            "feedback_id": None,
+            "feedback_value": None,
+            "feedback_comment": None,
+        }
+        for step_id, parent_id in (("step-2", None), ("step-2-1", "step-2"))
+    ]
+    data_layer.execute_query = AsyncMock(
+        return_value=[_thread_page_row(steps, [], True, "step-2")]
+    )
+
+    page = await data_layer.get_thread_page("thread-1", limit=1)
+
+    query, params = data_layer.execute_query.call_args.args
+    assert data_layer.execute_query.await_count == 1
+    assert 'ORDER BY s."startTime" DESC, s.id DESC' in query
+    assert "WITH RECURSIVE" in query
+    # The latest window also gets the elements not attached to a step
+    assert 'e."stepId" IS NULL' in query
+    assert "$3" not in query
+    assert list(params.values()) == ["thread-1", 1]
+
+    assert page is not None
+    assert [step["id"] for step in page["steps"]] == ["step-2", "step-2-1"]
+    assert page["stepsPageInfo"] == {
+        "hasOlderSteps": True,
+        "olderStepsCursor": "step-2",
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_fetches_older_window():
+    """Older windows are fetched on (startTime, id) before the cursor step."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+    data_layer.execute_query = AsyncMock(
+        return_value=[_thread_page_row([], [], False, "step-1")]
+    )
+
+    page = await data_layer.get_thread_page("thread-1", limit=20, before="step-2")
+
+    query, params = data_layer.execute_query.call_args.args
+    assert '(s."startTime", s.id) < (' in query
+    assert 'e."stepId" IS NULL' not in query
+    assert list(params.values()) == ["thread-1", 20, "step-2"]
+
+    assert page is not None
+    assert page["stepsPageInfo"] == {"hasOlderSteps": False, "olderStepsCursor": None}
+
+
+@pytest.mark.asyncio
+async def test_get_thread_page_missing_thread():
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+    data_layer.execute_query = AsyncMock(return_value=[])
+
+    assert await data_layer.get_thread_page("thread-1", limit=20) is None
+
+
+@pytest.mark.asyncio
+async def test_create_indexes():
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", storage_client=None, show_logger=False
+    )
+    data_layer.execute_query = AsyncMock(return_value=[])
+
+    await data_layer.create_indexes()
+
+    statements = [call.args[0] for call in data_layer.execute_query.call_args_list]
+    assert any('"Thread_userId_updatedAt_id_idx"' in s for s in statements)
+    assert any('"Step_favorite_threadId_idx"' in s for s in statements)
+    assert any('"Step_threadId_startTime_id_idx"' in s for s in statements)
+    assert all("IF NOT EXISTS" in s for s in statements)
+
+
+class FakeConnection:
+    def __init__(self, error=None):
+        self.error = error
+        self.terminated = False
+        self.queries = []
+
+    async def fetch(self, query, *args, timeout=None):
+        self.queries.append((query, args, timeout))
+        if self.error:
+            raise self.error
+        return [{"id": 1}]
+
+    def terminate(self):
+        self.terminated = True
+
+
+class FakePool:
+    def __init__(self, *connections):
+        self.connections = list(connections)
+        self.released = []
+
+    async def acquire(self):
+        return self.connections.pop(0)
+
+    async def release(self, connection):
+        self.released.append(connection)
+
+    def get_size(self):
+        return 2
+
+    def get_idle_size(self):
+        return 2 - len(self.connections)
+
+
+@pytest.mark.asyncio
+async def test_execute_query_retries_on_a_new_connection():
+    """A broken connection is dropped on its own, the pool is kept."""
+    data_layer = ChainlitDataLayer(
+        database_url="postgresql://test", query_timeout=5, show_logger=False
+    )
+    broken = FakeConnection(
+        asyncpg.exceptions.ConnectionDoesNotExistError("connection was closed")
+    )
+    healthy = FakeConnection()
+    pool = FakePool(broken, healthy)
+    data_layer.pool = pool  # type: ignore[assignment]
+
+    result = await data_layer.execute_query("SELECT $1", {"id": 1})
+
+    assert result == [{"id": 1}]
+    assert broken.terminated
+    assert not healthy.terminated
+    assert healthy.queries == [("SELECT $1", (1,), 5)]
+    assert pool.released == [broken, healthy]
+    assert data_layer.pool is pool
+
+    stats = data_layer.pool_stats()
+    assert stats["acquired"] == 2
+    assert stats["connection_errors"] == 1
+    assert stats["waiting"] == 0
+    assert stats["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_query_does_not_retry_query_errors():
+    data_layer = ChainlitDataLayer(database_url="postgresql://test")
+    failing = FakeConnection(ValueError("syntax error"))
+    data_layer.pool = FakePool(failing, FakeConnection())  # type: ignore[assignment]
+
+    with pytest.raises(ValueError, match="syntax error"):
+        await data_layer.execute_query("SELEC 1")
+
+    assert not failing.terminated
+    assert data_layer.pool_stats()["acquired"] == 1
+
+
+def test_pool_options_from_env(monkeypatch):
+    monkeypatch.setenv("DATABASE_POOL_MAX_SIZE", "20")
+    monkeypatch.setenv("DATABASE_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.setenv("DATABASE_QUERY_TIMEOUT", "2.5")
+    monkeypatch.delenv("DATABASE_POOL_MIN_SIZE", raising=False)
+    monkeypatch.delenv("DATABASE_POOL_MAX_INACTIVE_LIFETIME", raising=False)
+
+    assert pool_options_from_env() == {
+        "max_pool_size": 20,
+        "statement_cache_size": 0,
+        "query_timeout": 2.5,
+    }
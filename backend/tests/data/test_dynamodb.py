@@ -0,0 +1,212 @@
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from chainlit.data.dynamodb import DynamoDBDataLayer
+from chainlit.data.storage_clients.base import BaseStorageClient
+from chainlit.element import Text
+from chainlit.user import User
+
+TABLE_NAME = "chainlit"
+
+
+@pytest.fixture
+def dynamodb_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName=TABLE_NAME,
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+                {"AttributeName": "UserThreadPK", "AttributeType": "S"},
+                {"AttributeName": "UserThreadSK", "AttributeType": "S"},
+            ],
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "UserThread",
+                    "KeySchema": [
+                        {"AttributeName": "UserThreadPK", "KeyType": "HASH"},
+                        {"AttributeName": "UserThreadSK", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {
+                        "ProjectionType": "INCLUDE",
+                        "NonKeyAttributes": ["id", "name"],
+                    },
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+@pytest.fixture
+def data_layer(dynamodb_client, mock_storage_client: BaseStorageClient):
+    mock_storage_client.get_read_url.side_effect = lambda object_key: (
+        f"https://example.com/{object_key}"
+    )
+    return DynamoDBDataLayer(
+        table_name=TABLE_NAME,
+        client=dynamodb_client,
+        storage_provider=mock_storage_client,
+        max_concurrency=4,
+    )
+
+
+async def _create_thread(data_layer: DynamoDBDataLayer, thread_id: str, steps: int):
+    await data_layer.update_thread(thread_id, name="Test thread", user_id="user_1")
+    for i in range(steps):
+        await data_layer.create_step(
+            {
+                "id": f"step_{i:03d}",
+                "threadId": thread_id,
+                "name": "assistant",
+                "type": "assistant_message",
+                "output": f"output {i}",
+                "createdAt": f"2024-01-01T00:00:{i:02d}Z",
+                "metadata": {"favorite": i == 1},
+            }  # type: ignore
+        )
+
+
+async def test_create_and_get_user(data_layer: DynamoDBDataLayer, test_user: User):
+    await data_layer.create_user(test_user)
+
+    persisted_user = await data_layer.get_user(test_user.identifier)
+
+    assert persisted_user is not None
+    assert persisted_user.identifier == test_user.identifier
+
+
+async def test_client_calls_run_off_the_event_loop(
+    data_layer: DynamoDBDataLayer, test_user: User
+):
+    loop_thread = threading.current_thread()
+    call_threads = []
+    get_item = data_layer.client.get_item
+
+    def recording_get_item(**kwargs):
+        call_threads.append(threading.current_thread())
+        return get_item(**kwargs)
+
+    data_layer.client.get_item = recording_get_item  # type: ignore
+
+    await data_layer.get_user(test_user.identifier)
+
+    assert call_threads
+    assert loop_thread not in call_threads
+
+
+async def test_get_thread_pages_steps_and_elements(
+    mock_chainlit_context, data_layer: DynamoDBDataLayer
+):
+    async with mock_chainlit_context:
+        await _create_thread(data_layer, "thread_1", steps=30)
+        for i in range(3):
+            await data_layer.create_element(
+                Text(
+                    id=f"element_{i}",
+                    name=f"element_{i}",
+                    content="content",
+                    thread_id="thread_1",
+                    for_id="step_000",
+                )
+            )
+
+        # Force every query to paginate
+        query = data_layer.client.query
+        data_layer.client.query = lambda **kwargs: query(Limit=4, **kwargs)  # type: ignore
+
+        thread = await data_layer.get_thread("thread_1")
+
+    assert thread is not None
+    assert thread["name"] == "Test thread"
+    assert [step["id"] for step in thread["steps"]] == [
+        f"step_{i:03d}" for i in range(30)
+    ]
+    assert sorted(element["id"] for element in thread["elements"]) == [
+        "element_0",
+        "element_1",
+        "element_2",
+    ]
+    assert all(
+        element["url"] == f"https://example.com/{element['objectKey']}"
+        for element in thread["elements"]
+    )
+
+
+async def test_get_thread_missing(data_layer: DynamoDBDataLayer):
+    assert await data_layer.get_thread("missing") is None
+
+
+async def test_delete_thread(mock_chainlit_context, data_layer: DynamoDBDataLayer):
+    async with mock_chainlit_context:
+        await _create_thread(data_layer, "thread_1", steps=30)
+
+    await data_layer.delete_thread("thread_1")
+
+    assert await data_layer.get_thread("thread_1") is None
+    response = data_layer.client.query(
+        TableName=TABLE_NAME,
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": {"S": "THREAD#thread_1"}},
+    )
+    assert response["Items"] == []
+
+
+async def test_get_favorite_steps(mock_chainlit_context, data_layer: DynamoDBDataLayer):
+    async with mock_chainlit_context:
+        await _create_thread(data_layer, "thread_1", steps=3)
+        await _create_thread(data_layer, "thread_2", steps=3)
+
+    favorites = await data_layer.get_favorite_steps("user_1")
+
+    assert [step["id"] for step in favorites] == ["step_001", "step_001"]
+    assert all("PK" not in step and "SK" not in step for step in favorites)
+
+
+async def test_favorites_index(mock_chainlit_context, data_layer: DynamoDBDataLayer):
+    async with mock_chainlit_context:
+        await _create_thread(data_layer, "thread_1", steps=3)
+        await _create_thread(data_layer, "thread_2", steps=3)
+
+        data_layer.favorites_index = True
+        # Favorites set before the index was enabled are indexed by the scan
+        await data_layer.create_favorites_index()
+        favorites = await data_layer.get_favorite_steps("user_1")
+        assert [(step["threadId"], step["id"]) for step in favorites] == [
+            ("thread_1", "step_001"),
+            ("thread_2", "step_001"),
+        ]
+
+        for step_id, favorite in (("step_002", True), ("step_001", False)):
+            await data_layer.set_step_favorite(
+                {"id": step_id, "threadId": "thread_1", "metadata": {}},  # type: ignore
+                favorite,
+            )
+
+    favorites = await data_layer.get_favorite_steps("user_1")
+    assert [(step["threadId"], step["id"]) for step in favorites] == [
+        ("thread_1", "step_002"),
+        ("thread_2", "step_001"),
+    ]
+    assert all("PK" not in step and "SK" not in step for step in favorites)
+
+    await data_layer.delete_thread("thread_1")
+    favorites = await data_layer.get_favorite_steps("user_1")
+    assert [step["id"] for step in favorites] == ["step_001"]
+    response = data_layer.client.query(
+        TableName=TABLE_NAME,
+        KeyConditionExpression="PK = :pk",
+        ExpressionAttributeValues={":pk": {"S": "FAVORITES#user_1"}},
+    )
+    assert len(response["Items"]) == 1
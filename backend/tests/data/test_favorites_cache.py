@@ -0,0 +1,115 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from chainlit.config import FavoritesCacheSettings
+from chainlit.data.base import BaseDataLayer
+from chainlit.data.favorites_cache import (
+    FavoritesCache,
+    get_cached_favorite_steps,
+    get_favorites_cache,
+    invalidate_favorites,
+)
+
+
+@pytest.fixture
+def data_layer():
+    return AsyncMock(spec=BaseDataLayer)
+
+
+@pytest.fixture
+def cache():
+    cache = FavoritesCache()
+    with patch("chainlit.data.favorites_cache._favorites_cache", cache):
+        yield cache
+
+
+def step(id: str, created_at: str):
+    return {"id": id, "threadId": "thread_1", "createdAt": created_at}
+
+
+def test_update_keeps_newest_first():
+    cache = FavoritesCache()
+    cache.set("user_1", [step("b", "2024-01-02"), step("a", "2024-01-01")])
+
+    cache.update("user_1", step("c", "2024-01-03"), True)
+    cache.update("user_1", step("a", "2024-01-01"), False)
+
+    assert [s["id"] for s in cache.get("user_1") or []] == ["c", "b"]
+
+
+def test_update_replaces_the_cached_list():
+    cache = FavoritesCache()
+    cache.set("user_1", [step("a", "2024-01-01")])
+    favorites = cache.get("user_1")
+
+    cache.update("user_1", step("b", "2024-01-02"), True)
+
+    assert favorites == [step("a", "2024-01-01")]
+
+
+def test_update_of_an_uncached_user_is_ignored():
+    cache = FavoritesCache()
+
+    cache.update("user_1", step("a", "2024-01-01"), True)
+
+    assert cache.get("user_1") is None
+
+
+def test_lru_eviction():
+    cache = FavoritesCache(max_size=2)
+    cache.set("user_1", [])
+    cache.set("user_2", [])
+    cache.get("user_1")
+    cache.set("user_3", [])
+
+    assert cache.get("user_2") is None
+    assert cache.get("user_1") == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_with_zero_ttl():
+    cache = FavoritesCache(ttl=0)
+    cache.set("user_1", [])
+
+    assert cache.get("user_1") is None
+
+
+async def test_get_cached_favorite_steps(cache, data_layer):
+    data_layer.get_favorite_steps.return_value = [step("a", "2024-01-01")]
+
+    assert await get_cached_favorite_steps(data_layer, "user_1") == [
+        step("a", "2024-01-01")
+    ]
+    cache.update("user_1", step("b", "2024-01-02"), True)
+    favorites = await get_cached_favorite_steps(data_layer, "user_1")
+
+    assert [s["id"] for s in favorites] == ["b", "a"]
+    data_layer.get_favorite_steps.assert_awaited_once_with("user_1")
+
+    invalidate_favorites("user_1")
+    await get_cached_favorite_steps(data_layer, "user_1")
+
+    assert data_layer.get_favorite_steps.await_count == 2
+
+
+@pytest.mark.parametrize(
+    ("ttl", "session_store", "expected_ttl"),
+    [
+        (None, None, 60),
+        (None, Mock(), 0),
+        (30, Mock(), 30),
+    ],
+)
+def test_default_ttl_depends_on_shared_sessions(ttl, session_store, expected_ttl):
+    with (
+        patch("chainlit.data.favorites_cache._favorites_cache", None),
+        patch(
+            "chainlit.config.config.project.favorites_cache",
+            FavoritesCacheSettings(ttl=ttl),
+        ),
+        patch(
+            "chainlit.session_registry.get_session_store", return_value=session_store
+        ),
+    ):
+        assert get_favorites_cache().ttl == expected_ttl
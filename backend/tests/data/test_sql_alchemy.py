@@ -1,15 +1,22 @@
 import json
 import uuid
 from pathlib import Path
+from unittest.mock import patch
 
+import httpx
 import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from chainlit import User
-from chainlit.data.sql_alchemy import SQLAlchemyDataLayer
+from chainlit.data.sql_alchemy import (
+    SQLAlchemyDataLayer,
+    rows_to_dicts,
+    upsert_statement,
+)
 from chainlit.data.storage_clients.base import BaseStorageClient
-from chainlit.element import Text
+from chainlit.element import Image, Pdf, Text
+from chainlit.types import Pagination, ThreadFilter
 
 
 @pytest.fixture
@@ -98,7 +105,8 @@ async def data_layer(mock_storage_client: BaseStorageClient, tmp_path: Path):
                     "page" INT,
                     "language" TEXT,
                     "forId" UUID,
-                    "mime" TEXT
+                    "mime" TEXT,
+                    "props" JSONB
                 );
         """
             )
@@ -149,6 +157,55 @@ async def test_create_and_get_element(
     # The 'content' field is not part of the ElementDict, so we remove this assertion
 
 
+async def test_create_element_streams_files(
+    mock_chainlit_context,
+    data_layer: SQLAlchemyDataLayer,
+    mock_storage_client: BaseStorageClient,
+    tmp_path,
+):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(b"%PDF")
+
+    async with mock_chainlit_context:
+        element = Pdf(
+            id=str(uuid.uuid4()), name="report.pdf", path=str(path), for_id="step_id"
+        )
+        await data_layer.create_element(element)
+
+    mock_storage_client.upload_file.assert_not_awaited()  # type: ignore[attr-defined]
+    mock_storage_client.upload_stream.assert_awaited_once_with(  # type: ignore[attr-defined]
+        object_key=f"unknown/{element.id}/report.pdf",
+        source=str(path),
+        mime="application/pdf",
+        overwrite=True,
+    )
+
+
+async def test_create_element_follows_url_redirects(
+    mock_chainlit_context,
+    data_layer: SQLAlchemyDataLayer,
+    mock_storage_client: BaseStorageClient,
+):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/signed":
+            return httpx.Response(302, headers={"Location": "/image.png"})
+        return httpx.Response(200, content=b"image")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with patch("chainlit.data.sql_alchemy.get_http_client", return_value=client):
+        async with mock_chainlit_context:
+            element = Image(
+                id=str(uuid.uuid4()),
+                name="image.png",
+                url="https://cdn.example.com/signed",
+                for_id="step_id",
+            )
+            await data_layer.create_element(element)
+
+    mock_storage_client.upload_stream.assert_awaited_once()  # type: ignore[attr-defined]
+
+
 async def test_get_current_timestamp(data_layer: SQLAlchemyDataLayer):
     timestamp = await data_layer.get_current_timestamp()
     assert isinstance(timestamp, str)
@@ -219,6 +276,135 @@ async def test_delete_thread(test_user: User, data_layer: SQLAlchemyDataLayer):
     assert thread is None
 
 
+async def test_create_steps_multi_row_upsert(
+    mock_chainlit_context, data_layer: SQLAlchemyDataLayer
+):
+    step_dicts = [
+        {
+            "id": str(uuid.uuid4()),
+            "threadId": "batched_thread",
+            "name": "step",
+            "type": "assistant_message",
+            "disableFeedback": False,
+            "streaming": False,
+            "output": f"output {i}",
+            "createdAt": f"2024-01-01T00:00:0{i}Z",
+        }
+        for i in range(3)
+    ]
+
+    async with mock_chainlit_context:
+        await data_layer.create_steps([dict(s) for s in step_dicts])  # type: ignore
+        thread = await data_layer.get_thread("batched_thread")
+        assert thread is not None
+        assert [step["output"] for step in thread["steps"]] == [
+            "output 0",
+            "output 1",
+            "output 2",
+        ]
+
+        # Updates of existing steps go through the same upsert
+        step_dicts[0]["output"] = step_dicts[2]["output"] = "updated"
+        await data_layer.update_steps([step_dicts[0], step_dicts[2]])  # type: ignore
+        thread = await data_layer.get_thread("batched_thread")
+        assert thread is not None
+        assert [step["output"] for step in thread["steps"]] == [
+            "updated",
+            "output 1",
+            "updated",
+        ]
+
+
+def _thread_page_step(step_id: str, second: int, parent_id=None):
+    return {
+        "id": step_id,
+        "threadId": "paged_thread",
+        "parentId": parent_id,
+        "name": step_id,
+        "type": "assistant_message",
+        "disableFeedback": False,
+        "streaming": False,
+        "output": step_id,
+        "createdAt": f"2024-01-01T00:00:{second:02d}Z",
+    }
+
+
+@pytest.fixture
+async def paged_thread(mock_chainlit_context, data_layer: SQLAlchemyDataLayer):
+    async with mock_chainlit_context:
+        await data_layer.create_steps(
+            [
+                _thread_page_step("a", 0),
+                _thread_page_step("b", 1),
+                _thread_page_step("b1", 2, parent_id="b"),
+                _thread_page_step("b11", 3, parent_id="b1"),
+                _thread_page_step("c", 4),
+                _thread_page_step("d", 5),
+                _thread_page_step("d1", 6, parent_id="d"),
+            ]  # type: ignore
+        )
+
+    for element_id, for_id in (("e-b11", "b11"), ("e-a", "a"), ("e-none", None)):
+        await data_layer.execute_sql(
+            query="""
+                INSERT INTO elements ("id", "threadId", "name", "url", "forId")
+                VALUES (:id, :thread_id, :id, :url, :for_id)
+            """,
+            parameters={
+                "id": element_id,
+                "thread_id": "paged_thread",
+                "url": f"https://example.com/{element_id}",
+                "for_id": for_id,
+            },
+        )
+
+
+async def test_get_thread_page_latest_window(
+    paged_thread, data_layer: SQLAlchemyDataLayer
+):
+    page = await data_layer.get_thread_page("paged_thread", limit=2)
+
+    assert page is not None
+    assert [step["id"] for step in page["steps"]] == ["c", "d", "d1"]
+    # The latest window also gets the elements not attached to a step
+    assert [element["id"] for element in page["elements"]] == ["e-none"]
+    assert page["stepsPageInfo"] == {"hasOlderSteps": True, "olderStepsCursor": "c"}
+
+
+async def test_get_thread_page_older_windows(
+    paged_thread, data_layer: SQLAlchemyDataLayer
+):
+    page = await data_layer.get_thread_page("paged_thread", limit=1, before="c")
+
+    assert page is not None
+    # Nested steps come with their top-level step, at any depth
+    assert [step["id"] for step in page["steps"]] == ["b", "b1", "b11"]
+    assert [element["id"] for element in page["elements"]] == ["e-b11"]
+    assert page["stepsPageInfo"] == {"hasOlderSteps": True, "olderStepsCursor": "b"}
+
+    page = await data_layer.get_thread_page("paged_thread", limit=2, before="b")
+
+    assert page is not None
+    assert [step["id"] for step in page["steps"]] == ["a"]
+    assert [element["id"] for element in page["elements"]] == ["e-a"]
+    assert page["stepsPageInfo"] == {"hasOlderSteps": False, "olderStepsCursor": None}
+
+
+async def test_get_thread_page_unknown_cursor(
+    paged_thread, data_layer: SQLAlchemyDataLayer
+):
+    page = await data_layer.get_thread_page("paged_thread", limit=2, before="nope")
+
+    assert page is not None
+    assert page["steps"] == []
+    assert page["elements"] == []
+    assert page["stepsPageInfo"] == {"hasOlderSteps": False, "olderStepsCursor": None}
+
+
+async def test_get_thread_page_missing_thread(data_layer: SQLAlchemyDataLayer):
+    assert await data_layer.get_thread_page("nonexisting_thread", limit=2) is None
+
+
 async def _get_thread_metadata_raw(
     data_layer: SQLAlchemyDataLayer, thread_id: str
 ) -> str | None:
@@ -325,3 +511,256 @@ async def test_update_thread_name_update_preserves_metadata(
     assert isinstance(result, list)
     assert result
     assert result[0]["name"] == "New Name"
+
+
+async def _seed_thread(
+    data_layer: SQLAlchemyDataLayer,
+    thread_id: str,
+    user_id: str,
+    outputs: list[str],
+    updated_at: str,
+    feedback_value: int | None = None,
+):
+    await data_layer.execute_sql(
+        query="""INSERT INTO threads ("id", "createdAt", "name", "userId", "metadata") VALUES (:id, :createdAt, :name, :userId, '{}')""",
+        parameters={
+            "id": thread_id,
+            "createdAt": updated_at,
+            "name": thread_id,
+            "userId": user_id,
+        },
+    )
+    for output in outputs:
+        step_id = str(uuid.uuid4())
+        await data_layer.execute_sql(
+            query="""INSERT INTO steps ("id", "name", "type", "threadId", "disableFeedback", "streaming", "output", "createdAt") VALUES (:id, 'step', 'assistant_message', :threadId, 0, 0, :output, :createdAt)""",
+            parameters={
+                "id": step_id,
+                "threadId": thread_id,
+                "output": output,
+                "createdAt": updated_at,
+            },
+        )
+        if feedback_value is not None:
+            await data_layer.execute_sql(
+                query="""INSERT INTO feedbacks ("id", "forId", "threadId", "value") VALUES (:id, :forId, :threadId, :value)""",
+                parameters={
+                    "id": str(uuid.uuid4()),
+                    "forId": step_id,
+                    "threadId": thread_id,
+                    "value": feedback_value,
+                },
+            )
+
+
+async def test_list_threads_keyset_pagination(
+    test_user: User, data_layer: SQLAlchemyDataLayer
+):
+    persisted_user = await data_layer.create_user(test_user)
+    assert persisted_user
+
+    for i in range(5):
+        await _seed_thread(
+            data_layer,
+            f"thread_{i}",
+            persisted_user.id,
+            [f"output {i}"],
+            f"2024-01-0{i + 1}T00:00:00Z",
+        )
+    # Two threads sharing the same updatedAt are ordered by id
+    await _seed_thread(
+        data_layer, "thread_tie", persisted_user.id, ["tie"], "2024-01-05T00:00:00Z"
+    )
+    # A thread without steps comes last
+    await _seed_thread(data_layer, "thread_empty", persisted_user.id, [], "")
+
+    filters = ThreadFilter(userId=persisted_user.id)
+    seen: list[str] = []
+    cursor = None
+    while True:
+        page = await data_layer.list_threads(
+            Pagination(first=3, cursor=cursor), filters
+        )
+        seen.extend(thread["id"] for thread in page.data)
+        assert all(thread["steps"] == [] for thread in page.data)
+        if not page.pageInfo.hasNextPage:
+            break
+        cursor = page.pageInfo.endCursor
+
+    assert seen == [
+        "thread_tie",
+        "thread_4",
+        "thread_3",
+        "thread_2",
+        "thread_1",
+        "thread_0",
+        "thread_empty",
+    ]
+
+
+async def test_list_threads_search_and_feedback_filters(
+    test_user: User, data_layer: SQLAlchemyDataLayer
+):
+    persisted_user = await data_layer.create_user(test_user)
+    assert persisted_user
+
+    await _seed_thread(
+        data_layer,
+        "thread_weather",
+        persisted_user.id,
+        ["The Weather is sunny"],
+        "2024-01-01T00:00:00Z",
+        feedback_value=1,
+    )
+    await _seed_thread(
+        data_layer,
+        "thread_percent",
+        persisted_user.id,
+        ["100% done"],
+        "2024-01-02T00:00:00Z",
+        feedback_value=0,
+    )
+
+    search = await data_layer.list_threads(
+        Pagination(first=10),
+        ThreadFilter(userId=persisted_user.id, search="weather"),
+    )
+    assert [thread["id"] for thread in search.data] == ["thread_weather"]
+
+    # LIKE wildcards in the keyword are matched literally
+    wildcard = await data_layer.list_threads(
+        Pagination(first=10),
+        ThreadFilter(userId=persisted_user.id, search="0%"),
+    )
+    assert [thread["id"] for thread in wildcard.data] == ["thread_percent"]
+
+    negative = await data_layer.list_threads(
+        Pagination(first=10),
+        ThreadFilter(userId=persisted_user.id, feedback=0),
+    )
+    assert [thread["id"] for thread in negative.data] == ["thread_percent"]
+
+    positive = await data_layer.list_threads(
+        Pagination(first=10),
+        ThreadFilter(userId=persisted_user.id, feedback=1),
+    )
+    assert [thread["id"] for thread in positive.data] == ["thread_weather"]
+
+
+def test_rows_to_dicts_converts_uuid_columns():
+    user_id = uuid.uuid4()
+    rows = [("a", None, 1), ("b", user_id, 2)]
+
+    assert rows_to_dicts(["name", "userId", "count"], rows) == [
+        {"name": "a", "userId": None, "count": 1},
+        {"name": "b", "userId": str(user_id), "count": 2},
+    ]
+    assert rows_to_dicts(["name"], []) == []
+
+
+def test_upsert_statement_is_built_once_per_column_set():
+    first = upsert_statement("steps", ("id", "name"))
+
+    assert upsert_statement("steps", ("id", "name")) is first
+    assert upsert_statement("steps", ("id", "output")) is not first
+    assert 'SET "name" = excluded."name"' in first.text
+    assert ":id_1" in upsert_statement("steps", ("id", "name"), 2).text
+
+
+async def test_reads_do_not_open_a_session(data_layer: SQLAlchemyDataLayer):
+    await data_layer.update_thread("read_thread", name="Read me")
+
+    def no_session():
+        raise AssertionError("reads should not open a session")
+
+    data_layer.async_session = no_session  # type: ignore[assignment]
+    result = await data_layer.execute_sql(
+        query='SELECT "name" FROM threads WHERE "id" = :id',
+        parameters={"id": "read_thread"},
+    )
+
+    assert result == [{"name": "Read me"}]
+
+
+async def test_execute_sql_rows_go_through_clean_result(
+    data_layer: SQLAlchemyDataLayer,
+):
+    await data_layer.update_thread("clean_thread", name="Clean me")
+
+    class CleaningDataLayer(SQLAlchemyDataLayer):
+        def clean_result(self, obj):
+            return [{**row, "cleaned": True} for row in obj]
+
+    data_layer.__class__ = CleaningDataLayer
+    query = 'SELECT "name" FROM threads WHERE "id" = :id'
+
+    # Reads and writes returning rows alike
+    assert await data_layer.execute_sql(query, {"id": "clean_thread"}) == [
+        {"name": "Clean me", "cleaned": True}
+    ]
+    assert await data_layer.execute_sql(
+        'UPDATE threads SET "name" = :name WHERE "id" = :id RETURNING "name"',
+        {"id": "clean_thread", "name": "Cleaned"},
+    ) == [{"name": "Cleaned", "cleaned": True}]
+
+
+def test_pool_options(tmp_path: Path):
+    data_layer = SQLAlchemyDataLayer(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.sqlite'}",
+        pool_size=3,
+        max_overflow=1,
+        pool_pre_ping=True,
+    )
+
+    pool = data_layer.engine.pool
+    assert pool.size() == 3  # type: ignore[attr-defined]
+    assert pool._max_overflow == 1  # type: ignore[attr-defined]
+    assert pool._pre_ping
+
+
+async def test_favorites_table(
+    mock_chainlit_context, test_user: User, data_layer: SQLAlchemyDataLayer
+):
+    persisted_user = await data_layer.create_user(test_user)
+    assert persisted_user
+    await data_layer.update_thread("fav_thread", user_id=persisted_user.id)
+
+    step_dicts = [
+        {
+            "id": str(uuid.uuid4()),
+            "threadId": "fav_thread",
+            "name": "step",
+            "type": "assistant_message",
+            "disableFeedback": False,
+            "streaming": False,
+            "output": f"output {i}",
+            "metadata": {"favorite": True} if i == 0 else {},
+            "createdAt": f"2024-01-01T00:00:0{i}Z",
+        }
+        for i in range(2)
+    ]
+
+    async with mock_chainlit_context:
+        for step_dict in step_dicts:
+            await data_layer.create_step(dict(step_dict))  # type: ignore
+
+        data_layer.favorites_table = True
+        # Favorites set before the table existed are indexed on creation
+        await data_layer.create_favorites_table()
+        favorites = await data_layer.get_favorite_steps(persisted_user.id)
+        assert [step["id"] for step in favorites] == [step_dicts[0]["id"]]
+
+        await data_layer.set_step_favorite(dict(step_dicts[1]), True)  # type: ignore
+        favorites = await data_layer.get_favorite_steps(persisted_user.id)
+        assert [step["id"] for step in favorites] == [
+            step_dicts[1]["id"],
+            step_dicts[0]["id"],
+        ]
+
+        await data_layer.set_step_favorite(dict(step_dicts[0]), False)  # type: ignore
+        favorites = await data_layer.get_favorite_steps(persisted_user.id)
+        assert [step["id"] for step in favorites] == [step_dicts[1]["id"]]
+
+        await data_layer.delete_thread("fav_thread")
+        assert await data_layer.get_favorite_steps(persisted_user.id) == []
+        assert await data_layer.execute_sql("SELECT * FROM favorites", {}) == []
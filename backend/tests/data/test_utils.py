@@ -0,0 +1,75 @@
+from chainlit.data.utils import paginate_thread
+
+
+def _step(step_id, parent_id=None):
+    return {"id": step_id, "parentId": parent_id, "type": "assistant_message"}
+
+
+def _thread():
+    return {
+        "id": "thread",
+        "name": "Thread",
+        "steps": [
+            _step("m1"),
+            _step("m2"),
+            _step("tool2", "m2"),
+            _step("m3"),
+            _step("run3", "m3"),
+            _step("tool3", "run3"),
+            _step("m4"),
+        ],
+        "elements": [
+            {"id": "e1", "forId": "m1"},
+            {"id": "e3", "forId": "tool3"},
+            {"id": "orphan", "forId": None},
+        ],
+    }
+
+
+def test_paginate_thread_returns_latest_window_with_nested_steps():
+    page = paginate_thread(_thread(), limit=2)  # type: ignore[arg-type]
+
+    assert [step["id"] for step in page["steps"]] == ["m3", "run3", "tool3", "m4"]
+    assert [element["id"] for element in page["elements"]] == ["e3", "orphan"]
+    assert page["stepsPageInfo"] == {
+        "hasOlderSteps": True,
+        "olderStepsCursor": "m3",
+    }
+    assert page["name"] == "Thread"
+
+
+def test_paginate_thread_loads_older_windows():
+    thread = _thread()
+
+    page = paginate_thread(thread, limit=2, before="m3")  # type: ignore[arg-type]
+
+    assert [step["id"] for step in page["steps"]] == ["m1", "m2", "tool2"]
+    assert [element["id"] for element in page["elements"]] == ["e1"]
+    assert page["stepsPageInfo"] == {
+        "hasOlderSteps": False,
+        "olderStepsCursor": None,
+    }
+    # The thread itself is left untouched
+    assert len(thread["steps"]) == 7
+
+
+def test_paginate_thread_with_unknown_cursor_is_empty():
+    page = paginate_thread(_thread(), limit=2, before="unknown")  # type: ignore[arg-type]
+
+    assert page["steps"] == []
+    assert page["elements"] == []
+    assert page["stepsPageInfo"]["hasOlderSteps"] is False
+
+
+def test_paginate_thread_keeps_steps_of_missing_parents_at_top_level():
+    thread = {
+        "id": "thread",
+        "steps": [_step("a", "deleted"), _step("b", "c"), _step("c", "b")],
+        "elements": [],
+    }
+
+    page = paginate_thread(thread, limit=1)  # type: ignore[arg-type]
+
+    # "b" and "c" point to each other, they are kept together
+    assert [step["id"] for step in page["steps"]] == ["b", "c"]
+    assert page["stepsPageInfo"]["olderStepsCursor"] == "c"
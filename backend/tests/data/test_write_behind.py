@@ -0,0 +1,127 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from chainlit.context import context
+from chainlit.data.base import BaseDataLayer
+from chainlit.data.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def data_layer():
+    return AsyncMock(spec=BaseDataLayer)
+
+
+def step(id: str, output: str = ""):
+    return {"id": id, "threadId": "thread_1", "output": output}
+
+
+async def test_coalesces_writes_to_the_same_step(data_layer):
+    queue = WriteBehindQueue(data_layer, flush_interval=10)
+
+    await queue.create_step(step("step_1", "a"))
+    await queue.update_step(step("step_1", "ab"))
+    await queue.update_step(step("step_1", "abc"))
+    await queue.update_step(step("step_2", "x"))
+    await queue.flush()
+
+    data_layer.create_steps.assert_awaited_once_with([step("step_1", "abc")])
+    data_layer.update_steps.assert_awaited_once_with([step("step_2", "x")])
+    assert queue.stats()["writes_coalesced"] == 2
+    assert queue.stats()["batches_flushed"] == 1
+
+
+async def test_delete_replaces_pending_writes(data_layer):
+    queue = WriteBehindQueue(data_layer, flush_interval=10)
+
+    await queue.create_step(step("step_1"))
+    await queue.delete_step("step_1")
+    await queue.flush()
+
+    data_layer.create_steps.assert_not_awaited()
+    data_layer.delete_step.assert_awaited_once_with("step_1")
+
+
+async def test_flushes_after_interval(data_layer):
+    queue = WriteBehindQueue(data_layer, flush_interval=0.01)
+
+    await queue.create_step(step("step_1"))
+    data_layer.create_steps.assert_not_awaited()
+
+    await asyncio.sleep(0.05)
+    data_layer.create_steps.assert_awaited_once()
+    await queue.close()
+
+
+async def test_flushes_full_batches_right_away(data_layer):
+    flushed = asyncio.Event()
+    data_layer.create_steps.side_effect = lambda step_dicts: flushed.set()
+    queue = WriteBehindQueue(data_layer, flush_interval=10, max_batch_size=2)
+
+    await queue.create_step(step("step_1"))
+    await queue.create_step(step("step_2"))
+    await asyncio.wait_for(flushed.wait(), timeout=1)
+
+    data_layer.create_steps.assert_awaited_once_with([step("step_1"), step("step_2")])
+    await queue.close()
+
+
+async def test_backpressure_when_queue_is_full(data_layer):
+    release = asyncio.Event()
+
+    async def slow_create_steps(step_dicts):
+        await release.wait()
+
+    data_layer.create_steps.side_effect = slow_create_steps
+    queue = WriteBehindQueue(
+        data_layer, flush_interval=10, max_batch_size=2, max_queue_size=2
+    )
+
+    await queue.create_step(step("step_1"))
+    await queue.create_step(step("step_2"))
+    # The first batch is being persisted, the queue has room again
+    await queue.create_step(step("step_3"))
+    await queue.create_step(step("step_4"))
+
+    blocked = asyncio.create_task(queue.create_step(step("step_5")))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    # Writes already pending are coalesced without waiting
+    await asyncio.wait_for(queue.update_step(step("step_4", "x")), timeout=1)
+
+    release.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await queue.close()
+
+    assert queue.stats()["writes_persisted"] == 5
+
+
+async def test_close_drains_and_persists_late_writes(data_layer):
+    queue = WriteBehindQueue(data_layer, flush_interval=10)
+
+    await queue.create_step(step("step_1"))
+    await queue.close()
+    data_layer.create_steps.assert_awaited_once_with([step("step_1")])
+
+    await queue.update_step(step("step_1", "late"))
+    data_layer.update_steps.assert_awaited_once_with([step("step_1", "late")])
+
+
+async def test_persists_in_the_caller_context(
+    data_layer, mock_chainlit_context, mock_session_factory
+):
+    seen_sessions = []
+
+    async def record_session(step_dicts):
+        seen_sessions.append(context.session.id)
+
+    data_layer.create_steps.side_effect = record_session
+    queue = WriteBehindQueue(data_layer, flush_interval=10)
+
+    async with mock_chainlit_context:
+        await queue.create_step(step("step_1"))
+
+    await queue.flush()
+
+    assert seen_sessions == ["test_session_id"]
@@ -0,0 +1,304 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from chainlit.audio_pipeline import (
+    AudioIngressQueue,
+    AudioOutputBuffer,
+    audio_ingress_queues,
+    audio_output_buffers,
+    drain_audio_ingress_queue,
+    get_audio_ingress_queue,
+    get_audio_output_buffer,
+    get_audio_pipeline_stats,
+    remove_audio_pipeline,
+)
+from chainlit.config import AudioPipelineSettings
+from chainlit.emitter import ChainlitEmitter
+from chainlit.session import WebsocketSession
+from chainlit.types import InputAudioChunk
+
+
+@pytest.fixture
+def session():
+    session = Mock(spec=WebsocketSession)
+    session.id = "audio_session"
+    session.emit = AsyncMock()
+    return session
+
+
+@pytest.fixture
+def output_buffering_enabled(monkeypatch):
+    from chainlit.config import config
+
+    monkeypatch.setattr(
+        config.project,
+        "audio_pipeline",
+        AudioPipelineSettings(output_buffer_ms=10),
+    )
+    yield
+    audio_output_buffers.clear()
+
+
+@pytest.fixture(autouse=True)
+async def clear_audio_pipelines():
+    yield
+    for session_id in list(audio_ingress_queues):
+        await remove_audio_pipeline(session_id)
+    audio_output_buffers.clear()
+
+
+def chunk(data: bytes, is_start=False, mime_type="pcm16") -> InputAudioChunk:
+    return InputAudioChunk(
+        isStart=is_start, mimeType=mime_type, elapsedTime=0, data=data
+    )
+
+
+class SlowHandler:
+    """Audio chunk handler blocked until released, recording what it received."""
+
+    def __init__(self):
+        self.received = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, chunk: InputAudioChunk):
+        await self.release.wait()
+        self.received.append(chunk.data)
+
+
+async def test_ingress_processes_chunks_in_order():
+    received = []
+
+    async def handler(chunk: InputAudioChunk):
+        await asyncio.sleep(0.001 * (3 - len(received)))
+        received.append(chunk.data)
+
+    queue = AudioIngressQueue(handler)
+    for data in [b"a", b"b", b"c"]:
+        assert queue.put(chunk(data))
+
+    await queue.drain()
+
+    assert received == [b"a", b"b", b"c"]
+    assert queue.stats()["chunks_processed"] == 3
+    assert queue.stats()["depth"] == 0
+
+
+async def test_ingress_single_consumer():
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler)
+
+    for data in [b"a", b"b", b"c"]:
+        queue.put(chunk(data))
+    await asyncio.sleep(0)
+
+    # The first chunk is being processed, the others wait for it
+    assert queue.depth == 2
+
+    handler.release.set()
+    await queue.drain()
+    assert handler.received == [b"a", b"b", b"c"]
+
+
+async def test_ingress_merges_when_full():
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler, max_size=2, overflow="merge")
+
+    for data in [b"a", b"b", b"c", b"d"]:
+        queue.put(chunk(data))
+    await asyncio.sleep(0)
+    queue.put(chunk(b"e"))
+    queue.put(chunk(b"f"))
+
+    handler.release.set()
+    await queue.drain()
+
+    assert handler.received == [b"a", b"bcd", b"ef"]
+    assert queue.chunks_merged == 3
+    assert queue.chunks_dropped == 0
+
+
+async def test_ingress_doesnt_merge_a_new_stream():
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler, max_size=1, overflow="merge")
+
+    queue.put(chunk(b"a"))
+    await asyncio.sleep(0)
+    queue.put(chunk(b"b"))
+    queue.put(chunk(b"c", is_start=True))
+
+    handler.release.set()
+    await queue.drain()
+
+    # Merging is not possible, the oldest queued chunk is dropped
+    assert handler.received == [b"a", b"c"]
+    assert queue.chunks_dropped == 1
+
+
+@pytest.mark.parametrize(
+    ("overflow", "expected"),
+    [("drop_oldest", [b"a", b"c"]), ("drop_newest", [b"a", b"b"])],
+)
+async def test_ingress_drops_when_full(overflow, expected):
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler, max_size=1, overflow=overflow)
+
+    queue.put(chunk(b"a"))
+    await asyncio.sleep(0)
+    queue.put(chunk(b"b"))
+    queue.put(chunk(b"c"))
+
+    handler.release.set()
+    await queue.drain()
+
+    assert handler.received == expected
+    assert queue.stats()["chunks_dropped"] == 1
+    assert queue.stats()["max_depth"] == 1
+
+
+async def test_ingress_keeps_consuming_after_an_error():
+    received = []
+
+    async def handler(chunk: InputAudioChunk):
+        if chunk.data == b"bad":
+            raise ValueError("Unsupported chunk")
+        received.append(chunk.data)
+
+    queue = AudioIngressQueue(handler)
+    queue.put(chunk(b"bad"))
+    queue.put(chunk(b"good"))
+
+    await queue.drain()
+
+    assert received == [b"good"]
+
+
+async def test_ingress_latency_metrics():
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler)
+
+    queue.put(chunk(b"a"))
+    queue.put(chunk(b"b"))
+    await asyncio.sleep(0.02)
+    handler.release.set()
+    await queue.drain()
+
+    stats = queue.stats()
+    assert stats["max_wait_ms"] >= 20
+    assert stats["avg_processing_ms"] > 0
+
+
+async def test_ingress_close_drops_queued_chunks():
+    handler = SlowHandler()
+    queue = AudioIngressQueue(handler)
+
+    queue.put(chunk(b"a"))
+    queue.put(chunk(b"b"))
+    await asyncio.sleep(0)
+
+    await queue.close()
+    await queue.drain()
+
+    assert handler.received == []
+    assert queue.depth == 0
+
+
+async def test_get_audio_ingress_queue_per_session(session):
+    handler = AsyncMock()
+
+    queue = get_audio_ingress_queue(session, handler)
+    assert get_audio_ingress_queue(session, handler) is queue
+
+    queue.put(chunk(b"a"))
+    await drain_audio_ingress_queue(session.id)
+    handler.assert_awaited_once()
+
+    assert get_audio_pipeline_stats(session.id)["ingress"]["chunks_processed"] == 1
+
+    await remove_audio_pipeline(session.id)
+    assert session.id not in audio_ingress_queues
+
+
+async def test_output_buffer_concatenates_chunks(session):
+    buffer = AudioOutputBuffer(session, buffer_interval=10)
+
+    for data in [b"ab", b"cd", b"ef"]:
+        await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": data})
+    session.emit.assert_not_called()
+
+    await buffer.flush()
+
+    session.emit.assert_called_once_with(
+        "audio_chunk", {"track": "t1", "mimeType": "pcm16", "data": b"abcdef"}
+    )
+    assert buffer.stats() == {
+        "chunks_received": 3,
+        "frames_sent": 1,
+        "pending_bytes": 0,
+    }
+
+
+async def test_output_buffer_preserves_order_across_tracks(session):
+    buffer = AudioOutputBuffer(session, buffer_interval=10)
+
+    await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": b"a"})
+    await buffer.add_chunk({"track": "t2", "mimeType": "pcm16", "data": b"b"})
+    await buffer.add_chunk({"track": "t2", "mimeType": "pcm16", "data": b"c"})
+    await buffer.flush()
+
+    assert [call.args[1] for call in session.emit.call_args_list] == [
+        {"track": "t1", "mimeType": "pcm16", "data": b"a"},
+        {"track": "t2", "mimeType": "pcm16", "data": b"bc"},
+    ]
+
+
+async def test_output_buffer_flushes_on_byte_threshold(session):
+    buffer = AudioOutputBuffer(session, buffer_interval=10, max_buffer_bytes=4)
+
+    await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": b"ab"})
+    session.emit.assert_not_called()
+
+    await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": b"cd"})
+    session.emit.assert_called_once_with(
+        "audio_chunk", {"track": "t1", "mimeType": "pcm16", "data": b"abcd"}
+    )
+
+
+async def test_output_buffer_flushes_after_interval(session):
+    buffer = AudioOutputBuffer(session, buffer_interval=0.01)
+
+    await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": b"ab"})
+    session.emit.assert_not_called()
+
+    await asyncio.sleep(0.05)
+    session.emit.assert_called_once()
+
+
+async def test_get_audio_output_buffer_disabled_by_default(session):
+    assert get_audio_output_buffer(session) is None
+
+
+async def test_emitter_buffers_audio_and_discards_it_on_interrupt(
+    session, output_buffering_enabled
+):
+    emitter = ChainlitEmitter(session)
+
+    await emitter.send_audio_chunk({"track": "t1", "mimeType": "pcm16", "data": b"a"})
+    session.emit.assert_not_called()
+
+    await emitter.send_audio_interrupt()
+    await asyncio.sleep(0.03)
+
+    session.emit.assert_called_once_with("audio_interrupt", {})
+
+
+async def test_remove_audio_pipeline_flushes_output(session, output_buffering_enabled):
+    buffer = get_audio_output_buffer(session)
+    assert buffer is not None
+
+    await buffer.add_chunk({"track": "t1", "mimeType": "pcm16", "data": b"a"})
+    await remove_audio_pipeline(session.id)
+
+    session.emit.assert_called_once()
+    assert session.id not in audio_output_buffers
@@ -1,10 +1,11 @@
+import asyncio
 import sys
 import threading
 from unittest.mock import Mock, patch
 
 import pytest
 
-from chainlit.cache import cache, init_lc_cache
+from chainlit.cache import CacheStore, cache, init_lc_cache
 
 # Import the actual cache module to access _cache dict
 cache_module = sys.modules["chainlit.cache"]
@@ -556,3 +557,113 @@ class TestCacheEdgeCases:
 
         func(5)  # Cache hit
         assert len(cache_module._cache) == 2  # No new entry
+
+
+class TestCacheStore:
+    """Test suite for the bounded cache engine."""
+
+    def setup_method(self):
+        cache_module._cache.clear()
+
+    def teardown_method(self):
+        cache_module._cache.clear()
+
+    def test_evicts_least_recently_used(self):
+        store = CacheStore(max_size=2)
+        store.set("a", 1)
+        store.set("b", 2)
+        store.get("a")
+        store.set("c", 3)
+
+        assert "b" not in store
+        assert store.get("a") == 1
+        assert store.stats()["evictions"] == 1
+        assert len(store) == 2
+
+    def test_entries_expire(self):
+        store = CacheStore(ttl=60)
+        store.set("a", 1)
+        assert store.get("a") == 1
+
+        with patch.object(cache_module.time, "monotonic", return_value=1e12):
+            assert store.get("a") is None
+        assert len(store) == 0
+
+    def test_unbounded_store(self):
+        store = CacheStore(max_size=None)
+        for i in range(100):
+            store.set(i, i)
+        assert len(store) == 100
+
+    def test_decorator_options_use_a_dedicated_store(self):
+        call_count = 0
+
+        @cache(max_size=1)
+        def double(x):
+            nonlocal call_count
+            call_count += 1
+            return x * 2
+
+        double(1)
+        double(2)
+        double(1)
+
+        assert call_count == 3
+        assert len(cache_module._cache) == 0
+        assert double.cache.stats()["evictions"] == 2
+
+    def test_other_keys_are_not_blocked(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @cache
+        def compute(x):
+            if x == "slow":
+                started.set()
+                release.wait(timeout=5)
+            return x
+
+        slow = threading.Thread(target=compute, args=("slow",))
+        slow.start()
+        assert started.wait(timeout=5)
+
+        # Not serialized behind the slow computation
+        assert compute("fast") == "fast"
+
+        release.set()
+        slow.join()
+
+    async def test_async_function_single_flight(self):
+        call_count = 0
+        release = asyncio.Event()
+
+        @cache(max_size=10)
+        async def fetch(x):
+            nonlocal call_count
+            call_count += 1
+            await release.wait()
+            return x * 2
+
+        tasks = [asyncio.create_task(fetch(5)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [10] * 10
+        assert await fetch(5) == 10
+        assert call_count == 1
+        assert fetch.cache.stats()["misses"] == 1
+
+    async def test_async_failures_are_not_cached(self):
+        call_count = 0
+
+        @cache
+        async def flaky():
+            nonlocal call_count
+            call_count += 1
+            if call_count == 1:
+                raise ValueError("boom")
+            return "ok"
+
+        with pytest.raises(ValueError, match="boom"):
+            await flaky()
+        assert await flaky() == "ok"
@@ -2,7 +2,7 @@ import asyncio
 from contextlib import contextmanager
 from unittest.mock import Mock, patch
 
-from chainlit.chat_context import chat_context, chat_contexts
+from chainlit.chat_context import MessageWindow, chat_context, chat_contexts
 from chainlit.context import ChainlitContext, context_var
 
 
@@ -457,3 +457,96 @@ class TestChatContextEdgeCases:
             result = chat_context.add(mock_message)
 
             assert result is mock_message
+
+
+class TestMessageWindow:
+    """Test suite for the bounded message window."""
+
+    def setup_method(self):
+        chat_contexts.clear()
+
+    def teardown_method(self):
+        chat_contexts.clear()
+
+    def test_keeps_insertion_order(self):
+        messages = [Mock(content="") for _ in range(3)]
+        window = MessageWindow(messages)
+
+        assert list(window) == messages
+        assert window == messages
+
+    def test_add_existing_message_keeps_position(self):
+        first, second = Mock(content="a"), Mock(content="b")
+        window = MessageWindow([first, second])
+
+        first.content = "a longer content"
+        window.add(first)
+
+        assert list(window) == [first, second]
+        assert window.total_tokens == 4 + 1
+
+    def test_remove_by_id(self):
+        message = Mock(id="msg_1", content="")
+        window = MessageWindow([message])
+
+        assert window.remove(Mock(id="msg_1")) is True
+        assert len(window) == 0
+        assert window.remove(message) is False
+
+    def test_max_messages_evicts_oldest(self):
+        messages = [Mock(content="") for _ in range(5)]
+        window = MessageWindow(messages, max_messages=3)
+
+        assert list(window) == messages[2:]
+        assert window.evictions == 2
+
+    def test_max_tokens_evicts_oldest(self):
+        messages = [Mock(content="x" * 40) for _ in range(4)]
+        window = MessageWindow(messages, max_tokens=25)
+
+        assert list(window) == messages[2:]
+        assert window.total_tokens == 20
+
+    def test_max_tokens_keeps_latest_message(self):
+        message = Mock(content="x" * 400)
+        window = MessageWindow([Mock(content=""), message], max_tokens=10)
+
+        assert list(window) == [message]
+
+    def test_view_is_not_a_copy(self):
+        window = MessageWindow()
+        view = window.view()
+
+        message = Mock(content="")
+        window.add(message)
+
+        assert list(view) == [message]
+        assert not hasattr(view, "append")
+
+    def test_chat_context_uses_configured_limits(self):
+        mock_session = Mock()
+        mock_session.id = "session_123"
+        messages = [Mock(content="") for _ in range(4)]
+
+        with patch("chainlit.config.config.project.chat_context") as settings:
+            settings.max_messages = 2
+            settings.max_tokens = 0
+            with mock_chainlit_context(session=mock_session):
+                for message in messages:
+                    chat_context.add(message)
+
+                assert chat_context.get() == messages[2:]
+                assert list(chat_context.view()) == messages[2:]
+
+    def test_get_message(self):
+        mock_session = Mock()
+        mock_session.id = "session_123"
+        message = Mock(id="msg_1", content="")
+
+        with mock_chainlit_context(session=mock_session):
+            assert chat_context.get_message("msg_1") is None
+
+            chat_context.add(message)
+
+            assert chat_context.get_message("msg_1") is message
+            assert chat_context.get_message("msg_2") is None
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from chainlit.data.acl import get_thread_author_cache
 from chainlit.element import ElementDict
 from chainlit.emitter import ChainlitEmitter
 from chainlit.step import StepDict
@@ -236,6 +237,7 @@ async def test_flush_thread_queues_creates_thread_without_auto_title(
         tags=None,
     )
     mock_websocket_session.flush_method_queue.assert_awaited_once()
+    assert get_thread_author_cache().get("thread-1") == "user@example.com"
 
 
 async def test_set_thread_title_persists_name_and_emits_runtime_update(
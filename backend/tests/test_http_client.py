@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from chainlit.http_client import (
+    close_http_client,
+    create_http_client,
+    get_http_client,
+)
+
+
+@pytest.fixture(autouse=True)
+async def reset_http_client():
+    await close_http_client()
+    yield
+    await close_http_client()
+
+
+async def test_get_http_client_is_shared():
+    client = get_http_client()
+
+    assert isinstance(client, httpx.AsyncClient)
+    assert get_http_client() is client
+
+
+async def test_close_http_client():
+    client = get_http_client()
+
+    await close_http_client()
+
+    assert client.is_closed
+    assert get_http_client() is not client
+
+
+async def test_get_http_client_replaces_a_closed_client():
+    client = get_http_client()
+    await client.aclose()
+
+    assert get_http_client() is not client
+
+
+def test_get_http_client_per_event_loop():
+    async def get_client():
+        return get_http_client()
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+
+    assert first is not second
+
+
+async def test_close_http_client_without_client():
+    await close_http_client()
+    await close_http_client()
+
+
+async def test_http_client_does_not_keep_cookies():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, headers={"Set-Cookie": "sess=userA; Path=/"})
+
+    client = create_http_client()
+    client._transport = httpx.MockTransport(handler)
+
+    await client.post("https://idp.example.com/token")
+    await client.post("https://idp.example.com/token")
+    await client.aclose()
+
+    assert "cookie" not in requests[1].headers
+    assert not client.cookies
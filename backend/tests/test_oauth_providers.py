@@ -166,10 +166,8 @@ class TestGithubOAuthProvider:
             mock_response.text = "access_token=test_token&token_type=bearer"
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 result = await provider.get_raw_token_response(
                     "test_code", "http://localhost"
@@ -194,10 +192,8 @@ class TestGithubOAuthProvider:
             mock_response.text = "access_token=github_token_123&token_type=bearer"
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token("test_code", "http://localhost")
 
@@ -219,10 +215,8 @@ class TestGithubOAuthProvider:
             mock_response.text = "error=invalid_grant"
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 with pytest.raises(HTTPException) as exc_info:
                     await provider.get_token("test_code", "http://localhost")
@@ -256,11 +250,11 @@ class TestGithubOAuthProvider:
             ]
             mock_emails_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
                 mock_get = AsyncMock(
                     side_effect=[mock_user_response, mock_emails_response]
                 )
-                mock_client.return_value.__aenter__.return_value.get = mock_get
+                mock_client.return_value.get = mock_get
 
                 github_user, user = await provider.get_user_info("test_token")
 
@@ -314,10 +308,8 @@ class TestGoogleOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -345,10 +337,8 @@ class TestGoogleOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
                 google_user, user = await provider.get_user_info("test_token")
 
@@ -424,10 +414,8 @@ class TestAzureADOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -461,11 +449,11 @@ class TestAzureADOAuthProvider:
             mock_photo_response.aread = AsyncMock(return_value=b"photo_data")
             mock_photo_response.headers = {"Content-Type": "image/jpeg"}
 
-            with patch("httpx.AsyncClient") as mock_client:
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
                 mock_get = AsyncMock(
                     side_effect=[mock_user_response, mock_photo_response]
                 )
-                mock_client.return_value.__aenter__.return_value.get = mock_get
+                mock_client.return_value.get = mock_get
 
                 azure_user, user = await provider.get_user_info("test_token")
 
@@ -697,10 +685,8 @@ class TestAzureADHybridOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -734,11 +720,11 @@ class TestAzureADHybridOAuthProvider:
             mock_photo_response.aread = AsyncMock(return_value=b"photo_bytes")
             mock_photo_response.headers = {"Content-Type": "image/png"}
 
-            with patch("httpx.AsyncClient") as mock_client:
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
                 mock_get = AsyncMock(
                     side_effect=[mock_user_response, mock_photo_response]
                 )
-                mock_client.return_value.__aenter__.return_value.get = mock_get
+                mock_client.return_value.get = mock_get
 
                 azure_user, user = await provider.get_user_info("test_token")
 
@@ -787,10 +773,8 @@ class TestDescopeOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -817,10 +801,8 @@ class TestDescopeOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
                 descope_user, user = await provider.get_user_info("test_token")
 
@@ -886,10 +868,8 @@ class TestAWSCognitoOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -917,10 +897,8 @@ class TestAWSCognitoOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
                 cognito_user, user = await provider.get_user_info("test_token")
 
@@ -986,10 +964,8 @@ class TestGitlabOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -1017,10 +993,8 @@ class TestGitlabOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
                 gitlab_user, user = await provider.get_user_info("test_token")
 
@@ -1097,10 +1071,8 @@ class TestKeycloakOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 token = await provider.get_token(
                     "auth_code", "http://localhost/callback"
@@ -1130,10 +1102,8 @@ class TestKeycloakOAuthProvider:
             }
             mock_response.raise_for_status = Mock()
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
                 keycloak_user, user = await provider.get_user_info("test_token")
 
@@ -1204,10 +1174,8 @@ class TestOAuthProviderEdgeCases:
                 "Error", request=Mock(), response=Mock()
             )
 
-            with patch("httpx.AsyncClient") as mock_client:
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                    return_value=mock_response
-                )
+            with patch("chainlit.oauth_providers.get_http_client") as mock_client:
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
                 with pytest.raises(httpx.HTTPStatusError):
                     await provider.get_raw_token_response("code", "url")
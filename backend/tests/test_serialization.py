@@ -0,0 +1,67 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from chainlit.serialization import (
+    OrjsonPacketSerializer,
+    dumps_content,
+    get_socketio_json,
+    orjson,
+)
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+
+
+@pytest.fixture
+def compact_json():
+    with patch("chainlit.config.config.project.step_serialization.compact_json", True):
+        yield
+
+
+def test_dumps_content_indented_by_default():
+    content = {"key": "välue", "list": [1, 2]}
+
+    assert dumps_content(content) == json.dumps(content, indent=4, ensure_ascii=False)
+
+
+def test_dumps_content_compact(compact_json):
+    assert dumps_content({"key": "välue", 1: [1, 2]}) == '{"key":"välue","1":[1,2]}'
+
+
+@requires_orjson
+def test_dumps_content_compact_with_orjson(compact_json):
+    with patch("chainlit.config.config.project.step_serialization.orjson", True):
+        assert dumps_content({"key": "välue", 1: [1, 2]}) == '{"key":"välue","1":[1,2]}'
+        assert dumps_content({"big": 2**70}) == f'{{"big":{2**70}}}'
+
+
+def test_dumps_content_compact_large_integers(compact_json):
+    assert dumps_content({"big": 2**70}) == f'{{"big":{2**70}}}'
+
+
+def test_dumps_content_not_serializable(compact_json):
+    with pytest.raises(TypeError):
+        dumps_content({"key": object()})
+
+
+@requires_orjson
+def test_orjson_packet_serializer():
+    packet = [
+        "send_step",
+        {"id": "step", "output": "välue", "big": 2**70, "nested": {1: None}},
+    ]
+
+    encoded = OrjsonPacketSerializer.dumps(packet, separators=(",", ":"))
+
+    assert json.loads(encoded) == json.loads(json.dumps(packet))
+    assert OrjsonPacketSerializer.loads(encoded) == json.loads(encoded)
+
+
+@requires_orjson
+def test_get_socketio_json():
+    # The default python-socketio encoder is kept unless orjson is enabled
+    assert get_socketio_json() is None
+
+    with patch("chainlit.config.config.project.step_serialization.orjson", True):
+        assert get_socketio_json() is OrjsonPacketSerializer
@@ -1,6 +1,7 @@
 import datetime
 import os
 import pathlib
+from functools import partial
 from pathlib import Path
 from typing import Callable
 from unittest.mock import AsyncMock, Mock, create_autospec, mock_open
@@ -14,6 +15,7 @@ from chainlit.config import (
     ChainlitConfig,
     SpontaneousFileUploadFeature,
 )
+from chainlit.data.base import BaseDataLayer
 from chainlit.server import app
 from chainlit.types import AskFileSpec
 from chainlit.user import PersistedUser
@@ -371,9 +373,97 @@ def test_upload_file_success(
     assert response_data["size"] == len(file_content)
 
     # Verify that persist_file was called with the correct arguments
-    mock_session_get_by_id_patched.persist_file.assert_called_once_with(
-        name="test_upload.txt", content=file_content, mime="text/plain"
+    mock_session_get_by_id_patched.persist_file.assert_called_once()
+    kwargs = mock_session_get_by_id_patched.persist_file.call_args.kwargs
+    assert kwargs["name"] == "test_upload.txt"
+    assert kwargs["mime"] == "text/plain"
+    assert "stream" in kwargs
+
+
+@pytest.fixture
+def streaming_upload_session(mock_session_get_by_id_patched: Mock, tmp_path: Path):
+    """Mock session persisting uploads like a real session, in tmp_path."""
+    from chainlit.session import BaseSession
+
+    mock_session_get_by_id_patched.files_dir = tmp_path
+    mock_session_get_by_id_patched.persist_file = partial(
+        BaseSession.persist_file, mock_session_get_by_id_patched
+    )
+    return mock_session_get_by_id_patched
+
+
+def test_upload_file_is_streamed_to_files_dir(
+    test_client: TestClient, streaming_upload_session: Mock, tmp_path: Path
+):
+    file_content = b"0123456789abcdef" * 200 * 1024
+
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("data.txt", file_content, "text/plain")},
+        params={"session_id": streaming_upload_session.id},
+    )
+
+    assert response.status_code == 200
+    file = streaming_upload_session.files[response.json()["id"]]
+    assert file["name"] == "data.txt"
+    assert file["size"] == len(file_content)
+    assert file["path"].parent == tmp_path
+    assert file["path"].read_bytes() == file_content
+
+
+def test_upload_file_rejects_oversize_before_reading(
+    test_client: TestClient,
+    test_config: ChainlitConfig,
+    streaming_upload_session: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    monkeypatch.setattr(
+        test_config.features,
+        "spontaneous_file_upload",
+        SpontaneousFileUploadFeature(enabled=True, max_size_mb=1),
+    )
+    read_multipart_file = AsyncMock()
+    monkeypatch.setattr("chainlit.server.read_multipart_file", read_multipart_file)
+
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("data.bin", b"1" * 2 * 1024 * 1024, "text/plain")},
+        params={"session_id": streaming_upload_session.id},
+    )
+
+    assert response.status_code == 400
+    read_multipart_file.assert_not_called()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_file_sniffs_mime_type(
+    test_client: TestClient,
+    test_config: ChainlitConfig,
+    streaming_upload_session: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        test_config.features,
+        "spontaneous_file_upload",
+        SpontaneousFileUploadFeature(enabled=True, accept=["image/*"]),
+    )
+
+    # A PDF pretending to be an image
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("image.png", b"%PDF-1.7 ...", "image/png")},
+        params={"session_id": streaming_upload_session.id},
+    )
+    assert response.status_code == 400
+    assert streaming_upload_session.files == {}
+
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("image.png", b"\x89PNG\r\n\x1a\n...", "image/png")},
+        params={"session_id": streaming_upload_session.id},
     )
+    assert response.status_code == 200
 
 
 def test_file_access_by_different_user(
@@ -1084,6 +1174,99 @@ def test_project_settings_forwards_chat_profile_to_starter_categories(
     assert categories[0]["starters"][0]["label"] == "Hello"
 
 
+@pytest.fixture
+def project_settings_cache(test_config: ChainlitConfig):
+    from chainlit.project_settings_cache import clear_project_settings_cache
+
+    test_config.project.settings_cache.enabled = True
+    clear_project_settings_cache()
+    yield
+    clear_project_settings_cache()
+
+
+def test_project_settings_cached_per_partition(
+    test_client: TestClient,
+    test_config: ChainlitConfig,
+    mock_get_current_user: Mock,
+    project_settings_cache,
+):
+    from chainlit.project_settings_cache import clear_project_settings_cache
+    from chainlit.types import Starter
+    from chainlit.utils import wrap_user_function
+
+    partition = "team_a"
+    set_starters = Mock()
+
+    def _set_starters(user, language):
+        set_starters()
+        return [Starter(label=partition, message="hi")]
+
+    test_config.code.set_starters = wrap_user_function(_set_starters)
+    test_config.code.project_settings_cache_key = wrap_user_function(
+        lambda user: partition
+    )
+
+    first = test_client.get("/project/settings")
+    second = test_client.get("/project/settings")
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.json()["starters"][0]["label"] == "team_a"
+    assert "ui" in first.json()
+    set_starters.assert_called_once()
+
+    # Other languages and partitions are cached apart
+    test_client.get("/project/settings", params={"language": "fr-FR"})
+    assert set_starters.call_count == 2
+    partition = "team_b"
+    assert (
+        test_client.get("/project/settings").json()["starters"][0]["label"] == "team_b"
+    )
+    assert set_starters.call_count == 3
+
+    # Config reloads drop the cache
+    clear_project_settings_cache()
+    test_client.get("/project/settings")
+    assert set_starters.call_count == 4
+
+
+def test_project_settings_not_cached_without_partition_key(
+    test_client: TestClient,
+    test_config: ChainlitConfig,
+    mock_get_current_user: Mock,
+    project_settings_cache,
+):
+    from chainlit.utils import wrap_user_function
+
+    set_starters = Mock(return_value=[])
+    test_config.code.set_starters = wrap_user_function(
+        lambda user, language: set_starters()
+    )
+
+    test_client.get("/project/settings")
+    test_client.get("/project/settings")
+    assert set_starters.call_count == 2
+
+    # Users can opt out of the cache
+    test_config.code.project_settings_cache_key = wrap_user_function(lambda user: None)
+    test_client.get("/project/settings")
+    test_client.get("/project/settings")
+    assert set_starters.call_count == 4
+
+
+def test_project_settings_etag(test_client: TestClient, mock_get_current_user: Mock):
+    response = test_client.get("/project/settings")
+    etag = response.headers["ETag"]
+
+    cached = test_client.get("/project/settings", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    stale = test_client.get("/project/settings", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == response.content
+
+
 def test_share_thread_endpoint_sets_flags(
     test_client: TestClient,
     monkeypatch: pytest.MonkeyPatch,
@@ -1152,3 +1335,176 @@ def test_health_check(test_client: TestClient):
     response = test_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+@pytest.fixture
+def html_template_cache():
+    from chainlit.server import clear_html_template_cache
+
+    clear_html_template_cache()
+    yield
+    clear_html_template_cache()
+
+
+def test_serve_index_is_rendered_once(
+    test_client: TestClient, html_template_cache, monkeypatch: pytest.MonkeyPatch
+):
+    import chainlit.server as server
+
+    render = Mock(wraps=server.get_html_template)
+    monkeypatch.setattr(server, "get_html_template", render)
+
+    first = test_client.get("/", headers={"Accept-Encoding": "identity"})
+    second = test_client.get("/thread/abc", headers={"Accept-Encoding": "identity"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.text == second.text
+    assert "<!-- TAG INJECTION PLACEHOLDER -->" not in first.text
+    render.assert_called_once()
+
+    server.clear_html_template_cache()
+    test_client.get("/")
+    assert render.call_count == 2
+
+
+def test_serve_index_etag_and_compression(test_client: TestClient, html_template_cache):
+    import gzip
+
+    from chainlit.server import get_rendered_html_template
+
+    response = test_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    template = get_rendered_html_template("")
+    assert gzip.decompress(template.encodings["gzip"]) == template.content
+    assert response.content == template.content
+
+    etag = response.headers["ETag"]
+    assert etag == template.get_etag("gzip")
+
+    cached = test_client.get(
+        "/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # The identity representation has its own ETag
+    identity = test_client.get(
+        "/", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert identity.status_code == 200
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["ETag"] == template.get_etag()
+
+
+def test_get_thread_window(test_client: TestClient):
+    import chainlit.data as data_mod
+    from chainlit.server import app as _app, get_current_user as _get_current_user
+
+    author = PersistedUser(
+        id="u1", createdAt=datetime.datetime.now().isoformat(), identifier="author"
+    )
+    thread = {
+        "id": "t1",
+        "userIdentifier": "author",
+        "steps": [{"id": f"s{i}", "parentId": None} for i in range(5)],
+        "elements": [],
+    }
+    dl = AsyncMock()
+    dl.get_thread_author.return_value = "author"
+    dl.get_thread.return_value = thread
+    dl.get_thread_page.side_effect = partial(BaseDataLayer.get_thread_page, dl)
+
+    _app.dependency_overrides[_get_current_user] = lambda: author
+    data_mod._data_layer = dl
+    data_mod._data_layer_initialized = True
+    try:
+        whole = test_client.get("/project/thread/t1")
+        assert len(whole.json()["steps"]) == 5
+        dl.get_thread_page.assert_not_awaited()
+
+        latest = test_client.get("/project/thread/t1", params={"steps": 2})
+        assert [step["id"] for step in latest.json()["steps"]] == ["s3", "s4"]
+        assert latest.json()["stepsPageInfo"] == {
+            "hasOlderSteps": True,
+            "olderStepsCursor": "s3",
+        }
+
+        older = test_client.get(
+            "/project/thread/t1", params={"steps": 2, "before": "s3"}
+        )
+        assert [step["id"] for step in older.json()["steps"]] == ["s1", "s2"]
+
+        assert test_client.get("/project/thread/t1?steps=0").status_code == 422
+        # The author is read from the fetched thread, then cached
+        dl.get_thread_author.assert_not_awaited()
+    finally:
+        del _app.dependency_overrides[_get_current_user]
+        data_mod._data_layer = None
+        data_mod._data_layer_initialized = False
+
+
+def test_get_thread_checks_the_fetched_author(test_client: TestClient):
+    import chainlit.data as data_mod
+    from chainlit.data.acl import get_thread_author_cache
+    from chainlit.server import app as _app, get_current_user as _get_current_user
+
+    other = PersistedUser(
+        id="u2", createdAt=datetime.datetime.now().isoformat(), identifier="other"
+    )
+    dl = AsyncMock()
+    dl.get_thread.return_value = {"id": "t1", "userIdentifier": "author"}
+
+    _app.dependency_overrides[_get_current_user] = lambda: other
+    data_mod._data_layer = dl
+    data_mod._data_layer_initialized = True
+    try:
+        assert test_client.get("/project/thread/t1").status_code == 401
+        assert get_thread_author_cache().get("t1") is None
+
+        dl.get_thread.return_value = None
+        assert test_client.get("/project/thread/t1").status_code == 404
+
+        # A cached author is checked before fetching the thread
+        get_thread_author_cache().set("t1", "author")
+        dl.get_thread.reset_mock()
+        assert test_client.get("/project/thread/t1").status_code == 401
+        dl.get_thread.assert_not_awaited()
+        dl.get_thread_author.assert_not_awaited()
+    finally:
+        del _app.dependency_overrides[_get_current_user]
+        data_mod._data_layer = None
+        data_mod._data_layer_initialized = False
+
+
+def test_upload_file_sniffs_windows_executables(
+    test_client: TestClient,
+    test_config: ChainlitConfig,
+    streaming_upload_session: Mock,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(
+        test_config.features,
+        "spontaneous_file_upload",
+        SpontaneousFileUploadFeature(enabled=True, accept=["text/*"]),
+    )
+
+    # A CSV file starting with "MZ" is not an executable
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("codes.csv", b"MZ,Mozambique\nMW,Malawi\n", "text/csv")},
+        params={"session_id": streaming_upload_session.id},
+    )
+    assert response.status_code == 200
+
+    # DOS header pointing to the PE signature
+    executable = b"MZ" + b"\0" * 0x3A + (0x80).to_bytes(4, "little")
+    executable = executable.ljust(0x80, b"\0") + b"PE\0\0" + b"\0" * 64
+    response = test_client.post(
+        "/project/file",
+        files={"file": ("notes.txt", executable, "text/plain")},
+        params={"session_id": streaming_upload_session.id},
+    )
+    assert response.status_code == 400
@@ -251,6 +251,128 @@ class TestBaseSession:
                 file_id = result["id"]
                 assert session.files[file_id]["size"] > 0
 
+    @pytest.mark.asyncio
+    async def test_base_session_persist_file_with_path(self):
+        """Test persisting a file from a path, copied without reading it in Python."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / "source.txt"
+            source.write_bytes(b"file content")
+
+            with patch("chainlit.config.FILES_DIRECTORY", Path(tmpdir)):
+                session = BaseSession(
+                    id="test_id",
+                    client_type="webapp",
+                    thread_id=None,
+                    user=None,
+                    token=None,
+                    user_env=None,
+                )
+
+                # Without reflinks, the file is copied
+                with patch("chainlit.session.sys.platform", "win32"):
+                    copied = await session.persist_file(
+                        name="copied.txt", mime="text/plain", path=str(source)
+                    )
+                cloned = await session.persist_file(
+                    name="cloned.txt", mime="text/plain", path=str(source)
+                )
+
+                for file_id in (copied["id"], cloned["id"]):
+                    file = session.files[file_id]
+                    assert file["path"].parent == session.files_dir
+                    assert file["path"].read_bytes() == b"file content"
+                    assert file["size"] == len(b"file content")
+                    # Not a hardlink, rewriting the source leaves the copy as is
+                    assert file["path"].stat().st_ino != source.stat().st_ino
+
+                source.write_bytes(b"rewritten")
+                assert session.files[copied["id"]]["path"].read_bytes() == (
+                    b"file content"
+                )
+
+    @pytest.mark.asyncio
+    async def test_base_session_persist_file_reference_in_place(self):
+        """Test registering a file in place instead of copying it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = Path(tmpdir) / "source.txt"
+            source.write_bytes(b"file content")
+
+            with patch("chainlit.config.FILES_DIRECTORY", Path(tmpdir) / "files"):
+                session = BaseSession(
+                    id="test_id",
+                    client_type="webapp",
+                    thread_id=None,
+                    user=None,
+                    token=None,
+                    user_env=None,
+                )
+
+                result = await session.persist_file(
+                    name="source.txt",
+                    mime="text/plain",
+                    path=str(source),
+                    reference=True,
+                )
+
+                file = session.files[result["id"]]
+                assert file["path"] == source
+                assert file["size"] == len(b"file content")
+                assert not session.files_dir.exists()
+
+    @pytest.mark.asyncio
+    async def test_base_session_persist_file_with_stream(self):
+        """Test persisting a file streamed in chunks, within its size limit."""
+
+        async def stream():
+            yield b"first "
+            yield b"second"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("chainlit.config.FILES_DIRECTORY", Path(tmpdir)):
+                session = BaseSession(
+                    id="test_id",
+                    client_type="webapp",
+                    thread_id=None,
+                    user=None,
+                    token=None,
+                    user_env=None,
+                )
+
+                result = await session.persist_file(
+                    name="test.txt", mime="text/plain", stream=stream(), max_size=12
+                )
+
+                file = session.files[result["id"]]
+                assert file["size"] == 12
+                assert file["path"].read_bytes() == b"first second"
+
+    @pytest.mark.asyncio
+    async def test_base_session_persist_file_stream_too_large(self):
+        """Test that a stream exceeding max_size is dropped."""
+
+        async def stream():
+            yield b"first "
+            yield b"second"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("chainlit.config.FILES_DIRECTORY", Path(tmpdir)):
+                session = BaseSession(
+                    id="test_id",
+                    client_type="webapp",
+                    thread_id=None,
+                    user=None,
+                    token=None,
+                    user_env=None,
+                )
+
+                with pytest.raises(ValueError, match="File size too large"):
+                    await session.persist_file(
+                        name="test.txt", mime="text/plain", stream=stream(), max_size=10
+                    )
+
+                assert session.files == {}
+                assert list(session.files_dir.iterdir()) == []
+
     @pytest.mark.asyncio
     async def test_base_session_persist_file_without_path_or_content(self):
         """Test that persist_file raises error without path or content."""
@@ -442,6 +564,7 @@ class TestWebsocketSession:
     @pytest.mark.asyncio
     async def test_websocket_session_delete(self):
         """Test WebsocketSession delete method."""
+        from chainlit.chat_context import chat_contexts
         from chainlit.session import ws_sessions_id, ws_sessions_sid
 
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -458,6 +581,8 @@ class TestWebsocketSession:
                 # Create files directory
                 session.files_dir.mkdir(exist_ok=True)
 
+                chat_contexts["ws_id"] = [Mock()]
+
                 assert ws_sessions_sid.get("socket_123") == session
                 assert ws_sessions_id.get("ws_id") == session
 
@@ -466,6 +591,7 @@ class TestWebsocketSession:
                 assert not session.files_dir.exists()
                 assert ws_sessions_sid.get("socket_123") is None
                 assert ws_sessions_id.get("ws_id") is None
+                assert "ws_id" not in chat_contexts
 
     def test_websocket_session_get(self):
         """Test WebsocketSession.get class method."""
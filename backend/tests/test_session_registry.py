@@ -0,0 +1,196 @@
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+import chainlit.session_registry as session_registry
+from chainlit.chat_context import chat_contexts
+from chainlit.session import WebsocketSession, ws_sessions_id, ws_sessions_sid
+from chainlit.session_registry import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    delete_session,
+    restore_session,
+    save_session,
+)
+from chainlit.user import User
+from chainlit.user_session import user_sessions
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemorySessionStore()
+    monkeypatch.setattr(session_registry, "_session_store", store)
+    monkeypatch.setattr(session_registry, "_session_store_initialized", True)
+    return store
+
+
+@pytest.fixture
+def websocket_session():
+    session = WebsocketSession(
+        id="shared_session",
+        socket_id="socket_1",
+        emit=AsyncMock(),
+        emit_call=AsyncMock(),
+        user_env={"KEY": "value"},
+        client_type="webapp",
+        user=User(identifier="alice"),
+        token="token_1",
+        chat_profile="gpt-4",
+        thread_id="thread_1",
+    )
+    session.chat_settings = {"temperature": 0.2}
+    session.has_first_interaction = True
+    yield session
+    ws_sessions_id.pop(session.id, None)
+    ws_sessions_sid.pop("socket_1", None)
+    ws_sessions_sid.pop("socket_2", None)
+    user_sessions.pop(session.id, None)
+    chat_contexts.pop(session.id, None)
+
+
+def forget_locally(session: WebsocketSession):
+    """Simulate a reconnection landing on a worker that never saw the session."""
+    ws_sessions_id.pop(session.id, None)
+    ws_sessions_sid.pop(session.socket_id, None)
+    user_sessions.pop(session.id, None)
+    chat_contexts.pop(session.id, None)
+
+
+async def test_in_memory_store_roundtrip():
+    store = InMemorySessionStore()
+
+    await store.set("user_session", "abc", {"count": 1})
+    assert await store.get("user_session", "abc") == {"count": 1}
+
+    await store.delete("user_session", "abc")
+    assert await store.get("user_session", "abc") is None
+
+
+async def test_in_memory_store_expiry():
+    store = InMemorySessionStore()
+    await store.set("session", "abc", {"id": "abc"}, ttl=10)
+
+    value, _ = store._entries[("session", "abc")]
+    store._entries[("session", "abc")] = (value, time.monotonic() - 1)
+
+    assert await store.get("session", "abc") is None
+
+
+async def test_redis_store_roundtrip():
+    fakeredis = pytest.importorskip("fakeredis")
+    store = RedisSessionStore(client=fakeredis.FakeAsyncRedis())
+
+    await store.set("chat_context", "abc", [{"id": "m1"}], ttl=30)
+    assert await store.get("chat_context", "abc") == [{"id": "m1"}]
+    assert await store.client.ttl("chainlit:chat_context:abc") > 0
+
+    await store.delete("chat_context", "abc")
+    assert await store.get("chat_context", "abc") is None
+
+
+async def test_no_store_configured_is_noop(monkeypatch, websocket_session):
+    monkeypatch.setattr(session_registry, "_session_store", None)
+    monkeypatch.setattr(session_registry, "_session_store_initialized", True)
+
+    await save_session(websocket_session)
+    forget_locally(websocket_session)
+
+    assert (
+        await restore_session("socket_2", websocket_session.id, Mock(), Mock(), {})
+        is None
+    )
+
+
+async def test_restore_session_on_another_worker(store, websocket_session):
+    user_sessions[websocket_session.id] = {"counter": 3}
+    await save_session(websocket_session)
+    forget_locally(websocket_session)
+
+    emit_fn = AsyncMock()
+    restored = await restore_session(
+        "socket_2",
+        websocket_session.id,
+        emit_fn,
+        AsyncMock(),
+        {},
+        user=User(identifier="alice"),
+    )
+
+    assert restored is not None
+    assert restored.restored
+    assert restored.emit is emit_fn
+    assert restored.thread_id == "thread_1"
+    assert restored.chat_profile == "gpt-4"
+    assert restored.chat_settings == {"temperature": 0.2}
+    assert restored.has_first_interaction
+    assert restored.token == "token_1"
+    assert WebsocketSession.get_by_id(websocket_session.id) is restored
+    assert WebsocketSession.get("socket_2") is restored
+    assert user_sessions[websocket_session.id]["counter"] == 3
+
+
+async def test_restore_session_rejects_other_user(store, websocket_session):
+    await save_session(websocket_session)
+    forget_locally(websocket_session)
+
+    with pytest.raises(ConnectionRefusedError):
+        await restore_session(
+            "socket_2",
+            websocket_session.id,
+            AsyncMock(),
+            AsyncMock(),
+            {},
+            user=User(identifier="mallory"),
+        )
+
+
+async def test_delete_session(store, websocket_session):
+    await save_session(websocket_session)
+    await delete_session(websocket_session.id)
+
+    assert await store.get("session", websocket_session.id) is None
+    assert await store.get("user_session", websocket_session.id) is None
+    assert await store.get("chat_context", websocket_session.id) is None
+
+
+async def test_restore_session_keeps_the_connection_token(store, websocket_session):
+    await save_session(websocket_session)
+    forget_locally(websocket_session)
+
+    restored = await restore_session(
+        "socket_2",
+        websocket_session.id,
+        AsyncMock(),
+        AsyncMock(),
+        {},
+        user=User(identifier="alice"),
+        token="token_2",
+    )
+
+    assert restored is not None
+    assert restored.token == "token_2"
+
+
+async def test_delete_session_owned_by_another_worker(store, websocket_session):
+    await save_session(websocket_session)
+    forget_locally(websocket_session)
+
+    # The client reconnected to another worker, which saved the session again
+    restored = await restore_session(
+        "socket_2",
+        websocket_session.id,
+        AsyncMock(),
+        AsyncMock(),
+        {},
+        user=User(identifier="alice"),
+    )
+    assert restored is not None
+    await save_session(restored)
+
+    # The first worker times the session out
+    await delete_session(websocket_session.id, socket_id="socket_1")
+    assert await store.get("session", websocket_session.id) is not None
+
+    await delete_session(websocket_session.id, socket_id="socket_2")
+    assert await store.get("session", websocket_session.id) is None
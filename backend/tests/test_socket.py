@@ -1,3 +1,4 @@
+import asyncio
 import json
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -10,6 +11,8 @@ from chainlit.socket import (
     _identifiers_match,
     _get_token,
     _get_token_from_cookie,
+    audio_chunk,
+    audio_end,
     clean_session,
     connect,
     connection_successful,
@@ -403,6 +406,46 @@ class TestResumeThread:
             user_sessions.clear()
             user_sessions.update(original_sessions)
 
+    @pytest.mark.asyncio
+    async def test_resume_thread_with_steps_window(self):
+        """Test thread resumption with only the latest steps of the thread."""
+        from chainlit.user_session import user_sessions
+
+        mock_session = Mock(spec=WebsocketSession)
+        mock_session.user = Mock(identifier="user123")
+        mock_session.thread_id_to_resume = "thread_123"
+        mock_session.id = "session_123"
+
+        thread = {
+            "userIdentifier": "user123",
+            "metadata": {},
+            "steps": [],
+            "stepsPageInfo": {"hasOlderSteps": True, "olderStepsCursor": "step_1"},
+        }
+
+        mock_data_layer = AsyncMock()
+        mock_data_layer.get_thread_page.return_value = thread
+
+        original_sessions = user_sessions.copy()
+        try:
+            with (
+                patch("chainlit.socket.get_data_layer") as mock_get_dl,
+                patch("chainlit.socket.config") as mock_config,
+            ):
+                mock_get_dl.return_value = mock_data_layer
+                mock_config.project.resume_steps_window = 50
+
+                result = await resume_thread(mock_session)
+
+                assert result == thread
+                mock_data_layer.get_thread_page.assert_awaited_once_with(
+                    thread_id="thread_123", limit=50
+                )
+                mock_data_layer.get_thread.assert_not_awaited()
+        finally:
+            user_sessions.clear()
+            user_sessions.update(original_sessions)
+
 
 class TestLoadUserEnv:
     """Test suite for load_user_env function."""
@@ -757,3 +800,49 @@ class TestConnect:
 
                                 assert result is True
                                 mock_session_ctor.assert_called_once()
+
+
+class TestAudio:
+    """Test suite for the audio handlers."""
+
+    @pytest.fixture
+    async def audio_session(self):
+        from chainlit.audio_pipeline import remove_audio_pipeline
+
+        received = []
+
+        async def on_audio_chunk(chunk):
+            await asyncio.sleep(0.001)
+            received.append(chunk.data)
+
+        async def on_audio_end():
+            received.append("end")
+
+        mock_session = Mock(spec=WebsocketSession)
+        mock_session.id = "audio_session"
+        mock_session.has_first_interaction = True
+        mock_config = Mock()
+        mock_config.features.audio.enabled = True
+        mock_config.code.on_audio_chunk = on_audio_chunk
+        mock_config.code.on_audio_end = on_audio_end
+        mock_session.get_config.return_value = mock_config
+
+        with patch.object(WebsocketSession, "require", return_value=mock_session):
+            with patch("chainlit.socket.init_ws_context") as mock_init_context:
+                mock_init_context.return_value.emitter = AsyncMock()
+                yield received
+
+        await remove_audio_pipeline(mock_session.id)
+
+    @pytest.mark.asyncio
+    async def test_audio_chunks_processed_in_order_before_the_end(self, audio_session):
+        """Test that chunks are processed in order, before on_audio_end."""
+        for data in [b"a", b"b", b"c"]:
+            await audio_chunk(
+                "sid",
+                {"isStart": False, "mimeType": "pcm16", "elapsedTime": 0, "data": data},
+            )
+
+        await audio_end("sid")
+
+        assert audio_session == [b"a", b"b", b"c", "end"]
@@ -1,3 +1,5 @@
+import inspect
+import json
 import sys
 import uuid
 from unittest.mock import AsyncMock, Mock, patch
@@ -8,6 +10,7 @@ from chainlit.context import local_steps
 from chainlit.element import Element
 from chainlit.step import (
     Step,
+    capture_input,
     check_add_step_in_cot,
     flatten_args_kwargs,
     step,
@@ -129,6 +132,55 @@ class TestStepClass:
             assert "STRIPPED_BINARY_DATA" in test_step.output
             assert b"binary_data" not in test_step.output.encode()
 
+    async def test_step_output_serialized_once_when_read(self, mock_chainlit_context):
+        """Test that dict outputs are serialized on first read, then cached."""
+        async with mock_chainlit_context:
+            test_step = Step(name="test")
+
+            with patch(
+                "chainlit.step.dumps_content", side_effect=json.dumps
+            ) as dumps_content:
+                test_step.output = {"first": 1}
+                test_step.output = {"second": 2}
+                dumps_content.assert_not_called()
+
+                assert test_step.output == '{"second": 2}'
+                assert test_step.output == '{"second": 2}'
+                assert test_step.to_dict()["output"] == '{"second": 2}'
+                dumps_content.assert_called_once_with({"second": 2})
+
+                test_step.output = "text"
+                assert test_step.output == "text"
+                dumps_content.assert_called_once()
+
+    async def test_step_language_resolves_pending_output(self, mock_chainlit_context):
+        """Test that the language reflects a pending output, unless set afterwards."""
+        async with mock_chainlit_context:
+            test_step = Step(name="test")
+
+            test_step.output = {"key": object()}
+            assert test_step.language == "text"
+
+            test_step.output = {"key": "value"}
+            test_step.language = "yaml"
+            assert test_step.output.startswith("{")
+            assert test_step.language == "yaml"
+
+    async def test_step_compact_json(self, mock_chainlit_context):
+        """Test that dict contents are not indented when compact_json is set."""
+        async with mock_chainlit_context:
+            test_step = Step(name="test")
+
+            with patch(
+                "chainlit.config.config.project.step_serialization.compact_json", True
+            ):
+                test_step.input = {"query": "héllo", "ids": (1, 2)}
+                test_step.output = {"binary": b"data"}
+
+                assert test_step.input == '{"query":"héllo","ids":[1,2]}'
+                assert test_step.output == '{"binary":"STRIPPED_BINARY_DATA"}'
+                assert test_step.language == "json"
+
     async def test_step_to_dict(self, mock_chainlit_context):
         """Test Step serialization to dictionary."""
         async with mock_chainlit_context as ctx:
@@ -399,6 +451,50 @@ class TestStepDecorator:
             # Verify send_step was called (input is set during step execution)
             ctx.emitter.send_step.assert_called()
 
+    async def test_step_decorator_capture_policy(self, mock_chainlit_context):
+        """Test the input capture policy of the decorator and its default."""
+        async with mock_chainlit_context as ctx:
+
+            @step(name="test_step")
+            async def default_capture(a: str, b: int = 1):
+                return "done"
+
+            @step(name="test_step", capture="none")
+            async def no_capture(a: str):
+                return "done"
+
+            await default_capture("hello")
+            step_dict = ctx.emitter.update_step.call_args[0][0]
+            assert json.loads(step_dict["input"]) == {"a": "hello", "b": 1}
+
+            await no_capture("hello")
+            step_dict = ctx.emitter.update_step.call_args[0][0]
+            assert step_dict["input"] == ""
+
+            with patch("chainlit.config.config.project.step_input.capture", "repr"):
+                await default_capture(b"data")
+            step_dict = ctx.emitter.update_step.call_args[0][0]
+            assert json.loads(step_dict["input"]) == {
+                "a": "STRIPPED_BINARY_DATA",
+                "b": 1,
+            }
+
+    async def test_step_decorator_captures_large_input_in_full(
+        self, mock_chainlit_context
+    ):
+        """Test that the default capture policy keeps the whole arguments."""
+        async with mock_chainlit_context as ctx:
+
+            @step(name="test_step")
+            async def retrieve(documents: list):
+                return "done"
+
+            documents = [{"id": i, "text": "lorem ipsum " * 50} for i in range(100)]
+            await retrieve(documents)
+
+            step_dict = ctx.emitter.update_step.call_args[0][0]
+            assert json.loads(step_dict["input"]) == {"documents": documents}
+
     async def test_step_decorator_captures_output(self, mock_chainlit_context):
         """Test that decorator captures function return value as output."""
         async with mock_chainlit_context as ctx:
@@ -566,6 +662,40 @@ class TestStepEdgeCases:
             assert isinstance(test_step.output, str)
             assert test_step.language == "text"
 
+    async def test_step_with_circular_reference(self, mock_chainlit_context):
+        """Test that a step returning a circular structure is still sent."""
+        async with mock_chainlit_context as ctx:
+
+            @step
+            async def circular():
+                d = {}
+                d["self"] = d
+                return d
+
+            result = await circular()
+
+            assert result["self"] is result
+            step_dict = ctx.emitter.update_step.call_args[0][0]
+            assert step_dict["output"].startswith("{'self': {")
+            assert step_dict["isError"] is False
+
+    async def test_step_content_changed_after_assignment(self, mock_chainlit_context):
+        """Test that changes made to a content after its assignment are not sent."""
+        async with mock_chainlit_context:
+            test_step = Step(name="test")
+
+            output = {"answer": 42}
+            test_step.output = output
+            output["secret"] = "added later"
+
+            inputs = ["query"]
+            test_step.input = inputs
+            inputs.append("added later")
+
+            step_dict = test_step.to_dict()
+            assert "secret" not in step_dict["output"]
+            assert "added later" not in step_dict["input"]
+
     async def test_step_with_very_long_content(self, mock_chainlit_context):
         """Test Step handles very long content."""
         async with mock_chainlit_context:
@@ -614,3 +744,115 @@ class TestStepEdgeCases:
 
             test_step.fail_on_persist_error = True
             assert test_step.fail_on_persist_error is True
+
+
+class TestStepInputCapture:
+    """Test suite for the capture of step function arguments."""
+
+    def test_get_signature_is_cached(self):
+        """Test that the signature of a function is computed once."""
+
+        def sample_func(a, b=2):
+            pass
+
+        with patch("chainlit.step.inspect.signature", wraps=inspect.signature) as sig:
+            assert flatten_args_kwargs(sample_func, (1,), {}) == {"a": 1, "b": 2}
+            assert flatten_args_kwargs(sample_func, (3,), {}) == {"a": 3, "b": 2}
+
+            sig.assert_called_once_with(sample_func)
+
+    def test_capture_input_none(self):
+        """Test that no input is captured with the none policy."""
+
+        def sample_func(a):
+            pass
+
+        assert capture_input(sample_func, (1,), {}, "none") is None
+
+    def test_capture_input_repr(self):
+        """Test that the repr policy captures bounded reprs of the arguments."""
+
+        class Client:
+            def __repr__(self):
+                return "Client()"
+
+        def sample_func(client, documents, query, data, limit=10):
+            pass
+
+        result = capture_input(
+            sample_func,
+            (Client(), [str(i) for i in range(1000)], "q" * 1000, b"data"),
+            {},
+            "repr",
+        )
+
+        assert result["client"] == "Client()"
+        assert result["documents"].startswith("['0', '1', '2'")
+        assert len(result["documents"]) < 100
+        assert result["query"].startswith("q" * 200)
+        assert len(result["query"]) < 250
+        assert result["data"] == "STRIPPED_BINARY_DATA"
+        assert result["limit"] == 10
+
+    def test_capture_input_json(self):
+        """Test that the json policy serializes the arguments within the budget."""
+
+        def sample_func(query, documents, client=None):
+            pass
+
+        result = capture_input(sample_func, ("hello", [1, 2]), {}, "json")
+        assert json.loads(result) == {
+            "query": "hello",
+            "documents": [1, 2],
+            "client": None,
+        }
+
+        documents = [{"text": "lorem ipsum " * 10} for _ in range(100_000)]
+        result = capture_input(
+            sample_func, ("hello", documents, object()), {}, "json", max_bytes=1000
+        )
+        assert result.startswith('{\n    "query": "hello"')
+        assert result.endswith("... (truncated)")
+        assert len(result.encode()) < 1100
+
+    def test_capture_input_json_not_serializable(self):
+        """Test that the json policy falls back to reprs for other values."""
+
+        class Client:
+            def __repr__(self):
+                return "Client()"
+
+        def sample_func(client, data):
+            pass
+
+        result = capture_input(sample_func, (Client(), b"data"), {}, "json")
+
+        assert json.loads(result) == {
+            "client": "Client()",
+            "data": "STRIPPED_BINARY_DATA",
+        }
+
+    def test_capture_input_json_circular_reference(self):
+        """Test that the json policy falls back to the repr policy when it fails."""
+
+        def sample_func(documents):
+            pass
+
+        documents: list = []
+        documents.append(documents)
+
+        assert capture_input(sample_func, (documents,), {}, "json") == {
+            "documents": "[[[[[[[...]]]]]]]"
+        }
+
+    def test_capture_input_deepcopy(self):
+        """Test that the deepcopy policy copies the arguments."""
+
+        def sample_func(documents):
+            pass
+
+        documents = [{"text": "hello"}]
+        result = capture_input(sample_func, (documents,), {}, "deepcopy")
+        documents[0]["text"] = "changed"
+
+        assert result == {"documents": [{"text": "hello"}]}
@@ -0,0 +1,139 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from chainlit.config import StreamCoalescingSettings
+from chainlit.emitter import ChainlitEmitter
+from chainlit.session import WebsocketSession
+from chainlit.stream_coalescer import (
+    StreamCoalescer,
+    get_stream_coalescer,
+    remove_stream_coalescer,
+    stream_coalescers,
+)
+
+
+@pytest.fixture
+def session():
+    session = Mock(spec=WebsocketSession)
+    session.id = "coalesced_session"
+    session.emit = AsyncMock()
+    return session
+
+
+@pytest.fixture
+def coalescing_enabled(monkeypatch):
+    from chainlit.config import config
+
+    monkeypatch.setattr(
+        config.project,
+        "stream_coalescing",
+        StreamCoalescingSettings(enabled=True, flush_interval_ms=10),
+    )
+    yield
+    stream_coalescers.clear()
+
+
+def emitted_frames(session):
+    return [call.args[1] for call in session.emit.call_args_list]
+
+
+async def test_merges_consecutive_tokens(session):
+    coalescer = StreamCoalescer(session, flush_interval=10)
+
+    for token in ["Hel", "lo", " world"]:
+        await coalescer.add_token("step_1", token)
+    await coalescer.flush()
+
+    assert emitted_frames(session) == [
+        {"id": "step_1", "token": "Hello world", "isSequence": False, "isInput": False}
+    ]
+    assert coalescer.frames_saved == 2
+
+
+async def test_preserves_order_across_steps(session):
+    coalescer = StreamCoalescer(session, flush_interval=10)
+
+    await coalescer.add_token("step_1", "a")
+    await coalescer.add_token("step_2", "b")
+    await coalescer.add_token("step_1", "c")
+    await coalescer.add_token("step_1", "d", is_input=True)
+    await coalescer.flush()
+
+    assert [(f["id"], f["token"], f["isInput"]) for f in emitted_frames(session)] == [
+        ("step_1", "a", False),
+        ("step_2", "b", False),
+        ("step_1", "c", False),
+        ("step_1", "d", True),
+    ]
+    assert coalescer.frames_saved == 0
+
+
+async def test_sequence_replaces_pending_tokens(session):
+    coalescer = StreamCoalescer(session, flush_interval=10)
+
+    await coalescer.add_token("step_1", "draft")
+    await coalescer.add_token("step_1", "final", is_sequence=True)
+    await coalescer.add_token("step_1", "!")
+    await coalescer.flush()
+
+    assert emitted_frames(session) == [
+        {"id": "step_1", "token": "final!", "isSequence": True, "isInput": False}
+    ]
+
+
+async def test_flushes_on_byte_threshold(session):
+    coalescer = StreamCoalescer(session, flush_interval=10, max_buffer_bytes=4)
+
+    await coalescer.add_token("step_1", "ab")
+    session.emit.assert_not_called()
+
+    await coalescer.add_token("step_1", "cd")
+    session.emit.assert_called_once_with(
+        "stream_token",
+        {"id": "step_1", "token": "abcd", "isSequence": False, "isInput": False},
+    )
+
+
+async def test_flushes_after_interval(session):
+    coalescer = StreamCoalescer(session, flush_interval=0.01)
+
+    await coalescer.add_token("step_1", "token")
+    session.emit.assert_not_called()
+
+    await asyncio.sleep(0.05)
+    session.emit.assert_called_once()
+    assert coalescer.stats()["pending_frames"] == 0
+
+
+async def test_get_stream_coalescer_disabled_by_default(session):
+    assert get_stream_coalescer(session) is None
+
+
+async def test_emitter_flushes_tokens_before_update(session, coalescing_enabled):
+    emitter = ChainlitEmitter(session)
+
+    await emitter.send_token("step_1", "Hello")
+    await emitter.send_token("step_1", " world")
+    session.emit.assert_not_called()
+
+    step_dict = {"id": "step_1", "output": "Hello world"}
+    await emitter.update_step(step_dict)
+
+    assert session.emit.call_args_list[0].args == (
+        "stream_token",
+        {"id": "step_1", "token": "Hello world", "isSequence": False, "isInput": False},
+    )
+    assert session.emit.call_args_list[1].args == ("update_message", step_dict)
+
+
+async def test_remove_stream_coalescer_flushes(session, coalescing_enabled):
+    coalescer = get_stream_coalescer(session)
+    assert coalescer is not None
+
+    await coalescer.add_token("step_1", "pending")
+    await remove_stream_coalescer(session.id)
+
+    session.emit.assert_called_once()
+    assert session.id not in stream_coalescers
@@ -0,0 +1,38 @@
+import { useState } from 'react';
+import { toast } from 'sonner';
+
+import { useChatInteract } from '@chainlit/react-client';
+
+import { Loader } from '@/components/Loader';
+import { Button } from '@/components/ui/button';
+import { useTranslation } from 'components/i18n/Translator';
+
+export default function LoadOlderButton() {
+  const { loadOlderMessages } = useChatInteract();
+  const [loading, setLoading] = useState(false);
+  const { t } = useTranslation();
+
+  const onClick = async () => {
+    setLoading(true);
+    try {
+      await loadOlderMessages();
+    } catch (err) {
+      toast.error(err instanceof Error ? err.message : String(err));
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <Button
+      id="load-older-messages"
+      variant="outline"
+      className="mx-auto rounded-full"
+      disabled={loading}
+      onClick={onClick}
+    >
+      {loading ? <Loader className="!size-4" /> : null}
+      {t('chat.messages.loadOlder')}
+    </Button>
+  );
+}
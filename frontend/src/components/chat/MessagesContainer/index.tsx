@@ -19,6 +19,7 @@ import {
   useConfig
 } from '@chainlit/react-client';
 
+import LoadOlderButton from '@/components/chat/LoadOlderButton';
 import { Messages } from '@/components/chat/Messages';
 import { buildSideViewElementsSignature } from '@/lib/sideView';
 import { dismissedSideViewSignatureState } from '@/state/project';
@@ -32,7 +33,7 @@ const MessagesContainer = ({ navigate }: Props) => {
   const apiClient = useContext(ChainlitContext);
   const { config } = useConfig();
   const { elements, askUser, loading, actions } = useChatData();
-  const { messages } = useChatMessages();
+  const { messages, hasOlderMessages } = useChatMessages();
   const { uploadFile: _uploadFile } = useChatInteract();
   const setMessages = useSetRecoilState(messagesState);
   const setSideView = useSetRecoilState(sideViewState);
@@ -227,6 +228,7 @@ const MessagesContainer = ({ navigate }: Props) => {
 
   return (
     <MessageContext.Provider value={memoizedContext}>
+      {hasOlderMessages ? <LoadOlderButton /> : null}
       <Messages
         indent={0}
         isRunning={loading}
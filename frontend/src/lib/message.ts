@@ -13,6 +13,59 @@ const isForIdMatch = (id: string | number | undefined, forId: string) => {
   return forId === id.toString();
 };
 
+const isJsonWhitespace = (char: string) =>
+  char === ' ' || char === '\n' || char === '\r' || char === '\t';
+
+// Indents a JSON text without parsing its values: numbers keep their exact
+// representation, where JSON.parse rounds the integers above 2^53
+export const formatJson = (json: string, indent = 4) => {
+  let formatted = '';
+  let depth = 0;
+  let inString = false;
+  const newLine = () => '\n' + ' '.repeat(depth * indent);
+
+  for (let i = 0; i < json.length; i++) {
+    const char = json[i];
+
+    if (inString) {
+      formatted += char;
+      if (char === '\\') {
+        formatted += json[++i];
+      } else if (char === '"') {
+        inString = false;
+      }
+      continue;
+    }
+
+    if (isJsonWhitespace(char)) continue;
+
+    if (char === '{' || char === '[') {
+      let next = i + 1;
+      while (next < json.length && isJsonWhitespace(json[next])) next++;
+      if (json[next] === '}' || json[next] === ']') {
+        // Empty object or array
+        formatted += char + json[next];
+        i = next;
+      } else {
+        depth++;
+        formatted += char + newLine();
+      }
+    } else if (char === '}' || char === ']') {
+      depth--;
+      formatted += newLine() + char;
+    } else if (char === ',') {
+      formatted += char + newLine();
+    } else if (char === ':') {
+      formatted += ': ';
+    } else {
+      if (char === '"') inString = true;
+      formatted += char;
+    }
+  }
+
+  return formatted;
+};
+
 const escapeRegExp = (string: string) => {
   // https://developer.mozilla.org/en-US/docs/Web/JavaScript/Guide/Regular_Expressions#escaping
   return string.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
@@ -86,6 +139,21 @@ export const prepareContent = ({
     });
   }
 
+  if (
+    language === 'json' &&
+    preparedContent &&
+    !preparedContent.includes('\n')
+  ) {
+    // Compact JSON contents (see project.step_serialization) are pretty-printed here
+    try {
+      // Only validates the content, the parsed values are rounded
+      JSON.parse(preparedContent);
+      preparedContent = formatJson(preparedContent);
+    } catch {
+      // Not JSON (e.g. still streaming), display it as is
+    }
+  }
+
   if (language && preparedContent) {
     const prefix = `\`\`\`${language}`;
     const suffix = '```';
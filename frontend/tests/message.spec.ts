@@ -0,0 +1,52 @@
+import { describe, expect, it } from 'vitest';
+
+import { formatJson, prepareContent } from '../src/lib/message';
+
+describe('formatJson', () => {
+  it('indents like JSON.stringify', () => {
+    const value = {
+      a: 1,
+      b: [1, 2, { c: 'x,y:{}' }],
+      d: {},
+      e: [],
+      f: 'quote " and backslash \\',
+      g: null
+    };
+
+    expect(formatJson(JSON.stringify(value))).toEqual(
+      JSON.stringify(value, null, 4)
+    );
+  });
+
+  it('keeps large integers as is', () => {
+    expect(formatJson('{"id":12345678901234567890}')).toEqual(
+      '{\n    "id": 12345678901234567890\n}'
+    );
+  });
+});
+
+describe('prepareContent', () => {
+  it('pretty-prints compact JSON contents', () => {
+    const { preparedContent } = prepareContent({
+      elements: [],
+      id: 'step',
+      content: '{"id":9007199254740993,"items":[]}',
+      language: 'json'
+    });
+
+    expect(preparedContent).toEqual(
+      '```json\n{\n    "id": 9007199254740993,\n    "items": []\n}\n```'
+    );
+  });
+
+  it('leaves invalid JSON contents as is', () => {
+    const { preparedContent } = prepareContent({
+      elements: [],
+      id: 'step',
+      content: '{"id":90',
+      language: 'json'
+    });
+
+    expect(preparedContent).toEqual('```json\n{"id":90\n```');
+  });
+});
@@ -263,6 +263,26 @@ export class ChainlitAPI extends APIBase {
     return res.json();
   }
 
+  async getThread(
+    threadId: string,
+    steps?: number,
+    before?: string | null
+  ): Promise<IThread> {
+    const params = new URLSearchParams();
+    if (steps) {
+      params.set('steps', String(steps));
+    }
+    if (before) {
+      params.set('before', before);
+    }
+    const query = params.toString();
+    const res = await this.get(
+      `/project/thread/${threadId}${query ? `?${query}` : ''}`
+    );
+
+    return res.json();
+  }
+
   async renameThread(threadId: string, name: string) {
     const res = await this.put(`/project/thread`, { threadId, name });
 
@@ -16,6 +16,7 @@ import {
   IMessageElement,
   IStep,
   ITasklistElement,
+  IThreadStepsPageInfo,
   IUser,
   ThreadHistory
 } from './types';
@@ -71,6 +72,15 @@ export const messagesState = atom<IStep[]>({
   default: []
 });
 
+// Steps of the resumed thread not loaded yet, fetched by windows of `limit`
+// top-level steps
+export const olderStepsState = atom<
+  (IThreadStepsPageInfo & { threadId: string; limit: number }) | undefined
+>({
+  key: 'OlderSteps',
+  default: undefined
+});
+
 export const commandsState = atom<ICommand[]>({
   key: 'Commands',
   default: []
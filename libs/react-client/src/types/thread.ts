@@ -1,6 +1,11 @@
 import { IElement } from './element';
 import { IStep } from './step';
 
+export interface IThreadStepsPageInfo {
+  hasOlderSteps: boolean;
+  olderStepsCursor?: string | null;
+}
+
 export interface IThread {
   id: string;
   createdAt: number | string;
@@ -10,4 +15,6 @@ export interface IThread {
   metadata?: Record<string, any>;
   steps: IStep[];
   elements?: IElement[];
+  // Set when only a window of the latest steps was loaded
+  stepsPageInfo?: IThreadStepsPageInfo;
 }
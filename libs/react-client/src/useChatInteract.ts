@@ -1,5 +1,10 @@
 import { useCallback, useContext } from 'react';
-import { useRecoilValue, useResetRecoilState, useSetRecoilState } from 'recoil';
+import {
+  useRecoilState,
+  useRecoilValue,
+  useResetRecoilState,
+  useSetRecoilState
+} from 'recoil';
 import {
   actionState,
   askUserState,
@@ -11,6 +16,7 @@ import {
   firstUserInteraction,
   loadingState,
   messagesState,
+  olderStepsState,
   sessionIdState,
   sessionState,
   sideViewState,
@@ -18,8 +24,8 @@ import {
   threadIdToResumeState,
   tokenCountState
 } from 'src/state';
-import { IFileRef, IStep } from 'src/types';
-import { addMessage } from 'src/utils/message';
+import { IFileRef, IMessageElement, IStep, ITasklistElement } from 'src/types';
+import { addMessage, nestMessages } from 'src/utils/message';
 import { v4 as uuidv4 } from 'uuid';
 
 import { ChainlitContext } from './context';
@@ -47,6 +53,7 @@ const useChatInteract = () => {
   const setSideView = useSetRecoilState(sideViewState);
   const setCurrentThreadId = useSetRecoilState(currentThreadIdState);
   const setFavoriteMessages = useSetRecoilState(favoriteMessagesState);
+  const [olderSteps, setOlderSteps] = useRecoilState(olderStepsState);
 
   const clear = useCallback(() => {
     session?.socket.emit('clear_session');
@@ -55,6 +62,7 @@ const useChatInteract = () => {
     resetSessionId();
     setFirstUserInteraction(undefined);
     setMessages([]);
+    setOlderSteps(undefined);
     setElements([]);
     setTasklists([]);
     setActions([]);
@@ -65,6 +73,37 @@ const useChatInteract = () => {
     setCurrentThreadId(undefined);
   }, [askUser, session, sessionId]);
 
+  const loadOlderMessages = useCallback(async () => {
+    if (!olderSteps?.olderStepsCursor) {
+      return;
+    }
+    const thread = await client.getThread(
+      olderSteps.threadId,
+      olderSteps.limit,
+      olderSteps.olderStepsCursor
+    );
+    // The window steps come with the steps nested in them
+    const olderMessages = nestMessages(thread.steps);
+    const elements = thread.elements || [];
+
+    setMessages((oldMessages) => [...olderMessages, ...oldMessages]);
+    setTasklists((oldTasklists) => [
+      ...(elements as ITasklistElement[]).filter((e) => e.type === 'tasklist'),
+      ...oldTasklists
+    ]);
+    setElements((oldElements) => [
+      ...(elements as IMessageElement[]).filter(
+        (e) => ['avatar', 'tasklist'].indexOf(e.type) === -1
+      ),
+      ...oldElements
+    ]);
+    setOlderSteps(
+      thread.stepsPageInfo?.hasOlderSteps
+        ? { ...olderSteps, ...thread.stepsPageInfo }
+        : undefined
+    );
+  }, [client, olderSteps]);
+
   const sendMessage = useCallback(
     (
       message: PartialBy<IStep, 'createdAt' | 'id'>,
@@ -206,6 +245,7 @@ const useChatInteract = () => {
   return {
     uploadFile,
     clear,
+    loadOlderMessages,
     replyMessage,
     sendMessage,
     editMessage,
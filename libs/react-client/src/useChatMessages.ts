@@ -3,17 +3,20 @@ import { useRecoilValue } from 'recoil';
 import {
   currentThreadIdState,
   firstUserInteraction,
-  messagesState
+  messagesState,
+  olderStepsState
 } from './state';
 
 const useChatMessages = () => {
   const messages = useRecoilValue(messagesState);
   const firstInteraction = useRecoilValue(firstUserInteraction);
   const threadId = useRecoilValue(currentThreadIdState);
+  const hasOlderMessages = !!useRecoilValue(olderStepsState)?.hasOlderSteps;
 
   return {
     threadId,
     messages,
+    hasOlderMessages,
     firstInteraction
   };
 };
@@ -27,6 +27,7 @@ import {
   mcpState,
   messagesState,
   modesState,
+  olderStepsState,
   resumeThreadErrorState,
   sessionIdState,
   sessionState,
@@ -112,6 +113,7 @@ const useChatSession = () => {
   const setDocumentWorkspace = useSetRecoilState(documentWorkspaceState);
   const setElements = useSetRecoilState(elementState);
   const setTasklists = useSetRecoilState(tasklistState);
+  const setOlderSteps = useSetRecoilState(olderStepsState);
   const setActions = useSetRecoilState(actionState);
   const setChatSettingsInputs = useSetRecoilState(chatSettingsInputsState);
   const setTokenCount = useSetRecoilState(tokenCountState);
@@ -499,6 +501,15 @@ const useChatSession = () => {
           setChatSettingsValue(thread.metadata?.chat_settings);
         }
         setMessages(messages);
+        setOlderSteps(
+          thread.stepsPageInfo?.hasOlderSteps
+            ? {
+                ...thread.stepsPageInfo,
+                threadId: thread.id,
+                limit: messages.length
+              }
+            : undefined
+        );
         const elements = thread.elements || [];
         setTasklists(
           (elements as ITasklistElement[]).filter((e) => e.type === 'tasklist')